@@ -0,0 +1,3 @@
+"""
+Módulo benchmarks - Mediciones de rendimiento de la aplicación
+"""
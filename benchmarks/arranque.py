@@ -0,0 +1,194 @@
+"""
+BENCHMARK DE ARRANQUE
+Desglose de `python -X importtime` y tiempo hasta que el campo de escaneo
+recibe el foco por primera vez
+
+Uso:
+    python -m inventario_boletos.benchmarks.arranque
+    python -m inventario_boletos.benchmarks.arranque --repeticiones 5 --top 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+MODULO_VENTANA = "inventario_boletos.ui.main_window"
+
+# Módulos pesados que no deberían importarse al arrancar
+MODULOS_DIFERIDOS = ["pandas", "numpy", "openpyxl", "pygame"]
+
+# Proceso hijo: abre la ventana real y avisa cuando el campo recibe el foco
+_CODIGO_PRIMER_FOCO = """
+import time
+inicio = time.perf_counter()
+from inventario_boletos.ui.main_window import MainWindow
+importado = time.perf_counter()
+app = MainWindow()
+construido = time.perf_counter()
+
+def _en_foco(_evento):
+    ahora = time.perf_counter()
+    print(
+        f"FOCO {importado - inicio:.6f} {construido - inicio:.6f} {ahora - inicio:.6f}",
+        flush=True,
+    )
+    app.root.after(0, app.root.destroy)
+
+app.campo_escaneo.entry.bind("<FocusIn>", _en_foco, add="+")
+app.run()
+"""
+
+
+def _entorno_hijo() -> Dict[str, str]:
+    """Entorno con el directorio padre del paquete en PYTHONPATH"""
+    paquete = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    raiz = os.path.dirname(paquete)
+    entorno = dict(os.environ)
+    entorno["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [raiz, entorno.get("PYTHONPATH", "")])
+    )
+    return entorno
+
+
+def medir_importtime(modulo: str = MODULO_VENTANA, top: int = 10) -> Dict[str, Any]:
+    """
+    Importa el módulo en un intérprete nuevo con -X importtime.
+
+    Args:
+        modulo: Módulo a importar
+        top: Cantidad de importaciones más costosas a retornar
+
+    Returns:
+        Diccionario con el total en ms, las más costosas y los módulos
+        pesados que se importaron
+    """
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        capture_output=True,
+        text=True,
+        env=_entorno_hijo(),
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(proceso.stderr.strip().splitlines()[-1])
+
+    importaciones = []
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "self [us]" in linea:
+            continue
+        propio, acumulado, nombre = linea[len("import time:") :].split("|")
+        importaciones.append((int(acumulado), int(propio), nombre.rstrip()))
+
+    # Las importaciones de primer nivel no tienen sangría en el nombre
+    total_us = sum(
+        acumulado
+        for acumulado, _, nombre in importaciones
+        if not nombre.startswith("  ")
+    )
+    nombres = {nombre.strip() for _, _, nombre in importaciones}
+
+    return {
+        "modulo": modulo,
+        "total_ms": round(total_us / 1000, 2),
+        "mas_costosas": [
+            {
+                "modulo": nombre.strip(),
+                "acumulado_ms": round(acumulado / 1000, 2),
+                "propio_ms": round(propio / 1000, 2),
+            }
+            for acumulado, propio, nombre in sorted(importaciones, reverse=True)[:top]
+        ],
+        "pesados_importados": [m for m in MODULOS_DIFERIDOS if m in nombres],
+    }
+
+
+def medir_primer_foco(timeout: float = 30.0) -> Dict[str, float]:
+    """
+    Lanza la aplicación en un proceso nuevo y mide hasta el primer foco.
+
+    Args:
+        timeout: Segundos máximos de espera
+
+    Returns:
+        Tiempos en segundos: total (desde el lanzamiento del proceso),
+        importación, construcción de la ventana y foco (medidos en el hijo)
+    """
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen(
+        [sys.executable, "-c", _CODIGO_PRIMER_FOCO],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=_entorno_hijo(),
+    )
+    try:
+        salida, errores = proceso.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proceso.kill()
+        raise RuntimeError(f"La ventana no recibió el foco en {timeout:.0f}s")
+
+    for linea in salida.splitlines():
+        if linea.startswith("FOCO "):
+            importado, construido, foco = (float(v) for v in linea.split()[1:])
+            return {
+                # El total incluye el arranque del intérprete, como en el .exe
+                "total_s": round(time.perf_counter() - inicio, 4),
+                "importacion_s": round(importado, 4),
+                "ventana_s": round(construido, 4),
+                "primer_foco_s": round(foco, 4),
+            }
+
+    detalle = errores.strip().splitlines()[-1] if errores.strip() else "sin salida"
+    raise RuntimeError(f"La ventana no llegó a recibir el foco: {detalle}")
+
+
+def _mediana(mediciones: List[Dict[str, float]], clave: str) -> float:
+    return round(statistics.median(m[clave] for m in mediciones), 4)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Benchmark de arranque")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument(
+        "--sin-ventana",
+        action="store_true",
+        help="Medir solo -X importtime (sin abrir la interfaz)",
+    )
+    args = parser.parse_args(argv)
+
+    importtime = [medir_importtime(top=args.top) for _ in range(args.repeticiones)]
+    print(f"Importación de {MODULO_VENTANA}:")
+    print(f"  total (mediana): {_mediana(importtime, 'total_ms')} ms")
+    print(
+        "  módulos pesados importados: "
+        f"{', '.join(importtime[-1]['pesados_importados']) or 'ninguno'}"
+    )
+    for fila in importtime[-1]["mas_costosas"]:
+        print(
+            f"  {fila['acumulado_ms']:>9.2f} ms  "
+            f"(propio {fila['propio_ms']:>7.2f} ms)  {fila['modulo']}"
+        )
+
+    if args.sin_ventana:
+        return
+
+    try:
+        focos = [medir_primer_foco() for _ in range(args.repeticiones)]
+    except RuntimeError as e:
+        print(f"Tiempo hasta el primer foco: no disponible ({e})")
+        return
+
+    print("Tiempo hasta el primer foco (mediana):")
+    print(f"  total desde el lanzamiento: {_mediana(focos, 'total_s')} s")
+    print(f"  importación: {_mediana(focos, 'importacion_s')} s")
+    print(f"  ventana construida: {_mediana(focos, 'ventana_s')} s")
+    print(f"  campo de escaneo con foco: {_mediana(focos, 'primer_foco_s')} s")
+
+
+if __name__ == "__main__":
+    main()
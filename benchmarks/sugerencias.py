@@ -0,0 +1,168 @@
+"""
+BENCHMARK DE SUGERENCIAS PARA CÓDIGOS MAL LEÍDOS
+Compara, sobre N códigos de 13 dígitos, la búsqueda de vecinos a distancia
+de Hamming 1 probando variantes contra el diccionario de la sesión con un
+índice precalculado de claves enmascaradas por posición
+
+Uso:
+    python -m inventario_boletos.benchmarks.sugerencias
+    python -m inventario_boletos.benchmarks.sugerencias --codigos 500000 --consultas 20000
+"""
+
+import argparse
+import random
+import statistics
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from inventario_boletos.core.sugerencias import sugerir_codigos
+
+LONGITUD = 13
+
+
+def generar_codigos(cantidad: int, semilla: int = 7) -> List[str]:
+    """Códigos de 13 dígitos en lotes consecutivos, como los de un reporte"""
+    aleatorio = random.Random(semilla)
+    codigos = set()
+    while len(codigos) < cantidad:
+        base = aleatorio.randrange(10 ** (LONGITUD - 1), 10**LONGITUD - 1000)
+        codigos.update(str(base + i) for i in range(min(1000, cantidad - len(codigos))))
+    return list(codigos)
+
+
+def _construir_indice_enmascarado(codigos: List[str]) -> Dict[str, Any]:
+    """Alternativa precalculada: una clave por posición con el dígito tapado"""
+    indice: Dict[str, Any] = {}
+    for codigo in codigos:
+        for posicion in range(len(codigo)):
+            clave = codigo[:posicion] + "*" + codigo[posicion + 1 :]
+            anterior = indice.get(clave)
+            if anterior is None:
+                indice[clave] = codigo
+            elif isinstance(anterior, list):
+                anterior.append(codigo)
+            else:
+                indice[clave] = [anterior, codigo]
+    return indice
+
+
+def _consultar_indice_enmascarado(indice: Dict[str, Any], codigo: str) -> List[str]:
+    resultado = []
+    for posicion in range(len(codigo)):
+        valor = indice.get(codigo[:posicion] + "*" + codigo[posicion + 1 :])
+        if valor is None:
+            continue
+        for candidato in valor if isinstance(valor, list) else (valor,):
+            if candidato != codigo:
+                resultado.append(candidato)
+    return resultado
+
+
+def _medir_construccion(funcion, *args):
+    """Tiempo y memoria asignada (tracemalloc) al construir una estructura"""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    estructura = funcion(*args)
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    actual = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return estructura, {
+        "construccion_s": round(segundos, 3),
+        "memoria_mb": round(actual / 2**20, 1),
+        "pico_mb": round(pico / 2**20, 1),
+    }
+
+
+def _latencias_us(funcion, consultas: List[str]) -> Dict[str, float]:
+    tiempos = []
+    for codigo in consultas:
+        inicio = time.perf_counter()
+        funcion(codigo)
+        tiempos.append((time.perf_counter() - inicio) * 1e6)
+    tiempos.sort()
+    return {
+        "mediana_us": round(statistics.median(tiempos), 1),
+        "p99_us": round(tiempos[int(len(tiempos) * 0.99) - 1], 1),
+    }
+
+
+def _lecturas_danadas(codigos: List[str], cantidad: int, semilla: int = 11) -> List[str]:
+    """Códigos del reporte con un dígito cambiado al azar"""
+    aleatorio = random.Random(semilla)
+    danadas = []
+    for codigo in aleatorio.sample(codigos, cantidad):
+        posicion = aleatorio.randrange(len(codigo))
+        digito = aleatorio.choice([d for d in "0123456789" if d != codigo[posicion]])
+        danadas.append(codigo[:posicion] + digito + codigo[posicion + 1 :])
+    return danadas
+
+
+def medir(cantidad_codigos: int = 500_000, consultas: int = 20_000) -> Dict[str, Any]:
+    """
+    Ejecuta el benchmark.
+
+    Args:
+        cantidad_codigos: Códigos del reporte simulado
+        consultas: Lecturas dañadas a resolver
+
+    Returns:
+        Diccionario con construcción, memoria y latencias de cada estrategia
+    """
+    codigos = generar_codigos(cantidad_codigos)
+    lecturas = _lecturas_danadas(codigos, min(consultas, cantidad_codigos))
+
+    # El diccionario de boletos ya existe en la sesión: se mide como referencia
+    existentes, construccion_dict = _medir_construccion(dict.fromkeys, codigos)
+    enmascarado, construccion_mascara = _medir_construccion(
+        _construir_indice_enmascarado, codigos
+    )
+
+    return {
+        "codigos": cantidad_codigos,
+        "consultas": len(lecturas),
+        "variantes": {
+            "construccion_adicional_s": 0.0,
+            "memoria_adicional_mb": 0.0,
+            "diccionario_sesion": construccion_dict,
+            **_latencias_us(lambda c: sugerir_codigos(c, existentes), lecturas),
+        },
+        "claves_enmascaradas": {
+            **construccion_mascara,
+            **_latencias_us(
+                lambda c: _consultar_indice_enmascarado(enmascarado, c), lecturas
+            ),
+        },
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Benchmark de sugerencias")
+    parser.add_argument("--codigos", type=int, default=500_000)
+    parser.add_argument("--consultas", type=int, default=20_000)
+    args = parser.parse_args(argv)
+
+    resultado = medir(args.codigos, args.consultas)
+    print(f"{resultado['codigos']} códigos, {resultado['consultas']} lecturas dañadas")
+
+    variantes = resultado["variantes"]
+    print("Variantes contra el diccionario de la sesión (la estrategia usada):")
+    print("  construcción adicional: 0 s, memoria adicional: 0 MB")
+    print(
+        f"  (diccionario de la sesión: {variantes['diccionario_sesion']['memoria_mb']} MB)"
+    )
+    print(f"  latencia: mediana {variantes['mediana_us']} µs, p99 {variantes['p99_us']} µs")
+
+    mascara = resultado["claves_enmascaradas"]
+    print("Índice de claves enmascaradas por posición (alternativa):")
+    print(
+        f"  construcción: {mascara['construccion_s']} s, "
+        f"memoria: {mascara['memoria_mb']} MB (pico {mascara['pico_mb']} MB)"
+    )
+    print(f"  latencia: mediana {mascara['mediana_us']} µs, p99 {mascara['p99_us']} µs")
+
+
+if __name__ == "__main__":
+    main()
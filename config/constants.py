@@ -5,9 +5,18 @@ Clases y constantes para configuración centralizada
 
 from dataclasses import dataclass, field
 from typing import List, Dict, Any
+import importlib.util
 import os
 from pathlib import Path
 
+# pyarrow es opcional: sin él los diálogos no ofrecen .parquet/.feather
+PYARROW_DISPONIBLE = importlib.util.find_spec("pyarrow") is not None
+FILTROS_COLUMNARES = (
+    [("Archivos Parquet", "*.parquet"), ("Archivos Feather", "*.feather")]
+    if PYARROW_DISPONIBLE
+    else []
+)
+
 
 @dataclass
 class AppConstants:
@@ -16,6 +25,11 @@ class AppConstants:
     # Cantidad de digitos en el reporte para hacer match
     LONGITUD_CODIGO_BARRAS: int = 13
 
+    # Rechazar como LECTURA_INVALIDA los códigos con dígito de control EAN-13
+    # incorrecto, sin buscarlos. Solo se aplica si todos los códigos del
+    # reporte son EAN-13 válidos (si no, un boleto real podría rechazarse)
+    VALIDAR_DIGITO_CONTROL: bool = True
+
     # Nombres de columnas esperadas en el reporte
     COLUMNA_CODIGO_BARRA: str = "CODIGO DE BARRA"
     COLUMNA_SUCURSAL: str = "PDV"
@@ -40,8 +54,47 @@ class AppConstants:
     EXTENSIONES_PERMITIDAS: List[str] = field(
         default_factory=lambda: [".xls", ".xlsx", ".csv"]
     )
+    # Formatos columnares (requieren pyarrow): resultados con columnas tipadas
+    EXTENSIONES_COLUMNARES: List[str] = field(
+        default_factory=lambda: [".parquet", ".feather"]
+    )
     ENCODING: str = "utf-8"
 
+    # Columnas de resultados: VALIDADO en todos los formatos, estado
+    # (categórico) y hora de escaneo (fecha) solo en los columnares
+    COLUMNA_VALIDADO: str = "VALIDADO"
+    COLUMNA_ESTADO_ESCANEO: str = "ESTADO_ESCANEO"
+    COLUMNA_HORA_ESCANEO: str = "HORA_ESCANEO"
+
+    # Servidor de escaneo en red (estaciones remotas)
+    HOST_SERVIDOR_ESCANEO: str = "127.0.0.1"
+    PUERTO_SERVIDOR_ESCANEO: int = 8765
+    LOTE_MAXIMO_SERVIDOR: int = 256  # Códigos procesados por lote
+    COLA_MAXIMA_SERVIDOR: int = 4096  # Códigos en espera antes de frenar lectura
+
+    # Refresco de la interfaz: un único tick pinta estadísticas y barra de estado
+    INTERVALO_REFRESCO_UI_MS: int = 33  # ~30 Hz
+
+    # Registro en disco de boletos validados en todas las sesiones, para
+    # detectar boletos ya pagados que reaparecen en otro reporte
+    USAR_REGISTRO_VALIDADOS: bool = True
+
+    # Deshacer/rehacer escaneos: cambios de estado recordados por sesión
+    MAX_DESHACER: int = 200
+    # Diario de cambios junto al progreso JSON (se agrega al final, una línea
+    # por cambio, sin reescribir el progreso)
+    SUFIJO_DIARIO: str = ".diario.jsonl"
+    # Diario de una sesión que todavía no se guardó, en la carpeta de progresos
+    PREFIJO_DIARIO_SIN_GUARDAR: str = "sin_guardar_"
+
+    # Índice de códigos mapeado en memoria para otros procesos, junto al reporte
+    SUFIJO_INDICE_COMPARTIDO: str = ".indice.bin"
+    # Cada cuánto el servidor de escaneo trae lo que otros procesos marcaron
+    INTERVALO_SINCRONIZAR_INDICE_S: float = 0.5
+
+    # Caché de reportes ya limpios (por huella) para continuar sin releerlos
+    MAX_CACHE_REPORTES: int = 20
+
     # Mensajes de interfaz
     MSG_CARGA_EXITOSA: str = "Reporte cargado exitosamente"
     MSG_BOLETO_ENCONTRADO: str = "Boleto encontrado y marcado"
@@ -64,6 +117,14 @@ class AppConstants:
             ("Archivos Excel", "*.xlsx"),
             ("Archivos CSV", "*.csv"),
         ]
+        + FILTROS_COLUMNARES
+    )
+    FILTRO_CONTINUAR: List[tuple] = field(
+        default_factory=lambda: [
+            ("Archivos Excel", "*.xlsx *.xls"),
+            ("Archivos CSV", "*.csv"),
+        ]
+        + FILTROS_COLUMNARES
     )
     FILTRO_JSON: List[tuple] = field(
         default_factory=lambda: [("Archivos JSON", "*.json")]
@@ -111,6 +172,14 @@ class AppConstants:
 
         return str(resultados_path)
 
+    @property
+    def RUTA_REGISTRO_VALIDADOS(self) -> str:
+        """
+        Retorna la base SQLite del registro de boletos validados (la carpeta
+        la crea RegistroValidados al abrirla)
+        """
+        return str(Path.home() / "Documentos" / "Raspas" / "registro_validados.sqlite3")
+
     @property
     def CARPETA_PROGRESO(self) -> str:
         """Retorna la carpeta sugerida para guardar progresos (solo español)"""
@@ -121,6 +190,14 @@ class AppConstants:
 
         return str(progreso_path)
 
+    @property
+    def CARPETA_CACHE_REPORTES(self) -> str:
+        """
+        Retorna la carpeta de la caché de reportes procesados (la crea
+        TablaBoletos al guardar la primera)
+        """
+        return str(Path.home() / "Documentos" / "Raspas" / "Cache Reportes")
+
 
 class AppConfig:
     """Clase de configuración de la aplicación"""
@@ -130,6 +207,8 @@ class AppConfig:
         self.debug_mode: bool = False
         self.log_escaneos: bool = True
         self.auto_calcular_faltantes: bool = True
+        self.cprofile_carga: bool = False  # Capturar cProfile al cargar reportes
+        self.cache_reportes: bool = True  # Guardar cada reporte limpio en caché
 
     @property
     def columnas_relevantes(self) -> List[str]:
@@ -6,10 +6,14 @@ from .entities import (
     SesionInventario,
     Estadisticas,
     EstadoBoleto,
-    ResultadoEscaneo
+    ResultadoEscaneo,
+    ReporteSesion
 )
 
-from .report_processor import ReporteProcessor, ReporteProcessorError
+from .instrumentacion import instrumentacion, medir, HistogramaLatencia
+from .perfil_carga import PerfilCarga, EtapaCarga
+from .agregados import AgregadosSesion, AgregadoGrupo
+from .indice_pendientes import IndicePendientes, PendientesSesion
 
 __all__ = [
     'Boleto',
@@ -17,6 +21,60 @@ __all__ = [
     'Estadisticas',
     'EstadoBoleto',
     'ResultadoEscaneo',
+    'ReporteSesion',
     'ReporteProcessor',
-    'ReporteProcessorError'
-]
\ No newline at end of file
+    'ReporteProcessorError',
+    'ServidorEscaneo',
+    'ClienteCargaEscaneo',
+    'fusionar_progresos',
+    'ResumenFusion',
+    'LectorProgreso',
+    'exportar_por_pdv',
+    'ResumenExportacionPDV',
+    'instrumentacion',
+    'medir',
+    'HistogramaLatencia',
+    'PerfilCarga',
+    'EtapaCarga',
+    'AgregadosSesion',
+    'AgregadoGrupo',
+    'IndicePendientes',
+    'PendientesSesion',
+    'RegistroValidados',
+    'FiltroBloom',
+    'IndiceCompartido',
+    'TablaBoletos'
+]
+
+# Módulos que tardan en importarse o que solo usa alguna función puntual
+# (pandas en ReporteProcessor y TablaBoletos, numpy en IndiceCompartido,
+# asyncio en el servidor, multiprocessing en fusión y exportación por PDV,
+# sqlite3 en el registro): se cargan recién la primera vez que alguien
+# accede al nombre
+_IMPORTACIONES_DIFERIDAS = {
+    'ReporteProcessor': 'report_processor',
+    'ReporteProcessorError': 'report_processor',
+    'IndiceCompartido': 'indice_compartido',
+    'TablaBoletos': 'tabla_boletos',
+    'ServidorEscaneo': 'servidor_escaneo',
+    'ClienteCargaEscaneo': 'servidor_escaneo',
+    'fusionar_progresos': 'fusion_progresos',
+    'ResumenFusion': 'fusion_progresos',
+    'LectorProgreso': 'fusion_progresos',
+    'exportar_por_pdv': 'exportacion_pdv',
+    'ResumenExportacionPDV': 'exportacion_pdv',
+    'RegistroValidados': 'registro_validados',
+    'FiltroBloom': 'registro_validados',
+}
+
+
+def __getattr__(nombre):
+    modulo = _IMPORTACIONES_DIFERIDAS.get(nombre)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+    import importlib
+
+    valor = getattr(importlib.import_module(f"{__name__}.{modulo}"), nombre)
+    globals()[nombre] = valor
+    return valor
\ No newline at end of file
@@ -0,0 +1,280 @@
+"""
+AGREGADOS POR GRUPO
+Contadores de avance y conciliación de premios (general, por punto de venta,
+por vendedor y por tipo de premio), armados una vez al cargar el reporte y
+actualizados en O(1) con cada cambio de estado
+"""
+
+from dataclasses import dataclass, replace
+from decimal import ROUND_HALF_UP, Decimal
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+# Dimensiones disponibles -> atributo del boleto usado como clave
+DIMENSIONES = {
+    "sucursal": "sucursal",
+    "vendedor": "vendedor_documento",
+    "tipo_premio": "tipo_premio",
+}
+
+# Contador de AgregadoGrupo asociado a cada estado de boleto
+_CONTADOR_POR_ESTADO = {
+    "PENDIENTE": "pendientes",
+    "ESCANEADO": "escaneados",
+    "DUPLICADO": "duplicados",
+}
+
+# Estados cuyo premio cuenta como validado
+ESTADOS_VALIDADOS = ("ESCANEADO", "DUPLICADO")
+
+
+@lru_cache(maxsize=8192)
+def a_centavos(monto: Any) -> int:
+    """
+    Convierte un monto a centavos enteros sin error de punto flotante.
+    Los montos de premio se repiten mucho, por eso se cachean.
+
+    Args:
+        monto: Monto en unidades (float, int, str o Decimal)
+
+    Returns:
+        Monto en centavos redondeado al más cercano (mitades hacia arriba)
+    """
+    try:
+        valor = Decimal(str(monto))
+    except Exception:
+        return 0
+    if not valor.is_finite():
+        return 0
+    return int((valor * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+@dataclass
+class AgregadoGrupo:
+    """
+    Avance de un grupo de boletos (un PDV, un vendedor, un tipo de premio o
+    el total general). Los montos se llevan en centavos enteros; las
+    propiedades monto_* los devuelven como Decimal exacto.
+    """
+
+    clave: str
+    nombre: str = ""
+    total: int = 0
+    escaneados: int = 0
+    duplicados: int = 0
+    pendientes: int = 0
+    centavos_total: int = 0
+    centavos_validados: int = 0
+
+    @property
+    def centavos_pendientes(self) -> int:
+        """Premios del grupo que todavía no se escanearon, en centavos"""
+        return self.centavos_total - self.centavos_validados
+
+    @property
+    def monto_total(self) -> Decimal:
+        """Valor reportado: suma de premios del grupo"""
+        return Decimal(self.centavos_total).scaleb(-2)
+
+    @property
+    def monto_validado(self) -> Decimal:
+        """Valor validado: suma de premios ya escaneados del grupo"""
+        return Decimal(self.centavos_validados).scaleb(-2)
+
+    @property
+    def monto_pendiente(self) -> Decimal:
+        """Valor reportado que falta validar"""
+        return Decimal(self.centavos_pendientes).scaleb(-2)
+
+    @property
+    def porcentaje_escaneados(self) -> float:
+        """Porcentaje de boletos del grupo ya escaneados"""
+        if self.total == 0:
+            return 0.0
+        return round(((self.escaneados + self.duplicados) / self.total) * 100, 2)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convierte el agregado a diccionario"""
+        return {
+            "clave": self.clave,
+            "nombre": self.nombre,
+            "total": self.total,
+            "escaneados": self.escaneados,
+            "duplicados": self.duplicados,
+            "pendientes": self.pendientes,
+            "monto_total": float(self.monto_total),
+            "monto_validado": float(self.monto_validado),
+            "monto_pendiente": float(self.monto_pendiente),
+            "porcentaje_escaneados": self.porcentaje_escaneados,
+        }
+
+
+class AgregadosSesion:
+    """
+    Agregados de una sesión por cada dimensión de DIMENSIONES.
+
+    No tiene lock propio: SesionInventario lo actualiza con su lock de
+    estadísticas adquirido.
+    """
+
+    def __init__(self):
+        self.grupos: Dict[str, Dict[str, AgregadoGrupo]] = {
+            dimension: {} for dimension in DIMENSIONES
+        }
+        self.general = AgregadoGrupo(clave="TOTAL", nombre="Total general")
+
+    def _crear_grupo(self, dimension: str, clave: str, boleto) -> AgregadoGrupo:
+        """Crea el grupo de un boleto la primera vez que aparece su clave"""
+        nombre = boleto.vendedor_nombre if dimension == "vendedor" else clave
+        grupo = AgregadoGrupo(clave=clave, nombre=nombre)
+        self.grupos[dimension][clave] = grupo
+        return grupo
+
+    def registrar_transicion(
+        self, boleto, estado_anterior: Optional[Any], estado_nuevo: Any
+    ) -> None:
+        """
+        Ajusta los grupos del boleto por un cambio de estado.
+        Con estado_anterior None el boleto se suma por primera vez.
+        """
+        centavos = a_centavos(boleto.monto_premio)
+        anterior = estado_anterior.value if estado_anterior is not None else None
+        nuevo = estado_nuevo.value
+        contador_anterior = _CONTADOR_POR_ESTADO.get(anterior)
+        contador_nuevo = _CONTADOR_POR_ESTADO.get(nuevo)
+
+        grupos_boleto = [self.general]
+        for dimension, atributo in DIMENSIONES.items():
+            clave = getattr(boleto, atributo) or ""
+            grupo = self.grupos[dimension].get(clave)
+            if grupo is None:
+                grupo = self._crear_grupo(dimension, clave, boleto)
+            grupos_boleto.append(grupo)
+
+        for grupo in grupos_boleto:
+            valores = grupo.__dict__  # Acceso directo al contador por nombre
+
+            if anterior is None:
+                grupo.total += 1
+                grupo.centavos_total += centavos
+            else:
+                if contador_anterior:
+                    valores[contador_anterior] -= 1
+                if anterior in ESTADOS_VALIDADOS:
+                    grupo.centavos_validados -= centavos
+
+            if contador_nuevo:
+                valores[contador_nuevo] += 1
+            if nuevo in ESTADOS_VALIDADOS:
+                grupo.centavos_validados += centavos
+
+    def reconstruir(self, boletos) -> None:
+        """
+        Vuelve a armar todos los grupos desde los boletos.
+        Acumula en listas de enteros y crea los AgregadoGrupo al final: es
+        el camino de la carga del reporte, varias veces más rápido que
+        registrar los boletos de a uno.
+        """
+        # Índices de la lista acumuladora: total, escaneados, duplicados,
+        # pendientes, centavos_total, centavos_validados
+        posicion_contador = {"escaneados": 1, "duplicados": 2, "pendientes": 3}
+        info_estado: Dict[Any, tuple] = {}
+        acumulados: Dict[str, Dict[str, List[int]]] = {d: {} for d in DIMENSIONES}
+        nombres_vendedor: Dict[str, str] = {}
+        atributos = list(DIMENSIONES.items())
+        general = [0] * 6
+
+        for boleto in boletos:
+            estado = boleto.estado
+            info = info_estado.get(estado)
+            if info is None:
+                contador = _CONTADOR_POR_ESTADO.get(estado.value)
+                info = info_estado[estado] = (
+                    posicion_contador.get(contador),
+                    estado.value in ESTADOS_VALIDADOS,
+                )
+            indice_contador, validado = info
+            centavos = a_centavos(boleto.monto_premio)
+
+            for dimension, atributo in atributos:
+                clave = getattr(boleto, atributo) or ""
+                fila = acumulados[dimension].get(clave)
+                if fila is None:
+                    fila = acumulados[dimension][clave] = [0] * 6
+                    if dimension == "vendedor":
+                        nombres_vendedor[clave] = boleto.vendedor_nombre
+                fila[0] += 1
+                fila[4] += centavos
+                if indice_contador:
+                    fila[indice_contador] += 1
+                if validado:
+                    fila[5] += centavos
+
+            general[0] += 1
+            general[4] += centavos
+            if indice_contador:
+                general[indice_contador] += 1
+            if validado:
+                general[5] += centavos
+
+        def _grupo(clave: str, nombre: str, fila: List[int]) -> AgregadoGrupo:
+            return AgregadoGrupo(clave, nombre, *fila)
+
+        self.general = _grupo("TOTAL", "Total general", general)
+        self.grupos = {
+            dimension: {
+                clave: _grupo(
+                    clave,
+                    nombres_vendedor[clave] if dimension == "vendedor" else clave,
+                    fila,
+                )
+                for clave, fila in filas.items()
+            }
+            for dimension, filas in acumulados.items()
+        }
+
+    def conciliacion(self) -> Dict[str, Any]:
+        """
+        Valor validado contra valor reportado: general, por tipo de premio y
+        por PDV.
+
+        Returns:
+            Diccionario con "general" (AgregadoGrupo), "por_tipo_premio" y
+            "por_sucursal" (listas de AgregadoGrupo)
+        """
+        return {
+            "general": replace(self.general),
+            "por_tipo_premio": self.consultar("tipo_premio"),
+            "por_sucursal": self.consultar("sucursal"),
+        }
+
+    def obtener(self, dimension: str, clave: str) -> Optional[AgregadoGrupo]:
+        """Retorna una copia del agregado de un grupo, o None si no existe"""
+        grupo = self.grupos[dimension].get(clave)
+        return replace(grupo) if grupo else None
+
+    def consultar(
+        self,
+        dimension: str,
+        ordenar_por: str = "clave",
+        descendente: bool = False,
+        limite: Optional[int] = None,
+    ) -> List[AgregadoGrupo]:
+        """
+        Retorna copias de los agregados de una dimensión, ordenados.
+
+        Args:
+            dimension: "sucursal", "vendedor" o "tipo_premio"
+            ordenar_por: Campo o propiedad de AgregadoGrupo
+            descendente: Orden de mayor a menor
+            limite: Cantidad máxima de grupos a retornar
+
+        Returns:
+            Lista de AgregadoGrupo
+        """
+        if dimension not in self.grupos:
+            raise ValueError(f"Dimensión desconocida: {dimension}")
+
+        grupos = [replace(g) for g in self.grupos[dimension].values()]
+        grupos.sort(key=lambda g: getattr(g, ordenar_por), reverse=descendente)
+        return grupos[:limite] if limite is not None else grupos
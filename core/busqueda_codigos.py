@@ -0,0 +1,66 @@
+"""
+BÚSQUEDA POR CÓDIGO PARCIAL
+Índice de prefijos y sufijos de los códigos del reporte para encontrar un
+boleto por los dígitos impresos que se alcanzan a leer
+"""
+
+from bisect import bisect_left
+from typing import Iterable, List, Tuple
+
+# Mayor que cualquier dígito: cierra el rango de los códigos con un prefijo
+_FIN_DE_RANGO = "\uffff"
+
+
+class IndiceCodigos:
+    """
+    Códigos ordenados (para prefijos) y códigos invertidos ordenados (para
+    sufijos). Los que comparten un prefijo quedan contiguos, así cada
+    búsqueda son dos bisect en O(log n) y la página se toma por rebanada.
+    """
+
+    def __init__(self, codigos: Iterable[str]):
+        self._ordenados: List[str] = sorted(codigos)
+        self._invertidos: List[str] = sorted(codigo[::-1] for codigo in self._ordenados)
+
+    def __len__(self) -> int:
+        return len(self._ordenados)
+
+    def rango(self, digitos: str, por_sufijo: bool = False) -> Tuple[int, int]:
+        """
+        Posiciones [inicio, fin) de los códigos que coinciden.
+
+        Args:
+            digitos: Dígitos buscados
+            por_sufijo: Buscar los códigos que terminan en los dígitos (si no,
+                los que empiezan con ellos)
+
+        Returns:
+            Tuple (inicio, fin)
+        """
+        lista = self._invertidos if por_sufijo else self._ordenados
+        clave = digitos[::-1] if por_sufijo else digitos
+        return (
+            bisect_left(lista, clave),
+            bisect_left(lista, clave + _FIN_DE_RANGO),
+        )
+
+    def contar(self, digitos: str, por_sufijo: bool = False) -> int:
+        """Cantidad de códigos que coinciden"""
+        inicio, fin = self.rango(digitos, por_sufijo)
+        return fin - inicio
+
+    def pagina(
+        self, digitos: str, inicio: int, cantidad: int, por_sufijo: bool = False
+    ) -> List[str]:
+        """
+        Códigos que coinciden, desde el número `inicio`.
+
+        Returns:
+            Hasta `cantidad` códigos, en orden (de sufijo si por_sufijo)
+        """
+        desde, hasta = self.rango(digitos, por_sufijo)
+        desde = min(desde + max(inicio, 0), hasta)
+        hasta = min(desde + cantidad, hasta)
+        if por_sufijo:
+            return [codigo[::-1] for codigo in self._invertidos[desde:hasta]]
+        return self._ordenados[desde:hasta]
@@ -0,0 +1,202 @@
+"""
+DIARIO DE CAMBIOS DE ESTADO
+Historial acotado para deshacer/rehacer escaneos y diario persistente que
+agrega una línea JSON por cambio junto al archivo de progreso
+"""
+
+import json
+import os
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+
+@dataclass(frozen=True)
+class CambioEstado:
+    """
+    Cambio reversible del estado de un boleto: guarda los valores de antes
+    y de después, así deshacerlo es aplicar el cambio invertido.
+    """
+
+    codigo: str
+    estado_anterior: Any
+    estado_nuevo: Any
+    fecha_anterior: Optional[datetime] = None
+    fecha_nueva: Optional[datetime] = None
+    escaneos_anterior: int = 0
+    escaneos_nuevo: int = 0
+
+    def invertido(self) -> "CambioEstado":
+        """Retorna el cambio que vuelve al estado anterior"""
+        return CambioEstado(
+            codigo=self.codigo,
+            estado_anterior=self.estado_nuevo,
+            estado_nuevo=self.estado_anterior,
+            fecha_anterior=self.fecha_nueva,
+            fecha_nueva=self.fecha_anterior,
+            escaneos_anterior=self.escaneos_nuevo,
+            escaneos_nuevo=self.escaneos_anterior,
+        )
+
+
+class HistorialCambios:
+    """
+    Pilas de deshacer (acotada a los últimos `maximo` cambios) y rehacer.
+    Registrar un cambio nuevo descarta lo que se podía rehacer.
+
+    No tiene lock propio: SesionInventario lo usa con su lock de
+    estadísticas adquirido.
+    """
+
+    def __init__(self, maximo: int = 200):
+        self._deshacer: Deque[CambioEstado] = deque(maxlen=maximo)
+        self._rehacer: List[CambioEstado] = []
+
+    @property
+    def puede_deshacer(self) -> bool:
+        return bool(self._deshacer)
+
+    @property
+    def puede_rehacer(self) -> bool:
+        return bool(self._rehacer)
+
+    def registrar(self, cambio: CambioEstado) -> None:
+        """Agrega un cambio hecho por un escaneo"""
+        self._deshacer.append(cambio)
+        self._rehacer.clear()
+
+    def olvidar_rehacer(self, codigo: str) -> None:
+        """
+        Descarta lo que se podía rehacer de un boleto cuyo estado cambió por
+        otra vía (un escaneo remoto, que no entra al historial)
+        """
+        if any(cambio.codigo == codigo for cambio in self._rehacer):
+            self._rehacer = [c for c in self._rehacer if c.codigo != codigo]
+
+    def tomar_para_deshacer(self) -> Optional[CambioEstado]:
+        """Saca el último cambio y lo deja disponible para rehacer"""
+        if not self._deshacer:
+            return None
+        cambio = self._deshacer.pop()
+        self._rehacer.append(cambio)
+        return cambio
+
+    def tomar_para_rehacer(self) -> Optional[CambioEstado]:
+        """Saca el último cambio deshecho y lo vuelve a poner para deshacer"""
+        if not self._rehacer:
+            return None
+        cambio = self._rehacer.pop()
+        self._deshacer.append(cambio)
+        return cambio
+
+    def limpiar(self) -> None:
+        self._deshacer.clear()
+        self._rehacer.clear()
+
+
+class DiarioPersistente:
+    """
+    Archivo JSON Lines donde se agrega cada cambio de estado aplicado
+    (escaneo, deshacer, rehacer, fusión) sin reescribir el progreso completo.
+    Cada línea lleva el estado resultante del boleto, así reaplicarlas en
+    orden sobre el último progreso guardado reproduce la sesión.
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._archivo = None
+
+    def abrir(self, truncar: bool = False) -> "DiarioPersistente":
+        """
+        Abre el diario para agregar líneas (o lo vacía). Siempre en modo
+        binario: las marcas son posiciones en bytes y los saltos de línea
+        quedan como "\n" también en Windows.
+        """
+        directorio = os.path.dirname(self.ruta)
+        if directorio and not os.path.exists(directorio):
+            os.makedirs(directorio)
+        self._archivo = open(self.ruta, "wb" if truncar else "ab")
+        return self
+
+    def anotar(self, tipo: str, cambio: CambioEstado) -> None:
+        """
+        Agrega una línea con el estado resultante de un cambio.
+
+        Args:
+            tipo: "ESCANEO", "DESHACER", "REHACER", "FUSION" o "INDICE"
+            cambio: Cambio ya aplicado
+        """
+        if self._archivo is None:
+            return
+        self._archivo.write(self._linea(tipo, cambio, datetime.now().isoformat()))
+        self._archivo.flush()
+
+    def anotar_lote(self, tipo: str, cambios: List[CambioEstado]) -> None:
+        """
+        Agrega las líneas de muchos cambios del mismo tipo (fusión) con una
+        sola escritura y un solo flush.
+        """
+        if self._archivo is None or not cambios:
+            return
+        momento = datetime.now().isoformat()
+        self._archivo.write(
+            b"".join(self._linea(tipo, cambio, momento) for cambio in cambios)
+        )
+        self._archivo.flush()
+
+    @staticmethod
+    def _linea(tipo: str, cambio: CambioEstado, momento: str) -> bytes:
+        """Línea JSON del estado resultante de un cambio"""
+        linea = {
+            "tipo": tipo,
+            "codigo": cambio.codigo,
+            "estado": getattr(cambio.estado_nuevo, "value", cambio.estado_nuevo),
+            "fecha_escaneo": cambio.fecha_nueva.isoformat()
+            if cambio.fecha_nueva
+            else None,
+            "escaneos_realizados": cambio.escaneos_nuevo,
+            "timestamp": momento,
+        }
+        return (json.dumps(linea, ensure_ascii=False) + "\n").encode("utf-8")
+
+    def marca(self) -> int:
+        """Posición actual del final del diario (en bytes)"""
+        return self._archivo.tell() if self._archivo else 0
+
+    def descartar_hasta(self, marca: int) -> None:
+        """
+        Descarta las líneas anteriores a una marca (ya incluidas en un
+        progreso guardado) y conserva las que llegaron después.
+        """
+        if self._archivo is None:
+            return
+        self._archivo.flush()
+        with open(self.ruta, "rb") as f:
+            f.seek(marca)
+            restante = f.read()
+        self._archivo.seek(0)
+        self._archivo.truncate()
+        self._archivo.write(restante)
+        self._archivo.flush()
+
+    def cerrar(self) -> None:
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+
+    @staticmethod
+    def leer(ruta: str) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre las líneas de un diario. Una última línea cortada (cierre
+        inesperado a mitad de escritura) se ignora.
+        """
+        if not os.path.exists(ruta):
+            return
+        with open(ruta, "rb") as f:
+            for linea in f:
+                try:
+                    cambio = json.loads(linea.decode("utf-8"))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue  # Línea cortada: el cambio no llegó a escribirse
+                yield cambio
@@ -3,11 +3,41 @@ ENTIDADES DEL DOMINIO
 Clases principales que representan los objetos de negocio
 """
 
+import os
+import sys
+import threading
 from datetime import datetime
-from dataclasses import dataclass, field
-from typing import Optional, Dict, Any, List
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Tuple
 from enum import Enum
 from inventario_boletos.config.constants import AppConstants
+from inventario_boletos.core.instrumentacion import medir
+from inventario_boletos.core.agregados import AgregadosSesion, AgregadoGrupo
+from inventario_boletos.core.indice_pendientes import PendientesSesion
+from inventario_boletos.core.sugerencias import sugerir_codigos
+from inventario_boletos.core.codigo_barras import es_ean13_valido, validar_ean13_lote
+from inventario_boletos.core.busqueda_codigos import IndiceCodigos
+from inventario_boletos.core.diario import (
+    CambioEstado,
+    DiarioPersistente,
+    HistorialCambios,
+)
+
+if TYPE_CHECKING:
+    from inventario_boletos.core.indice_compartido import IndiceCompartido
+    from inventario_boletos.core.registro_validados import RegistroValidados
+
+
+# Cantidad de locks en los que se reparte el índice de códigos de barras.
+# Dos lectores solo compiten si sus códigos caen en la misma franja.
+NUM_FRANJAS_LOCK = 64
+
+# Contador de Estadisticas asociado a cada estado de boleto
+_CONTADOR_POR_ESTADO = {
+    "PENDIENTE": "pendientes",
+    "ESCANEADO": "escaneados",
+    "DUPLICADO": "duplicados",
+}
 
 
 class EstadoBoleto(str, Enum):
@@ -25,6 +55,7 @@ class ResultadoEscaneo(str, Enum):
     EXITO = "EXITO"
     DUPLICADO = "DUPLICADO"
     NO_ENCONTRADO = "NO_ENCONTRADO"
+    LECTURA_INVALIDA = "LECTURA_INVALIDA"  # Dígito de control incorrecto
     ERROR = "ERROR"
 
 
@@ -47,7 +78,11 @@ class Boleto:
     estado: EstadoBoleto = EstadoBoleto.PENDIENTE
     fecha_escaneo: Optional[datetime] = None
     escaneos_realizados: int = 0
-    datos_originales: Dict[str, Any] = field(default_factory=dict)
+
+    # Origen: reporte de la sesión (ReporteSesion.indice) y fila en ese reporte.
+    # El resto de las columnas del reporte queda en su TablaBoletos
+    reporte: int = 0
+    fila: int = -1
 
     def __post_init__(self):
         """Validaciones después de la inicialización"""
@@ -166,6 +201,49 @@ class Estadisticas:
         )
 
 
+@dataclass
+class ReporteSesion:
+    """
+    Reporte de origen dentro de una sesión que abarca varios reportes.
+    La huella identifica el archivo para no cargarlo dos veces.
+    """
+
+    indice: int
+    ruta: str = ""
+    huella: str = ""
+    total_boletos: int = 0
+    # Códigos que ya estaban en un reporte anterior de la sesión (se omiten)
+    codigos_repetidos: List[str] = field(default_factory=list)
+
+    @property
+    def nombre(self) -> str:
+        """Nombre corto del reporte (archivo sin extensión)"""
+        if self.ruta:
+            return os.path.splitext(os.path.basename(self.ruta))[0]
+        return f"Reporte {self.indice + 1}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convierte el reporte a diccionario"""
+        return {
+            "indice": self.indice,
+            "ruta": self.ruta,
+            "huella": self.huella,
+            "total_boletos": self.total_boletos,
+            "codigos_repetidos": self.codigos_repetidos,
+        }
+
+    @classmethod
+    def from_dict(cls, datos: Dict[str, Any]) -> "ReporteSesion":
+        """Crea un reporte desde el diccionario de to_dict"""
+        return cls(
+            indice=datos.get("indice", 0),
+            ruta=datos.get("ruta", ""),
+            huella=datos.get("huella", ""),
+            total_boletos=datos.get("total_boletos", 0),
+            codigos_repetidos=list(datos.get("codigos_repetidos", [])),
+        )
+
+
 @dataclass
 class SesionInventario:
     """
@@ -181,6 +259,10 @@ class SesionInventario:
 
     ruta_reporte_original: Optional[str] = None
 
+    # Reportes de origen; el índice de códigos (boletos) es uno solo para
+    # todos y cada boleto indica de qué reporte y fila viene
+    reportes: List[ReporteSesion] = field(default_factory=list)
+
     # Colecciones
     boletos: Dict[str, Boleto] = field(default_factory=dict)  # código -> Boleto
     escaneos: List[Dict[str, Any]] = field(default_factory=list)
@@ -192,68 +274,428 @@ class SesionInventario:
         """Inicialización después de crear la instancia"""
         self.constantes = AppConstants()
 
+        # Sincronización para varios lectores escaneando la misma sesión:
+        # un lock por franja del índice de códigos y uno para los contadores
+        self._locks_codigo = [threading.Lock() for _ in range(NUM_FRANJAS_LOCK)]
+        self._lock_estadisticas = threading.Lock()
+
+        # Aumenta con cada cambio de las estadísticas; la interfaz lo compara
+        # con el último valor que pintó para saber si debe redibujar
+        self.version_estadisticas = 0
+
+        # Avance por PDV y por vendedor, mantenido junto con las estadísticas
+        self.agregados = AgregadosSesion()
+
+        # Boletos pendientes en orden del reporte (general y por PDV)
+        self.pendientes = PendientesSesion()
+
+        # Índice de prefijos/sufijos para búsqueda manual; se arma al usarlo
+        # por primera vez y se descarta cuando cambian los códigos
+        self._indice_codigos: Optional[IndiceCodigos] = None
+        self._lock_indice_codigos = threading.Lock()
+
+        # Últimos cambios de estado para deshacer/rehacer escaneos, y diario
+        # en disco (junto al progreso al guardar o cargar; antes, uno "sin
+        # guardar" que abre la interfaz al cargar el reporte)
+        self.historial = HistorialCambios(self.constantes.MAX_DESHACER)
+        self.diario: Optional[DiarioPersistente] = None
+        self.diario_sin_guardar = False
+
+        # Códigos del reporte que no son EAN-13 válidos; con alguno no se
+        # rechazan lecturas por dígito de control
+        self.codigos_ean13_invalidos = 0
+
+        # Registro de boletos validados en otras sesiones (conectar_registro)
+        # y los boletos de este reporte que ya figuran en él
+        self.registro_validados: Optional["RegistroValidados"] = None
+        self.validados_en_otras_sesiones: Dict[str, Dict[str, Any]] = {}
+
+        # Índice mapeado en disco para otros procesos (publicar_indice_compartido)
+        # y los estados que esta sesión vio por última vez en él
+        self.indice_compartido: Optional["IndiceCompartido"] = None
+        self._estados_compartidos = None
+        # Motivo por el que se dejó de publicar el índice, para la interfaz
+        self.aviso_indice_compartido: Optional[str] = None
+
+    def _lock_de_codigo(self, codigo: str) -> threading.Lock:
+        """Retorna el lock de la franja a la que pertenece un código"""
+        return self._locks_codigo[hash(codigo) % NUM_FRANJAS_LOCK]
+
+    def _registrar_transicion(
+        self,
+        estado_anterior: Optional[EstadoBoleto],
+        estado_nuevo: EstadoBoleto,
+        boleto: Boleto,
+    ) -> None:
+        """
+        Ajusta los contadores de estadísticas, los agregados por grupo y el
+        índice de pendientes por un cambio de estado. Debe llamarse con
+        _lock_estadisticas adquirido.
+        """
+        self.version_estadisticas += 1
+        self.agregados.registrar_transicion(boleto, estado_anterior, estado_nuevo)
+        self.pendientes.registrar_transicion(boleto, estado_anterior, estado_nuevo)
+
+        if estado_anterior is not None:
+            contador = _CONTADOR_POR_ESTADO.get(estado_anterior.value)
+            if contador:
+                setattr(
+                    self.estadisticas,
+                    contador,
+                    getattr(self.estadisticas, contador) - 1,
+                )
+
+        contador = _CONTADOR_POR_ESTADO.get(estado_nuevo.value)
+        if contador:
+            setattr(
+                self.estadisticas, contador, getattr(self.estadisticas, contador) + 1
+            )
+
+    def _fijar_en_indice_compartido(
+        self, codigo: str, esperado: EstadoBoleto, nuevo: EstadoBoleto
+    ) -> bool:
+        """
+        Lleva el boleto al estado nuevo en el índice compartido con el mismo
+        comparar-y-fijar bajo bloqueo de byte que usan los procesos adjuntos.
+        Debe llamarse con _lock_estadisticas y el lock de la franja del código.
+
+        Returns:
+            False si otro proceso ya lo cambió en el índice (lo trae
+            sincronizar_indice_compartido); True si se escribió o el código no
+            está publicado
+        """
+        indice = self.indice_compartido
+        if indice is None:
+            return True
+        posicion = indice.posicion(codigo)
+        if posicion < 0:
+            return True
+        escrito, _ = indice.comparar_y_fijar(posicion, esperado.value, nuevo.value)
+        if escrito:
+            self._estados_compartidos[posicion] = indice.estados[posicion]
+        return escrito
+
     def agregar_boleto(self, boleto: Boleto) -> "SesionInventario":
         """Agrega un boleto a la sesión"""
-        if boleto.codigo in self.boletos:
-            raise ValueError(f"Boleto {boleto.codigo} ya existe en la sesión")
-
-        self.boletos[boleto.codigo] = boleto
-        self.estadisticas.total_boletos = len(self.boletos)
+        with self._lock_estadisticas:
+            if boleto.codigo in self.boletos:
+                raise ValueError(f"Boleto {boleto.codigo} ya existe en la sesión")
+
+            self.boletos[boleto.codigo] = boleto
+            self._indice_codigos = None
+            if not es_ean13_valido(boleto.codigo):
+                self.codigos_ean13_invalidos += 1
+            self.estadisticas.total_boletos = len(self.boletos)
+            self._registrar_transicion(None, boleto.estado, boleto)
         return self
 
     def agregar_boletos(self, boletos: List[Boleto]) -> "SesionInventario":
-        """Agrega múltiples boletos a la sesión"""
-        for boleto in boletos:
-            self.agregar_boleto(boleto)
+        """
+        Agrega múltiples boletos a la sesión.
+        Los contadores, agregados y pendientes se rearman una sola vez al
+        final en lugar de actualizarse boleto por boleto.
+        """
+        agregados = []
+        with self._lock_estadisticas:
+            try:
+                for boleto in boletos:
+                    if boleto.codigo in self.boletos:
+                        raise ValueError(
+                            f"Boleto {boleto.codigo} ya existe en la sesión"
+                        )
+                    self.boletos[boleto.codigo] = boleto
+                    agregados.append(boleto.codigo)
+            finally:
+                # Dígito de control de todos los códigos nuevos en un solo paso
+                self.codigos_ean13_invalidos += validar_ean13_lote(agregados).count(
+                    False
+                )
+                self._reconstruir_indices()
+
+        if self.registro_validados is not None:
+            self._revisar_registro(agregados)
         return self
 
+    def conectar_registro(self, registro: "RegistroValidados") -> int:
+        """
+        Conecta el registro de validados entre sesiones y revisa en lote los
+        boletos ya cargados.
+
+        Returns:
+            Cantidad de boletos pendientes que ya se validaron en otra sesión
+        """
+        self.registro_validados = registro
+        self.validados_en_otras_sesiones = {}
+        return self._revisar_registro(list(self.boletos))
+
+    def retirar_del_registro(self) -> None:
+        """
+        Quita del registro de validados lo que anotó esta sesión; se llama al
+        descartarla sin guardar (sus escaneos no cuentan como validaciones)
+        """
+        if self.registro_validados is not None:
+            self.registro_validados.eliminar_sesion(self.id_sesion)
+            self._escribir_registro()
+
+    def _revisar_registro(self, codigos: List[str]) -> int:
+        """
+        Busca en el registro (filtro de Bloom en lote + SQLite) los códigos
+        pendientes que ya se validaron en otra sesión.
+
+        Returns:
+            Cantidad de códigos encontrados
+        """
+        pendientes = [
+            codigo
+            for codigo in codigos
+            if self.boletos[codigo].estado == EstadoBoleto.PENDIENTE
+        ]
+        encontrados = {
+            codigo: validacion
+            for codigo, validacion in self.registro_validados.consultar_lote(
+                pendientes
+            ).items()
+            if validacion["id_sesion"] != self.id_sesion
+        }
+        self.validados_en_otras_sesiones.update(encontrados)
+        return len(encontrados)
+
+    def _validacion_en_otra_sesion(self, codigo: str) -> Optional[Dict[str, Any]]:
+        """
+        Validación previa del boleto en otra sesión, o None. Lo revisado al
+        cargar se responde sin tocar el registro; el resto se consulta en él
+        (otra estación pudo validarlo después de la carga: el registro lo
+        confirma en SQLite aunque su filtro de Bloom no lo tenga).
+        """
+        validacion = self.validados_en_otras_sesiones.get(codigo)
+        if validacion is None and self.registro_validados is not None:
+            validacion = self.registro_validados.consultar(codigo)
+            if validacion and validacion["id_sesion"] == self.id_sesion:
+                validacion = None
+        return validacion
+
+    def agregar_reporte(
+        self, boletos: List[Boleto], ruta: str = "", huella: str = ""
+    ) -> Tuple[bool, str, Optional[ReporteSesion]]:
+        """
+        Suma un reporte más a la sesión.
+
+        Los códigos que ya estaban en un reporte anterior se omiten (quedan
+        anotados en el reporte) en lugar de cortar la carga, y el reporte no
+        se agrega si su huella coincide con uno ya cargado.
+
+        Args:
+            boletos: Boletos del reporte
+            ruta: Ruta del archivo del reporte
+            huella: Huella del archivo (ver ReporteProcessor.huella)
+
+        Returns:
+            Tuple (éxito, mensaje, ReporteSesion agregado o None)
+        """
+        for existente in self.reportes:
+            if huella and existente.huella == huella:
+                return (
+                    False,
+                    f"El reporte ya está en la sesión como '{existente.nombre}'",
+                    None,
+                )
+
+        reporte = ReporteSesion(indice=len(self.reportes), ruta=ruta, huella=huella)
+        nuevos = []
+        vistos = set()
+        for boleto in boletos:
+            if boleto.codigo in self.boletos or boleto.codigo in vistos:
+                reporte.codigos_repetidos.append(boleto.codigo)
+                continue
+            vistos.add(boleto.codigo)
+            boleto.reporte = reporte.indice
+            nuevos.append(boleto)
+
+        reporte.total_boletos = len(nuevos)
+        self.reportes.append(reporte)
+        if self.ruta_reporte_original is None:
+            self.ruta_reporte_original = ruta or None
+        self.agregar_boletos(nuevos)
+
+        mensaje = f"{len(nuevos)} boletos agregados desde '{reporte.nombre}'"
+        if reporte.codigos_repetidos:
+            mensaje += (
+                f"; {len(reporte.codigos_repetidos)} códigos ya estaban en otro"
+                " reporte y se omitieron"
+            )
+        return True, mensaje, reporte
+
+    def reporte_de(self, boleto: Boleto) -> Optional[ReporteSesion]:
+        """Reporte de origen de un boleto (None si la sesión no registra reportes)"""
+        if 0 <= boleto.reporte < len(self.reportes):
+            return self.reportes[boleto.reporte]
+        return None
+
+    @property
+    def valida_digito_control(self) -> bool:
+        """
+        True si las lecturas con dígito de control EAN-13 incorrecto se
+        rechazan antes de buscarlas (configurable y solo con un reporte cuyos
+        códigos son todos EAN-13 válidos)
+        """
+        return (
+            self.constantes.VALIDAR_DIGITO_CONTROL
+            and bool(self.boletos)
+            and self.codigos_ean13_invalidos == 0
+        )
+
     def buscar_boleto(self, codigo: str) -> Optional[Boleto]:
         """Busca un boleto por su código"""
         return self.boletos.get(str(codigo).strip())
 
+    def _obtener_indice_codigos(self) -> IndiceCodigos:
+        """Retorna el índice de prefijos/sufijos, armándolo si hace falta"""
+        indice = self._indice_codigos
+        if indice is None:
+            with self._lock_indice_codigos:
+                indice = self._indice_codigos
+                if indice is None:
+                    indice = self._indice_codigos = IndiceCodigos(list(self.boletos))
+        return indice
+
+    def contar_codigos_parciales(self, digitos: str, por_sufijo: bool = False) -> int:
+        """
+        Cantidad de boletos cuyo código empieza (o termina) con los dígitos.
+
+        Args:
+            digitos: Dígitos leídos del boleto
+            por_sufijo: Buscar por terminación en lugar de por inicio
+        """
+        digitos = "".join(filter(str.isdigit, str(digitos)))
+        if not digitos:
+            return 0
+        return self._obtener_indice_codigos().contar(digitos, por_sufijo)
+
+    def buscar_codigos_parciales(
+        self,
+        digitos: str,
+        inicio: int = 0,
+        cantidad: int = 50,
+        por_sufijo: bool = False,
+    ) -> List[Boleto]:
+        """
+        Busca boletos por los dígitos que se alcanzan a leer del código.
+
+        Args:
+            digitos: Dígitos leídos del boleto
+            inicio: Número de coincidencia desde el que empieza la página
+            cantidad: Tamaño de la página
+            por_sufijo: Buscar por terminación en lugar de por inicio
+
+        Returns:
+            Lista de boletos que coinciden
+        """
+        digitos = "".join(filter(str.isdigit, str(digitos)))
+        if not digitos:
+            return []
+        codigos = self._obtener_indice_codigos().pagina(
+            digitos, inicio, cantidad, por_sufijo
+        )
+        return [self.boletos[codigo] for codigo in codigos]
+
+    def sugerir_codigos(self, codigo_escaneado: str, maximo: int = 5) -> List[str]:
+        """
+        Códigos del reporte que difieren en un solo dígito del escaneado.
+
+        Args:
+            codigo_escaneado: Código tal como llegó del lector
+            maximo: Cantidad máxima de sugerencias
+
+        Returns:
+            Lista de códigos sugeridos (vacía si no hay ninguno)
+        """
+        return sugerir_codigos(
+            self._normalizar_codigo(codigo_escaneado), self.boletos, maximo
+        )
+
+    def _normalizar_codigo(self, codigo_escaneado: str) -> str:
+        """Deja solo dígitos y conserva los últimos N caracteres del código"""
+        longitud = self.constantes.LONGITUD_CODIGO_BARRAS
+        solo_digitos = "".join(filter(str.isdigit, str(codigo_escaneado)))
+        if len(solo_digitos) >= longitud:
+            return solo_digitos[-longitud:]
+        return solo_digitos
+
+    @medir("sesion.procesar_escaneo")
     def procesar_escaneo(self, codigo_escaneado: str) -> Dict[str, Any]:
-        from inventario_boletos.config.constants import AppConstants
+        """
+        Procesa un código escaneado y actualiza el estado del boleto.
+
+        Es seguro llamarlo desde varios hilos a la vez (lector de teclado y
+        estaciones de red): el cambio de estado del boleto y el ajuste de los
+        contadores ocurren en una sola sección crítica (_lock_estadisticas y
+        luego el lock de la franja del código), así que un recálculo de
+        índices nunca ve uno sin el otro. La búsqueda y las consultas al
+        registro de validados se hacen antes, sin locks.
+        """
+        resultado, validacion = self._evaluar_escaneo(codigo_escaneado)
 
-        constantes = AppConstants()
+        with self._lock_estadisticas:
+            self._registrar_escaneo(resultado, validacion)
+        self._escribir_registro()
 
-        # Procesar código: solo dígitos, últimos N caracteres
-        solo_digitos = "".join(filter(str.isdigit, codigo_escaneado))
-        if len(solo_digitos) >= constantes.LONGITUD_CODIGO_BARRAS:
-            codigo_buscado = solo_digitos[-constantes.LONGITUD_CODIGO_BARRAS :]
-        else:
-            codigo_buscado = solo_digitos
+        return resultado
+
+    @medir("sesion.procesar_escaneos_lote")
+    def procesar_escaneos_lote(
+        self, codigos: List[str], remoto: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Procesa varios códigos en el orden recibido.
+
+        Equivale a llamar procesar_escaneo por cada código, pero toma el lock
+        de contadores una sola vez para todo el lote.
+
+        Args:
+            codigos: Códigos escaneados
+            remoto: Escaneos de otra estación (servidor de red): se anotan en
+                el diario pero no entran al historial de deshacer local
+
+        Returns:
+            Lista de resultados, uno por código y en el mismo orden
+        """
+        evaluados = [self._evaluar_escaneo(codigo) for codigo in codigos]
+
+        with self._lock_estadisticas:
+            for resultado, validacion in evaluados:
+                self._registrar_escaneo(resultado, validacion, remoto)
+        self._escribir_registro()
 
-        # Resto del método igual, usando codigo_buscado en lugar de codigo_escaneado
-        codigo = str(codigo_buscado).strip()
-        ###########################################################
+        return [resultado for resultado, _ in evaluados]
+
+    def _evaluar_escaneo(self, codigo_escaneado: str):
+        """
+        Normaliza y busca el código, sin locks. Un boleto del reporte queda
+        con "resultado" en None: éxito o duplicado se decide al registrarlo.
 
+        Returns:
+            Tuple (resultado, validación en otra sesión o None)
+        """
+        codigo = self._normalizar_codigo(codigo_escaneado)
         timestamp = datetime.now()
 
+        # Lectura dañada: se descarta sin tocar el índice de códigos
+        if self.valida_digito_control and not es_ean13_valido(codigo):
+            resultado = {
+                "resultado": ResultadoEscaneo.LECTURA_INVALIDA,
+                "boleto": None,
+                "mensaje": f"Lectura inválida {codigo}: dígito de control incorrecto",
+                "timestamp": timestamp,
+                "fue_duplicado": False,
+                # Un dígito mal leído: los vecinos del reporte son candidatos
+                "sugerencias": self.sugerir_codigos(codigo),
+            }
+            return resultado, None
+
         # Buscar boleto
         boleto = self.buscar_boleto(codigo)
 
-        if boleto:
-            if boleto.fue_escaneado or boleto.es_duplicado:
-                # Boleto duplicado - NO aumentar contador
-                resultado = {
-                    "resultado": ResultadoEscaneo.DUPLICADO,
-                    "boleto": boleto,
-                    "mensaje": f"Boleto {codigo} ya fue escaneado anteriormente",
-                    "timestamp": timestamp,
-                    "fue_duplicado": True,
-                }
-                # NO llamar a marcar_escaneado() - mantener contador actual
-            else:
-                # Boleto encontrado por primera vez
-                boleto.marcar_escaneado()  # Esto sí aumenta contador a 1
-                resultado = {
-                    "resultado": ResultadoEscaneo.EXITO,
-                    "boleto": boleto,
-                    "mensaje": f"Boleto {codigo} escaneado correctamente",
-                    "timestamp": timestamp,
-                    "fue_duplicado": False,
-                }
-        else:
+        if boleto is None:
             # Boleto no encontrado - NO crear objeto Boleto ni contar
             resultado = {
                 "resultado": ResultadoEscaneo.NO_ENCONTRADO,
@@ -261,24 +703,533 @@ class SesionInventario:
                 "mensaje": f"Boleto {codigo} no encontrado en el reporte",
                 "timestamp": timestamp,
                 "fue_duplicado": False,
+                # Códigos del reporte a un dígito de distancia (lectura dañada)
+                "sugerencias": self.sugerir_codigos(codigo),
             }
+            return resultado, None
+
+        # Boleto ya pagado en un conteo anterior (posible fraude): se consulta
+        # aquí porque puede leer SQLite; solo cuenta si el escaneo es exitoso
+        validacion = None
+        if not (boleto.fue_escaneado or boleto.es_duplicado):
+            validacion = self._validacion_en_otra_sesion(codigo)
+
+        resultado = {
+            "resultado": None,
+            "boleto": boleto,
+            "mensaje": "",
+            "timestamp": timestamp,
+            "fue_duplicado": False,
+        }
+        return resultado, validacion
+
+    def _decidir_escaneo(
+        self, resultado: Dict[str, Any], validacion: Optional[Dict[str, Any]]
+    ) -> Optional[CambioEstado]:
+        """
+        Marca el boleto si es su primer escaneo y completa el resultado.
+        Debe llamarse con _lock_estadisticas adquirido.
 
-        # Registrar escaneo
+        Returns:
+            CambioEstado del boleto o None si fue duplicado
+        """
+        boleto = resultado["boleto"]
+        codigo = boleto.codigo
+        cambio = None
+
+        with self._lock_de_codigo(codigo):
+            # Con el índice compartido publicado, el byte del boleto decide: si
+            # otro proceso ya lo marcó, este escaneo es un duplicado
+            if not (
+                boleto.fue_escaneado or boleto.es_duplicado
+            ) and self._fijar_en_indice_compartido(
+                codigo, boleto.estado, EstadoBoleto.ESCANEADO
+            ):
+                # Boleto encontrado por primera vez
+                estado_anterior = boleto.estado
+                fecha_anterior = boleto.fecha_escaneo
+                escaneos_anterior = boleto.escaneos_realizados
+                boleto.marcar_escaneado()  # Esto sí aumenta contador a 1
+                cambio = CambioEstado(
+                    codigo=codigo,
+                    estado_anterior=estado_anterior,
+                    estado_nuevo=boleto.estado,
+                    fecha_anterior=fecha_anterior,
+                    fecha_nueva=boleto.fecha_escaneo,
+                    escaneos_anterior=escaneos_anterior,
+                    escaneos_nuevo=boleto.escaneos_realizados,
+                )
+
+        if cambio is None:
+            # Boleto duplicado - NO aumentar contador
+            resultado["resultado"] = ResultadoEscaneo.DUPLICADO
+            resultado["mensaje"] = f"Boleto {codigo} ya fue escaneado anteriormente"
+            resultado["fue_duplicado"] = True
+            return None
+
+        resultado["resultado"] = ResultadoEscaneo.EXITO
+        resultado["mensaje"] = f"Boleto {codigo} escaneado correctamente"
+        if validacion:
+            resultado["validado_en_otra_sesion"] = validacion
+            resultado["mensaje"] = (
+                f"Boleto {codigo} ya fue validado el "
+                f"{validacion['fecha_validacion']} en otra sesión"
+            )
+        return cambio
+
+    def _registrar_escaneo(
+        self,
+        resultado: Dict[str, Any],
+        validacion: Optional[Dict[str, Any]],
+        remoto: bool = False,
+    ) -> None:
+        """
+        Decide un escaneo evaluado, lo registra y ajusta los contadores en la
+        misma sección crítica. Un escaneo remoto no se puede deshacer desde
+        esta estación.
+        Debe llamarse con _lock_estadisticas adquirido.
+        """
+        cambio = None
+        if resultado["resultado"] is None:
+            cambio = self._decidir_escaneo(resultado, validacion)
         self.escaneos.append(resultado)
 
-        # Actualizar estadísticas
-        self.actualizar_estadisticas()
+        # Las estadísticas solo cambian en un escaneo exitoso
+        if cambio:
+            boleto = resultado["boleto"]
+            self._registrar_transicion(cambio.estado_anterior, boleto.estado, boleto)
+            if remoto:
+                self.historial.olvidar_rehacer(cambio.codigo)
+            else:
+                self.historial.registrar(cambio)
+            if self.diario:
+                self.diario.anotar("ESCANEO", cambio)
+            self._actualizar_registro(cambio)
 
-        return resultado
+    def _actualizar_registro(self, cambio: CambioEstado) -> None:
+        """
+        Encola el alta o baja del boleto en el registro de validados entre
+        sesiones (sin disco: se llama con _lock_estadisticas adquirido)
+        """
+        if self.registro_validados is None:
+            return
+        if cambio.estado_nuevo == EstadoBoleto.PENDIENTE:
+            self.registro_validados.eliminar(cambio.codigo, self.id_sesion)
+        elif cambio.estado_anterior == EstadoBoleto.PENDIENTE:
+            reporte = self.reporte_de(self.boletos[cambio.codigo])
+            self.registro_validados.registrar(
+                cambio.codigo, self.id_sesion, reporte.nombre if reporte else ""
+            )
+
+    def _actualizar_registro_lote(self, cambios: List[CambioEstado]) -> None:
+        """
+        Como _actualizar_registro para muchos cambios de boletos distintos:
+        las altas se encolan todas juntas
+        """
+        if self.registro_validados is None:
+            return
+        altas = []
+        for cambio in cambios:
+            if (
+                cambio.estado_nuevo != EstadoBoleto.PENDIENTE
+                and cambio.estado_anterior == EstadoBoleto.PENDIENTE
+            ):
+                reporte = self.reporte_de(self.boletos[cambio.codigo])
+                altas.append(
+                    (cambio.codigo, self.id_sesion, reporte.nombre if reporte else "")
+                )
+            else:
+                self._actualizar_registro(cambio)
+        self.registro_validados.registrar_lote(altas)
+
+    def _escribir_registro(self) -> None:
+        """Escribe en disco lo encolado en el registro (sin el lock global)"""
+        if self.registro_validados is not None:
+            self.registro_validados.escribir_si_corresponde()
+
+    def abrir_diario(
+        self, ruta: str, truncar: bool = False, sin_guardar: bool = False
+    ) -> None:
+        """
+        Empieza a anotar cada cambio de estado en un diario (cierra el
+        anterior).
+
+        Args:
+            ruta: Archivo del diario
+            truncar: Vaciarlo en lugar de agregar al final
+            sin_guardar: Diario de una sesión que todavía no tiene progreso
+                guardado; se borra al guardarlo por primera vez
+        """
+        with self._lock_estadisticas:
+            if self.diario:
+                self.diario.cerrar()
+            self.diario = DiarioPersistente(ruta).abrir(truncar=truncar)
+            self.diario_sin_guardar = sin_guardar
+
+    def cerrar_diario(self, borrar_sin_guardar: bool = False) -> None:
+        """
+        Cierra el diario de cambios en disco, si está abierto.
+
+        Args:
+            borrar_sin_guardar: Si es el diario de una sesión sin guardar,
+                borrarlo también (la sesión se descartó)
+        """
+        with self._lock_estadisticas:
+            if self.diario:
+                self.diario.cerrar()
+                if borrar_sin_guardar and self.diario_sin_guardar:
+                    try:
+                        os.remove(self.diario.ruta)
+                    except OSError:
+                        pass
+                self.diario = None
+                self.diario_sin_guardar = False
+
+    def recuperar_diario(self, ruta: str) -> int:
+        """
+        Reaplica sobre esta sesión el diario de una sesión sin guardar del
+        mismo reporte (cierre inesperado) y sigue anotando en él.
+
+        Returns:
+            Cantidad de cambios recuperados
+        """
+        lineas = list(DiarioPersistente.leer(ruta))
+        # Cada cambio reaplicado se vuelve a anotar: el diario queda compacto
+        self.abrir_diario(ruta, truncar=True, sin_guardar=True)
+        aplicados = 0
+        for linea in lineas:
+            boleto = self.boletos.get(linea.get("codigo"))
+            estado = self._estado_de_linea(linea)
+            if boleto is None or estado is None:
+                continue
+            self.restaurar_estado_boleto(
+                boleto, *estado, tipo=linea.get("tipo", "ESCANEO")
+            )
+            aplicados += 1
+        return aplicados
+
+    def _aplicar_cambio(self, cambio: CambioEstado, tipo: str) -> Boleto:
+        """
+        Lleva un boleto al estado nuevo de un cambio (deshacer/rehacer) y
+        ajusta contadores, agregados y pendientes en O(1).
+        Debe llamarse con _lock_estadisticas adquirido.
+        """
+        boleto = self._fijar_cambio(cambio)
+        if self.diario:
+            self.diario.anotar(tipo, cambio)
+        self._actualizar_registro(cambio)
+        return boleto
+
+    def _fijar_cambio(self, cambio: CambioEstado) -> Boleto:
+        """
+        Aplica un cambio al boleto y a los contadores, sin diario ni registro.
+        Debe llamarse con _lock_estadisticas adquirido.
+        """
+        boleto = self.boletos[cambio.codigo]
+        with self._lock_de_codigo(cambio.codigo):
+            estado_actual = boleto.estado
+            boleto.estado = cambio.estado_nuevo
+            boleto.fecha_escaneo = cambio.fecha_nueva
+            boleto.escaneos_realizados = cambio.escaneos_nuevo
+            # Si otro proceso se adelantó, la próxima sincronización lo trae
+            self._fijar_en_indice_compartido(
+                cambio.codigo, estado_actual, cambio.estado_nuevo
+            )
+
+        self._registrar_transicion(estado_actual, cambio.estado_nuevo, boleto)
+        return boleto
+
+    def deshacer_escaneo(self) -> Tuple[bool, str]:
+        """
+        Revierte el último escaneo que cambió el estado de un boleto.
+
+        Returns:
+            Tuple (éxito, mensaje)
+        """
+        with self._lock_estadisticas:
+            cambio = self.historial.tomar_para_deshacer()
+            if cambio is None:
+                return False, "No hay escaneos para deshacer"
+            boleto = self._aplicar_cambio(cambio.invertido(), "DESHACER")
+        self._escribir_registro()
+        return True, f"Deshecho: boleto {boleto.codigo} vuelve a {boleto.estado.value}"
+
+    def rehacer_escaneo(self) -> Tuple[bool, str]:
+        """
+        Vuelve a aplicar el último escaneo deshecho.
+
+        Returns:
+            Tuple (éxito, mensaje)
+        """
+        with self._lock_estadisticas:
+            cambio = self.historial.tomar_para_rehacer()
+            if cambio is None:
+                return False, "No hay escaneos para rehacer"
+            boleto = self._aplicar_cambio(cambio, "REHACER")
+        self._escribir_registro()
+        return True, f"Rehecho: boleto {boleto.codigo} queda {boleto.estado.value}"
 
     def actualizar_estadisticas(self) -> "SesionInventario":
-        """Actualiza las estadísticas de la sesión"""
-        self.estadisticas.actualizar_desde_boletos(list(self.boletos.values()))
+        """Recalcula estadísticas, agregados y pendientes desde los boletos"""
+        with self._lock_estadisticas:
+            self._reconstruir_indices()
         return self
 
+    def _reconstruir_indices(self) -> None:
+        """Rearma contadores, agregados y pendientes (requiere el lock)"""
+        boletos = list(self.boletos.values())
+        self._indice_codigos = None
+        self.estadisticas.actualizar_desde_boletos(boletos)
+        self.agregados.reconstruir(boletos)
+        self.pendientes.reconstruir(boletos)
+        self.version_estadisticas += 1
+        if self.indice_compartido is not None:
+            # Códigos nuevos: se reemplaza el archivo y los adjuntos lo notan
+            try:
+                self._escribir_indice_compartido(self.indice_compartido.ruta)
+            except OSError as e:
+                self.aviso_indice_compartido = (
+                    f"Índice compartido desactivado: no se pudo reescribir ({e})"
+                )
+                self.indice_compartido = None
+                self._estados_compartidos = None
+
+    def _escribir_indice_compartido(self, ruta: str) -> None:
+        """Escribe el índice compartido con los boletos actuales (con el lock)"""
+        from inventario_boletos.core.indice_compartido import IndiceCompartido
+
+        if self.indice_compartido is not None:
+            self.indice_compartido.cerrar()
+        boletos = list(self.boletos.values())
+        self.indice_compartido = IndiceCompartido.crear(
+            ruta,
+            [boleto.codigo for boleto in boletos],
+            [boleto.estado.value for boleto in boletos],
+            filas=[boleto.fila for boleto in boletos],
+            reportes=[boleto.reporte for boleto in boletos],
+        )
+        self._estados_compartidos = self.indice_compartido.estados.copy()
+
+    def publicar_indice_compartido(self, ruta: Optional[str] = None):
+        """
+        Publica los códigos y estados de la sesión en un archivo mapeado en
+        memoria. Otros procesos se adjuntan con IndiceCompartido(ruta) sin
+        cargar el reporte; desde aquí cada cambio de estado se refleja en él.
+
+        Args:
+            ruta: Archivo del índice (por defecto junto al reporte original)
+
+        Returns:
+            Tuple (éxito, mensaje)
+        """
+        if ruta is None:
+            if not self.ruta_reporte_original:
+                return False, "No hay reporte para ubicar el índice compartido"
+            ruta = self.ruta_reporte_original + self.constantes.SUFIJO_INDICE_COMPARTIDO
+
+        try:
+            with self._lock_estadisticas:
+                self._escribir_indice_compartido(ruta)
+            return True, f"Índice compartido publicado: {ruta}"
+        except (OSError, ValueError) as e:
+            self.indice_compartido = None
+            return False, f"Error al publicar índice compartido: {str(e)}"
+
+    def sincronizar_indice_compartido(self) -> int:
+        """
+        Trae a la sesión los escaneos que otros procesos marcaron en el índice
+        compartido (IndiceCompartido.marcar_escaneo). Compara los estados del
+        archivo con los vistos por última vez, sin recorrer todos los boletos.
+        Cada cambio traído se anota en el diario y en el registro de
+        validados como un escaneo remoto (no se deshace desde aquí).
+
+        Returns:
+            Cantidad de boletos actualizados
+        """
+        import numpy as np
+
+        from inventario_boletos.core.indice_compartido import ESTADOS
+
+        if self.indice_compartido is None:
+            return 0
+
+        actualizados = 0
+        with self._lock_estadisticas:
+            indice = self.indice_compartido
+            cambiados = np.flatnonzero(indice.estados != self._estados_compartidos)
+            ahora = datetime.now()
+            for posicion in cambiados.tolist():
+                boleto = self.boletos.get(indice.codigo_en(posicion))
+                self._estados_compartidos[posicion] = indice.estados[posicion]
+                if boleto is None:
+                    continue
+                with self._lock_de_codigo(boleto.codigo):
+                    estado = EstadoBoleto(ESTADOS[self._estados_compartidos[posicion]])
+                    if boleto.estado == estado:
+                        continue
+                    fecha, escaneos = boleto.fecha_escaneo, boleto.escaneos_realizados
+                    if estado == EstadoBoleto.PENDIENTE:
+                        fecha, escaneos = None, 0
+                    elif boleto.estado == EstadoBoleto.PENDIENTE:
+                        fecha, escaneos = ahora, 1
+                    cambio = CambioEstado(
+                        codigo=boleto.codigo,
+                        estado_anterior=boleto.estado,
+                        estado_nuevo=estado,
+                        fecha_anterior=boleto.fecha_escaneo,
+                        fecha_nueva=fecha,
+                        escaneos_anterior=boleto.escaneos_realizados,
+                        escaneos_nuevo=escaneos,
+                    )
+                    boleto.estado = estado
+                    boleto.fecha_escaneo = cambio.fecha_nueva
+                    boleto.escaneos_realizados = cambio.escaneos_nuevo
+                self._registrar_transicion(cambio.estado_anterior, estado, boleto)
+                self.historial.olvidar_rehacer(cambio.codigo)
+                if self.diario:
+                    self.diario.anotar("INDICE", cambio)
+                self._actualizar_registro(cambio)
+                actualizados += 1
+        self._escribir_registro()
+        return actualizados
+
+    def cerrar_indice_compartido(self) -> None:
+        """Deja de reflejar cambios en el índice compartido y lo suelta"""
+        with self._lock_estadisticas:
+            if self.indice_compartido is not None:
+                self.indice_compartido.cerrar()
+                self.indice_compartido = None
+                self._estados_compartidos = None
+
+    def restaurar_estado_boleto(
+        self,
+        boleto: Boleto,
+        estado: EstadoBoleto,
+        fecha_escaneo: Optional[datetime] = None,
+        escaneos_realizados: Optional[int] = None,
+        tipo: str = "FUSION",
+    ) -> "SesionInventario":
+        """
+        Fija el estado de un boleto que viene de otra fuente (progreso de otra
+        estación, fusión). Pasa por el mismo camino que deshacer/rehacer:
+        lock del boleto, contadores, diario y registro de validados.
+        """
+        self.restaurar_estados_lote(
+            [(boleto, estado, fecha_escaneo, escaneos_realizados)], tipo
+        )
+        return self
+
+    def restaurar_estados_lote(
+        self,
+        estados: List[
+            Tuple[Boleto, EstadoBoleto, Optional[datetime], Optional[int]]
+        ],
+        tipo: str = "FUSION",
+    ) -> int:
+        """
+        Como restaurar_estado_boleto para muchos boletos (un cambio por
+        boleto) en una sola sección crítica: el diario se escribe de una vez
+        y las altas del registro de validados se encolan juntas.
+
+        Args:
+            estados: Tuplas (boleto, estado, fecha de escaneo, escaneos; None
+                conserva los del boleto)
+            tipo: Tipo de las líneas del diario
+
+        Returns:
+            Cantidad de boletos actualizados
+        """
+        cambios = []
+        with self._lock_estadisticas:
+            for boleto, estado, fecha_escaneo, escaneos_realizados in estados:
+                with self._lock_de_codigo(boleto.codigo):
+                    cambio = CambioEstado(
+                        codigo=boleto.codigo,
+                        estado_anterior=boleto.estado,
+                        estado_nuevo=estado,
+                        fecha_anterior=boleto.fecha_escaneo,
+                        fecha_nueva=fecha_escaneo,
+                        escaneos_anterior=boleto.escaneos_realizados,
+                        escaneos_nuevo=(
+                            boleto.escaneos_realizados
+                            if escaneos_realizados is None
+                            else escaneos_realizados
+                        ),
+                    )
+                self._fijar_cambio(cambio)
+                cambios.append(cambio)
+            if self.diario:
+                self.diario.anotar_lote(tipo, cambios)
+            self._actualizar_registro_lote(cambios)
+        self._escribir_registro()
+        return len(cambios)
+
+    def obtener_agregados(
+        self,
+        dimension: str = "sucursal",
+        ordenar_por: str = "clave",
+        descendente: bool = False,
+        limite: Optional[int] = None,
+    ) -> List[AgregadoGrupo]:
+        """
+        Retorna el avance por grupo ("sucursal", "vendedor" o "tipo_premio"):
+        total, escaneados, duplicados, pendientes y montos de premio.
+        """
+        with self._lock_estadisticas:
+            return self.agregados.consultar(dimension, ordenar_por, descendente, limite)
+
+    @property
+    def totales_premios(self) -> AgregadoGrupo:
+        """Valor reportado, validado y pendiente de toda la sesión (O(1))"""
+        with self._lock_estadisticas:
+            return replace(self.agregados.general)
+
+    def obtener_conciliacion(self) -> Dict[str, Any]:
+        """
+        Valor validado contra valor reportado, general, por tipo de premio
+        y por PDV, en centavos exactos.
+        """
+        with self._lock_estadisticas:
+            return self.agregados.conciliacion()
+
     def obtener_boletos_faltantes(self) -> List[Boleto]:
-        """Retorna lista de boletos pendientes de escanear"""
-        return [b for b in self.boletos.values() if b.estado == EstadoBoleto.PENDIENTE]
+        """Retorna lista de boletos pendientes de escanear, en orden del reporte"""
+        with self._lock_estadisticas:
+            return list(self.pendientes.general)
+
+    def contar_faltantes(self, sucursal: Optional[str] = None) -> int:
+        """Cantidad de boletos pendientes, en total o de un PDV (O(1))"""
+        with self._lock_estadisticas:
+            return self.pendientes.contar(sucursal)
+
+    def obtener_pagina_faltantes(
+        self,
+        inicio: int,
+        cantidad: int,
+        sucursal: Optional[str] = None,
+        agrupado_por_sucursal: bool = False,
+    ) -> List[Boleto]:
+        """
+        Retorna una página de boletos pendientes sin recorrer todo el reporte.
+
+        Args:
+            inicio: Número de pendiente desde el que empieza la página
+            cantidad: Tamaño de la página
+            sucursal: Limitar a un PDV
+            agrupado_por_sucursal: Ordenar por PDV y, dentro, por reporte
+
+        Returns:
+            Lista de boletos
+        """
+        with self._lock_estadisticas:
+            return self.pendientes.pagina(
+                inicio, cantidad, sucursal, agrupado_por_sucursal
+            )
+
+    def obtener_faltantes_por_sucursal(self) -> List[tuple]:
+        """Pares (PDV, pendientes) de los PDV con boletos sin escanear"""
+        with self._lock_estadisticas:
+            return self.pendientes.conteo_por_sucursal()
 
     def finalizar_sesion(self) -> "SesionInventario":
         """Marca la sesión como finalizada"""
@@ -321,6 +1272,8 @@ class SesionInventario:
 
             # Crear nueva sesión
             sesion = SesionInventario()
+            ruta_diario = ruta_json + sesion.constantes.SUFIJO_DIARIO
+            cambios_diario = 0
 
             # Restaurar campos básicos
             sesion.id_sesion = datos.get("id_sesion", sesion.id_sesion)
@@ -342,19 +1295,33 @@ class SesionInventario:
                 except:
                     sesion.fecha_fin = None
 
+            # Restaurar reportes de origen
+            sesion.reportes = [
+                ReporteSesion.from_dict(datos_reporte)
+                for datos_reporte in datos.get("reportes", [])
+            ]
+
             # Restaurar boletos
             if "boletos" in datos and isinstance(datos["boletos"], list):
+                boletos_restaurados = []
                 for boleto_data in datos["boletos"]:
                     # Crear boleto
+                    # Los textos repetitivos (unos cientos de valores distintos)
+                    # se internan: todos los boletos comparten cada cadena
                     boleto = Boleto(
                         codigo=boleto_data.get("codigo", ""),
-                        sucursal=boleto_data.get("sucursal", ""),
-                        vendedor_documento=boleto_data.get("vendedor_documento", ""),
-                        vendedor_nombre=boleto_data.get("vendedor_nombre", ""),
+                        sucursal=sys.intern(boleto_data.get("sucursal", "")),
+                        vendedor_documento=sys.intern(
+                            boleto_data.get("vendedor_documento", "")
+                        ),
+                        vendedor_nombre=sys.intern(
+                            boleto_data.get("vendedor_nombre", "")
+                        ),
                         fecha_pago=boleto_data.get("fecha_pago", ""),
                         monto_premio=float(boleto_data.get("monto_premio", 0.0)),
-                        tipo_premio=boleto_data.get("tipo_premio", ""),
-                        datos_originales=boleto_data.get("datos_originales", {}),
+                        tipo_premio=sys.intern(boleto_data.get("tipo_premio", "")),
+                        reporte=boleto_data.get("reporte", 0),
+                        fila=boleto_data.get("fila", -1),
                     )
 
                     # Restaurar estado
@@ -379,34 +1346,78 @@ class SesionInventario:
                         "escaneos_realizados", 0
                     )
 
-                    # Agregar a la sesión (como diccionario)
-                    sesion.boletos[boleto.codigo] = boleto
+                    boletos_restaurados.append(boleto)
 
-            # Restaurar estadísticas
+                # Cambios posteriores al último guardado (escaneos, deshacer)
+                cambios_diario = cls._reaplicar_diario(boletos_restaurados, ruta_diario)
+
+                # Agregar a la sesión: cuenta estadísticas, agregados y
+                # pendientes con el estado ya restaurado
+                sesion.agregar_boletos(boletos_restaurados)
+
+            # Las estadísticas salen de los boletos; de las guardadas solo se
+            # conserva lo que no se puede recalcular
             if "estadisticas" in datos:
-                stats_data = datos["estadisticas"]
-                sesion.estadisticas = Estadisticas(
-                    total_boletos=stats_data.get("total_boletos", 0),
-                    escaneados=stats_data.get("escaneados", 0),
-                    pendientes=stats_data.get("pendientes", 0),
-                    duplicados=stats_data.get("duplicados", 0),
-                    no_encontrados=stats_data.get("no_encontrados", 0),
+                sesion.estadisticas.no_encontrados = datos["estadisticas"].get(
+                    "no_encontrados", 0
                 )
-            else:
-                # Si no hay estadísticas guardadas, calcularlas
-                sesion.actualizar_estadisticas()
 
-            return True, "Progreso cargado exitosamente", sesion
+            # Los cambios siguientes se agregan al mismo diario
+            sesion.diario = DiarioPersistente(ruta_diario).abrir()
+
+            mensaje = "Progreso cargado exitosamente"
+            if cambios_diario:
+                mensaje += f" ({cambios_diario} cambios recuperados del diario)"
+            return True, mensaje, sesion
 
         except json.JSONDecodeError as e:
             return False, f"Error al leer archivo JSON: {str(e)}", None
         except Exception as e:
             return False, f"Error al cargar progreso: {str(e)}", None
 
+    @staticmethod
+    def _reaplicar_diario(boletos: List[Boleto], ruta_diario: str) -> int:
+        """
+        Aplica en orden las líneas del diario sobre boletos recién leídos
+        del progreso (cada línea trae el estado resultante del boleto).
+
+        Returns:
+            Cantidad de cambios aplicados
+        """
+        por_codigo = {boleto.codigo: boleto for boleto in boletos}
+        aplicados = 0
+        for linea in DiarioPersistente.leer(ruta_diario):
+            boleto = por_codigo.get(linea.get("codigo"))
+            estado = SesionInventario._estado_de_linea(linea)
+            if boleto is None or estado is None:
+                continue
+            boleto.estado, boleto.fecha_escaneo, boleto.escaneos_realizados = estado
+            aplicados += 1
+        return aplicados
+
+    @staticmethod
+    def _estado_de_linea(
+        linea: Dict[str, Any]
+    ) -> Optional[Tuple[EstadoBoleto, Optional[datetime], int]]:
+        """Estado, fecha y escaneos resultantes de una línea del diario"""
+        try:
+            estado = EstadoBoleto[linea.get("estado", "PENDIENTE")]
+        except KeyError:
+            return None
+        fecha = linea.get("fecha_escaneo")
+        try:
+            fecha = datetime.fromisoformat(fecha) if fecha else None
+        except ValueError:
+            fecha = None
+        return estado, fecha, linea.get("escaneos_realizados", 0)
+
     def guardar_progreso_rapido(self, ruta_archivo: str):
         """
         Guarda el progreso actual en un archivo JSON simple.
 
+        Desde ese momento cada cambio de estado se agrega al diario junto al
+        archivo; las líneas ya incluidas en este guardado se descartan.
+
         Returns:
             Tuple (éxito, mensaje)
         """
@@ -414,6 +1425,20 @@ class SesionInventario:
             import json
             import os
 
+            # Marcar el diario antes de leer los boletos: lo anotado hasta la
+            # marca queda en este guardado, lo que llegue después se conserva
+            ruta_diario = ruta_archivo + self.constantes.SUFIJO_DIARIO
+            diario_sin_guardar = None
+            with self._lock_estadisticas:
+                if self.diario is None or self.diario.ruta != ruta_diario:
+                    if self.diario:
+                        self.diario.cerrar()
+                        if self.diario_sin_guardar:
+                            diario_sin_guardar = self.diario.ruta
+                    self.diario = DiarioPersistente(ruta_diario).abrir(truncar=True)
+                    self.diario_sin_guardar = False
+                marca_diario = self.diario.marca()
+
             # Preparar datos para guardar
             datos = {
                 "id_sesion": self.id_sesion,
@@ -441,13 +1466,17 @@ class SesionInventario:
                         if boleto.fecha_escaneo
                         else None,
                         "escaneos_realizados": boleto.escaneos_realizados,
-                        "datos_originales": boleto.datos_originales,
+                        "reporte": boleto.reporte,
+                        "fila": boleto.fila,
                     }
                 )
 
             # Guardar estadísticas
             datos["estadisticas"] = self.estadisticas.to_dict()
 
+            # Reportes de origen de la sesión
+            datos["reportes"] = [reporte.to_dict() for reporte in self.reportes]
+
             # Asegurar que el directorio existe
             directorio = os.path.dirname(ruta_archivo)
             if directorio and not os.path.exists(directorio):
@@ -457,6 +1486,16 @@ class SesionInventario:
             with open(ruta_archivo, "w", encoding="utf-8") as f:
                 json.dump(datos, f, indent=2, ensure_ascii=False)
 
+            with self._lock_estadisticas:
+                self.diario.descartar_hasta(marca_diario)
+
+            # Lo anotado en el diario sin guardar ya está en este progreso
+            if diario_sin_guardar:
+                try:
+                    os.remove(diario_sin_guardar)
+                except OSError:
+                    pass
+
             return True, f"Progreso guardado en {ruta_archivo}"
 
         except Exception as e:
@@ -0,0 +1,316 @@
+"""
+EXPORTACIÓN POR PUNTO DE VENTA
+Agrupa la sesión por PDV en una sola pasada y escribe un archivo por PDV
+(resultados completos o solo faltantes) en procesos separados, más un libro
+índice con los totales de cada PDV
+"""
+
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from inventario_boletos.config.constants import AppConstants
+from inventario_boletos.core.entities import EstadoBoleto, SesionInventario
+
+NOMBRE_INDICE = "INDICE_PDV.xlsx"
+
+# PDV por tarea del pool: los archivos chicos se escriben de a varios para
+# no pagar el envío entre procesos por cada uno
+PDV_POR_TAREA = 8
+
+
+@dataclass
+class ResumenExportacionPDV:
+    """Resultado de exportar una sesión en un archivo por PDV"""
+
+    carpeta: str = ""
+    archivos: Dict[str, str] = field(default_factory=dict)  # PDV -> archivo
+    filas_exportadas: int = 0
+    errores: List[str] = field(default_factory=list)
+    segundos: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convierte el resumen a diccionario"""
+        return {
+            "carpeta": self.carpeta,
+            "archivos": self.archivos,
+            "filas_exportadas": self.filas_exportadas,
+            "errores": self.errores,
+            "segundos": self.segundos,
+        }
+
+    def __str__(self) -> str:
+        return (
+            f"{len(self.archivos)} archivos por PDV en {self.carpeta}: "
+            f"{self.filas_exportadas} boletos, {len(self.errores)} errores "
+            f"({self.segundos:.2f}s)"
+        )
+
+
+def _columnas(constantes: AppConstants) -> List[str]:
+    """Encabezados de cada archivo por PDV (los del reporte + resultados)"""
+    return [
+        constantes.COLUMNA_CODIGO_BARRA,
+        constantes.COLUMNA_SUCURSAL,
+        constantes.COLUMNA_VENDEDOR_DOC,
+        constantes.COLUMNA_VENDEDOR_NOMBRE,
+        constantes.COLUMNA_FECHA_PAGO,
+        constantes.COLUMNA_MONTO_PREMIO,
+        constantes.COLUMNA_TIPO_PREMIO,
+        constantes.COLUMNA_VALIDADO,
+        constantes.COLUMNA_ESTADO_ESCANEO,
+        constantes.COLUMNA_HORA_ESCANEO,
+    ]
+
+
+def agrupar_por_pdv(
+    sesion: SesionInventario, solo_faltantes: bool = False
+) -> Dict[str, List[tuple]]:
+    """
+    Recorre los boletos una vez y arma las filas de cada PDV, en el orden
+    del reporte.
+
+    Args:
+        sesion: Sesión a exportar
+        solo_faltantes: Incluir solo los boletos pendientes
+
+    Returns:
+        Diccionario PDV -> filas (tuplas en el orden de _columnas)
+    """
+    grupos: Dict[str, List[tuple]] = {}
+    for boleto in sesion.boletos.values():
+        if solo_faltantes and boleto.estado != EstadoBoleto.PENDIENTE:
+            continue
+        filas = grupos.get(boleto.sucursal)
+        if filas is None:
+            filas = grupos[boleto.sucursal] = []
+        filas.append(
+            (
+                boleto.codigo,
+                boleto.sucursal,
+                boleto.vendedor_documento,
+                boleto.vendedor_nombre,
+                boleto.fecha_pago,
+                boleto.monto_premio,
+                boleto.tipo_premio,
+                "OK" if boleto.estado == EstadoBoleto.ESCANEADO else "",
+                boleto.estado.value,
+                boleto.fecha_escaneo,
+            )
+        )
+    return grupos
+
+
+def _nombres_de_archivo(
+    pdvs: List[str], prefijo: str, extension: str
+) -> Dict[str, str]:
+    """Nombre de archivo válido y único para cada PDV"""
+    nombres: Dict[str, str] = {}
+    usados = set()
+    for pdv in pdvs:
+        base = re.sub(r"[^\w\-]+", "_", pdv).strip("_")[:80] or "SIN_PDV"
+        nombre = f"{prefijo}_{base}{extension}"
+        repeticion = 2
+        while nombre.lower() in usados:
+            nombre = f"{prefijo}_{base}_{repeticion}{extension}"
+            repeticion += 1
+        usados.add(nombre.lower())
+        nombres[pdv] = nombre
+    return nombres
+
+
+def _escribir_lote(
+    tareas: List[Tuple[str, List[tuple]]], columnas: List[str], encoding: str
+) -> List[Tuple[str, int, Optional[str]]]:
+    """
+    Escribe los archivos de varios PDV (se ejecuta en un proceso del pool).
+    Usa openpyxl en modo solo escritura y csv directamente: los procesos
+    hijos no necesitan importar pandas.
+
+    Returns:
+        Lista de (ruta, filas escritas, error o None)
+    """
+    resultados = []
+    for ruta, filas in tareas:
+        try:
+            if ruta.lower().endswith(".csv"):
+                with open(ruta, "w", newline="", encoding=encoding) as f:
+                    escritor = csv.writer(f)
+                    escritor.writerow(columnas)
+                    escritor.writerows(filas)
+            else:
+                from openpyxl import Workbook
+
+                libro = Workbook(write_only=True)
+                hoja = libro.create_sheet()
+                hoja.append(columnas)
+                for fila in filas:
+                    hoja.append(fila)
+                libro.save(ruta)
+            resultados.append((ruta, len(filas), None))
+        except Exception as e:
+            resultados.append((ruta, 0, str(e)))
+    return resultados
+
+
+def _escribir_lotes(
+    lotes: List[List[Tuple[str, List[tuple]]]],
+    columnas: List[str],
+    encoding: str,
+    paralelo: bool,
+) -> Iterator[Tuple[str, int, Optional[str]]]:
+    """Escribe los lotes, en procesos separados si es posible"""
+    # En un ejecutable congelado (PyInstaller) los procesos hijos relanzarían
+    # la aplicación completa: escribir en el mismo proceso
+    if not paralelo or len(lotes) < 2 or getattr(sys, "frozen", False):
+        for lote in lotes:
+            yield from _escribir_lote(lote, columnas, encoding)
+        return
+
+    trabajadores = min(len(lotes), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=trabajadores) as ejecutor:
+        for resultados in ejecutor.map(
+            _escribir_lote,
+            lotes,
+            [columnas] * len(lotes),
+            [encoding] * len(lotes),
+        ):
+            yield from resultados
+
+
+def _escribir_indice(
+    sesion: SesionInventario, ruta: str, archivos: Dict[str, str]
+) -> None:
+    """Libro índice: una fila por PDV con sus totales y su archivo"""
+    import pandas as pd
+
+    filas = [
+        {
+            "PDV": grupo.clave,
+            "ARCHIVO": archivos.get(grupo.clave, ""),
+            "TOTAL BOLETOS": grupo.total,
+            "ESCANEADOS": grupo.escaneados,
+            "DUPLICADOS": grupo.duplicados,
+            "PENDIENTES": grupo.pendientes,
+            "MONTO TOTAL": float(grupo.monto_total),
+            "MONTO PENDIENTE": float(grupo.monto_pendiente),
+        }
+        for grupo in sesion.obtener_agregados("sucursal")
+    ]
+    pd.DataFrame(filas).to_excel(ruta, index=False)
+
+
+def exportar_por_pdv(
+    sesion: SesionInventario,
+    carpeta: str,
+    solo_faltantes: bool = False,
+    extension: str = ".xlsx",
+    paralelo: bool = True,
+) -> Tuple[bool, str, ResumenExportacionPDV]:
+    """
+    Escribe un archivo por PDV y el libro índice INDICE_PDV.xlsx.
+
+    Args:
+        sesion: Sesión a exportar
+        carpeta: Carpeta destino (se crea si no existe)
+        solo_faltantes: Exportar solo los boletos pendientes (los PDV sin
+            faltantes no generan archivo)
+        extension: ".xlsx" o ".csv"
+        paralelo: Escribir los archivos en procesos separados
+
+    Returns:
+        Tuple (éxito, mensaje, resumen)
+    """
+    inicio = time.perf_counter()
+    resumen = ResumenExportacionPDV(carpeta=carpeta)
+    constantes = AppConstants()
+
+    if not sesion.boletos:
+        return False, "No hay boletos para exportar", resumen
+    if extension not in (".xlsx", ".csv"):
+        mensaje = f"Formato no soportado para exportar por PDV: {extension}"
+        return False, mensaje, resumen
+
+    try:
+        os.makedirs(carpeta, exist_ok=True)
+
+        grupos = agrupar_por_pdv(sesion, solo_faltantes)
+        prefijo = "FALTANTES" if solo_faltantes else "RESULTADOS"
+        nombres = _nombres_de_archivo(list(grupos), prefijo, extension)
+        pdv_por_ruta = {
+            os.path.join(carpeta, nombre): pdv for pdv, nombre in nombres.items()
+        }
+
+        tareas = [
+            (os.path.join(carpeta, nombres[pdv]), filas)
+            for pdv, filas in grupos.items()
+        ]
+        lotes = [
+            tareas[i : i + PDV_POR_TAREA] for i in range(0, len(tareas), PDV_POR_TAREA)
+        ]
+
+        for ruta, filas, error in _escribir_lotes(
+            lotes, _columnas(constantes), constantes.ENCODING, paralelo
+        ):
+            if error:
+                resumen.errores.append(f"{os.path.basename(ruta)}: {error}")
+            else:
+                resumen.archivos[pdv_por_ruta[ruta]] = os.path.basename(ruta)
+                resumen.filas_exportadas += filas
+
+        _escribir_indice(
+            sesion, os.path.join(carpeta, NOMBRE_INDICE), resumen.archivos
+        )
+    except Exception as e:
+        resumen.errores.append(str(e))
+        resumen.segundos = round(time.perf_counter() - inicio, 3)
+        return False, f"Error al exportar por PDV: {str(e)}", resumen
+
+    resumen.segundos = round(time.perf_counter() - inicio, 3)
+    return not resumen.errores, str(resumen), resumen
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(
+        description="Exporta un progreso guardado en un archivo por PDV"
+    )
+    parser.add_argument("progreso", help="Progreso JSON (guardar_progreso_rapido)")
+    parser.add_argument("-o", "--carpeta", required=True, help="Carpeta destino")
+    parser.add_argument(
+        "--faltantes", action="store_true", help="Exportar solo los pendientes"
+    )
+    parser.add_argument(
+        "--csv", action="store_true", help="Archivos CSV en vez de Excel"
+    )
+    parser.add_argument(
+        "--secuencial", action="store_true", help="Escribir los archivos uno por uno"
+    )
+    args = parser.parse_args(argv)
+
+    exito, mensaje, sesion = SesionInventario.cargar_progreso_rapido(args.progreso)
+    if not exito:
+        raise SystemExit(mensaje)
+
+    exito, mensaje, resumen = exportar_por_pdv(
+        sesion,
+        args.carpeta,
+        solo_faltantes=args.faltantes,
+        extension=".csv" if args.csv else ".xlsx",
+        paralelo=not args.secuencial,
+    )
+    print(mensaje)
+    for error in resumen.errores:
+        print(f"  • {error}")
+    if not exito:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+"""
+FUSIÓN DE PROGRESOS DE VARIAS ESTACIONES
+Une N archivos de progreso JSON (guardar_progreso_rapido) sobre un mismo
+reporte: gana el escaneo más antiguo, las repeticiones entre estaciones se
+cuentan como duplicados y se informan los conflictos
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from inventario_boletos.core.entities import EstadoBoleto, SesionInventario
+
+
+# Inicio de la lista de boletos dentro del JSON de progreso
+_PATRON_BOLETOS = re.compile(r'"boletos"\s*:\s*\[')
+
+# Conflictos guardados con detalle (el resto solo se cuenta)
+MAX_CONFLICTOS_DETALLADOS = 200
+
+# Estados de progreso que significan "este boleto se escaneó en la estación"
+_ESTADOS_ESCANEADOS = (EstadoBoleto.ESCANEADO.value, EstadoBoleto.DUPLICADO.value)
+
+# Formato que escribe guardar_progreso_rapido (indent=2): cada boleto abre y
+# cierra con 4 espacios y sus campos van con 6. JSON no admite saltos de línea
+# dentro de cadenas, así que estas marcas delimitan los boletos sin ambigüedad
+_INICIO_BOLETO = "\n    {"
+_FIN_BOLETO = "\n    }"
+_PATRON_ESTADO_ESCANEADO = re.compile(
+    r'\n      "estado": "(?:ESCANEADO|DUPLICADO)"'
+)
+
+
+class LectorProgreso:
+    """
+    Lee un archivo de progreso JSON sin cargarlo completo en memoria.
+
+    La cabecera (id_sesion, ruta_reporte_original, ...) se interpreta al
+    abrir; los boletos se entregan uno a uno con boletos().
+    """
+
+    def __init__(self, ruta_json: str, tamano_bloque: int = 1 << 20):
+        self.ruta_json = ruta_json
+        self.tamano_bloque = tamano_bloque
+        self.cabecera: Dict[str, Any] = {}
+
+    def _leer_cabecera(self, texto: str) -> None:
+        """Extrae los campos simples que preceden a la lista de boletos"""
+        for clave in ("id_sesion", "fecha_inicio", "fecha_fin", "ruta_reporte_original"):
+            encontrado = re.search(
+                rf'"{clave}"\s*:\s*("(?:[^"\\]|\\.)*"|null)', texto
+            )
+            if encontrado:
+                self.cabecera[clave] = json.loads(encontrado.group(1))
+
+    def _abrir_lista(self, f) -> str:
+        """Avanza hasta el inicio de la lista de boletos y lee la cabecera"""
+        buffer = ""
+        while True:
+            bloque = f.read(self.tamano_bloque)
+            if not bloque:
+                raise ValueError("El archivo no contiene una lista de boletos")
+            buffer += bloque
+            inicio_lista = _PATRON_BOLETOS.search(buffer)
+            if inicio_lista:
+                self._leer_cabecera(buffer[: inicio_lista.start()])
+                return buffer[inicio_lista.end() :]
+
+    def boletos(self) -> Iterator[Dict[str, Any]]:
+        """Genera los diccionarios de boleto en el orden del archivo"""
+        with open(self.ruta_json, "r", encoding="utf-8") as f:
+            yield from self._boletos_desde(f, self._abrir_lista(f))
+
+    def _boletos_desde(self, f, buffer: str) -> Iterator[Dict[str, Any]]:
+        """Decodifica los boletos uno a uno a partir del buffer dado"""
+        decodificador = json.JSONDecoder()
+        pos = 0
+        while True:
+            # Saltar separadores entre objetos
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+
+            if pos >= len(buffer):
+                bloque = f.read(self.tamano_bloque)
+                if not bloque:
+                    raise ValueError("Lista de boletos incompleta")
+                buffer, pos = buffer[pos:] + bloque, 0
+                continue
+
+            if buffer[pos] == "]":
+                return
+
+            try:
+                boleto, pos = decodificador.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Objeto partido entre bloques: leer más y reintentar
+                bloque = f.read(self.tamano_bloque)
+                if not bloque:
+                    raise
+                buffer, pos = buffer[pos:] + bloque, 0
+                continue
+
+            yield boleto
+
+    def boletos_escaneados(self) -> Iterator[Dict[str, Any]]:
+        """
+        Genera solo los boletos escaneados o duplicados.
+
+        Con el formato de guardar_progreso_rapido localiza el estado por texto
+        y decodifica únicamente esos boletos; los pendientes (la mayoría) no se
+        interpretan. Con cualquier otro formato recorre todos los boletos.
+        """
+        with open(self.ruta_json, "r", encoding="utf-8") as f:
+            buffer = self._abrir_lista(f)
+            while len(buffer) < len(_INICIO_BOLETO):
+                bloque = f.read(self.tamano_bloque)
+                if not bloque:
+                    break
+                buffer += bloque
+
+            if not buffer.startswith(_INICIO_BOLETO):
+                for boleto in self._boletos_desde(f, buffer):
+                    if boleto.get("estado") in _ESTADOS_ESCANEADOS:
+                        yield boleto
+                return
+
+            while True:
+                bloque = f.read(self.tamano_bloque)
+                buffer += bloque
+
+                # Procesar hasta el último boleto completo del buffer
+                if bloque:
+                    corte = buffer.rfind(_FIN_BOLETO)
+                    if corte == -1:
+                        continue
+                    corte += len(_FIN_BOLETO)
+                else:
+                    corte = len(buffer)
+
+                completos, buffer = buffer[:corte], buffer[corte:]
+
+                for estado in _PATRON_ESTADO_ESCANEADO.finditer(completos):
+                    inicio = completos.rfind(_INICIO_BOLETO, 0, estado.start())
+                    fin = completos.find(_FIN_BOLETO, estado.end()) + len(_FIN_BOLETO)
+                    yield json.loads(completos[inicio:fin])
+
+                if not bloque:
+                    return
+
+
+def _leer_escaneados(ruta_json: str) -> Dict[str, Any]:
+    """
+    Lee un progreso y conserva solo lo necesario de los boletos escaneados.
+    Se ejecuta en un proceso aparte por archivo.
+    """
+    try:
+        lector = LectorProgreso(ruta_json)
+        escaneados = [
+            (
+                str(boleto.get("codigo", "")).strip(),
+                boleto.get("fecha_escaneo"),
+                boleto.get("sucursal", ""),
+                boleto.get("monto_premio", 0.0),
+            )
+            for boleto in lector.boletos_escaneados()
+        ]
+        return {
+            "ruta": ruta_json,
+            "cabecera": lector.cabecera,
+            "escaneados": escaneados,
+            "error": None,
+        }
+    except Exception as e:
+        return {"ruta": ruta_json, "cabecera": {}, "escaneados": [], "error": str(e)}
+
+
+@dataclass
+class ResumenFusion:
+    """Resultado de fusionar varios progresos sobre una sesión"""
+
+    archivos: List[str] = field(default_factory=list)
+    archivos_con_error: int = 0
+    escaneados_por_archivo: Dict[str, int] = field(default_factory=dict)
+    escaneados_nuevos: int = 0
+    duplicados_entre_estaciones: int = 0
+    no_encontrados: int = 0
+    total_conflictos: int = 0
+    conflictos: List[str] = field(default_factory=list)
+    segundos: float = 0.0
+
+    def agregar_conflicto(self, descripcion: str) -> None:
+        """Registra un conflicto (solo los primeros se guardan con detalle)"""
+        self.total_conflictos += 1
+        if len(self.conflictos) < MAX_CONFLICTOS_DETALLADOS:
+            self.conflictos.append(descripcion)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convierte el resumen a diccionario"""
+        return {
+            "archivos": self.archivos,
+            "archivos_con_error": self.archivos_con_error,
+            "escaneados_por_archivo": self.escaneados_por_archivo,
+            "escaneados_nuevos": self.escaneados_nuevos,
+            "duplicados_entre_estaciones": self.duplicados_entre_estaciones,
+            "no_encontrados": self.no_encontrados,
+            "total_conflictos": self.total_conflictos,
+            "conflictos": self.conflictos,
+            "segundos": self.segundos,
+        }
+
+    def __str__(self) -> str:
+        return (
+            f"Fusión de {len(self.archivos)} progresos: "
+            f"{self.escaneados_nuevos} escaneados nuevos, "
+            f"{self.duplicados_entre_estaciones} duplicados entre estaciones, "
+            f"{self.total_conflictos} conflictos ({self.segundos:.2f}s)"
+        )
+
+
+def _leer_progresos(rutas: List[str], paralelo: bool) -> Iterator[Dict[str, Any]]:
+    """Lee los progresos, en procesos separados si es posible"""
+    # En un ejecutable congelado (PyInstaller) los procesos hijos relanzarían
+    # la aplicación completa: leer en el mismo proceso
+    if not paralelo or len(rutas) < 2 or getattr(sys, "frozen", False):
+        for ruta in rutas:
+            yield _leer_escaneados(ruta)
+        return
+
+    trabajadores = min(len(rutas), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=trabajadores) as ejecutor:
+        futuros = [ejecutor.submit(_leer_escaneados, ruta) for ruta in rutas]
+        for futuro in as_completed(futuros):
+            yield futuro.result()
+
+
+def _convertir_fecha(texto: Optional[str]) -> Optional[datetime]:
+    """Convierte una fecha ISO del progreso (None si falta o es inválida)"""
+    if not texto:
+        return None
+    try:
+        return datetime.fromisoformat(texto)
+    except (TypeError, ValueError):
+        return None
+
+
+def fusionar_progresos(
+    sesion: SesionInventario, rutas_progreso: List[str], paralelo: bool = True
+) -> Tuple[bool, str, ResumenFusion]:
+    """
+    Une varios progresos JSON sobre una sesión cargada desde el reporte.
+
+    Para cada boleto gana el escaneo más antiguo (incluidos los que ya tenía
+    la sesión). Si el mismo boleto aparece escaneado en más de una fuente se
+    cuenta como duplicado entre estaciones. Son conflictos: archivos de otro
+    reporte, códigos que no están en el reporte y datos que no coinciden.
+
+    Args:
+        sesion: Sesión destino (se modifica en el lugar)
+        rutas_progreso: Archivos JSON de cada estación
+        paralelo: Leer los archivos en procesos separados
+
+    Returns:
+        Tuple (éxito, mensaje, resumen)
+    """
+    inicio = time.perf_counter()
+    resumen = ResumenFusion(archivos=list(rutas_progreso))
+
+    if not rutas_progreso:
+        return False, "No se seleccionaron archivos de progreso", resumen
+
+    # Códigos ya validados por alguna fuente (la propia sesión incluida)
+    vistos = {
+        codigo
+        for codigo, boleto in sesion.boletos.items()
+        if boleto.estado != EstadoBoleto.PENDIENTE
+    }
+    reporte_sesion = os.path.basename(sesion.ruta_reporte_original or "")
+    # Estado final de cada boleto que cambia: se aplica todo junto al final
+    # (estado, fecha de escaneo, escaneos; None conserva los del boleto)
+    fusionados: Dict[
+        str, Tuple[EstadoBoleto, Optional[datetime], Optional[int]]
+    ] = {}
+
+    for lectura in _leer_progresos(list(rutas_progreso), paralelo):
+        nombre = os.path.basename(lectura["ruta"])
+
+        if lectura["error"]:
+            resumen.archivos_con_error += 1
+            resumen.agregar_conflicto(f"{nombre}: no se pudo leer ({lectura['error']})")
+            continue
+
+        reporte_archivo = os.path.basename(
+            lectura["cabecera"].get("ruta_reporte_original") or ""
+        )
+        if reporte_sesion and reporte_archivo and reporte_archivo != reporte_sesion:
+            resumen.agregar_conflicto(
+                f"{nombre}: generado sobre otro reporte ({reporte_archivo})"
+            )
+
+        resumen.escaneados_por_archivo[nombre] = len(lectura["escaneados"])
+
+        for codigo, fecha_texto, sucursal, monto in lectura["escaneados"]:
+            boleto = sesion.boletos.get(codigo)
+            if boleto is None:
+                resumen.no_encontrados += 1
+                resumen.agregar_conflicto(f"{nombre}: {codigo} no está en el reporte")
+                continue
+
+            if (sucursal and sucursal != boleto.sucursal) or (
+                float(monto or 0.0) != boleto.monto_premio
+            ):
+                resumen.agregar_conflicto(
+                    f"{nombre}: {codigo} con datos distintos al reporte "
+                    f"(PDV {sucursal}, premio {monto})"
+                )
+
+            fecha = _convertir_fecha(fecha_texto)
+
+            if codigo not in vistos:
+                vistos.add(codigo)
+                fusionados[codigo] = (EstadoBoleto.ESCANEADO, fecha, 1)
+                resumen.escaneados_nuevos += 1
+            else:
+                # Ya validado en otra estación: gana el escaneo más antiguo
+                resumen.duplicados_entre_estaciones += 1
+                estado, fecha_actual, escaneos = fusionados.get(
+                    codigo, (boleto.estado, boleto.fecha_escaneo, None)
+                )
+                if fecha and (fecha_actual is None or fecha < fecha_actual):
+                    fusionados[codigo] = (estado, fecha, escaneos)
+
+    # Un solo paso por el lock, el diario y el registro de validados
+    sesion.restaurar_estados_lote(
+        [
+            (sesion.boletos[codigo], estado, fecha, escaneos)
+            for codigo, (estado, fecha, escaneos) in fusionados.items()
+        ]
+    )
+
+    resumen.segundos = round(time.perf_counter() - inicio, 3)
+
+    if resumen.archivos_con_error == len(rutas_progreso):
+        return False, "No se pudo leer ninguno de los progresos", resumen
+
+    return True, str(resumen), resumen
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Punto de entrada de línea de comandos"""
+    from inventario_boletos.core.report_processor import ReporteProcessor
+
+    parser = argparse.ArgumentParser(
+        description="Fusiona progresos JSON de varias estaciones sobre un reporte"
+    )
+    parser.add_argument("reporte", help="Reporte Excel/CSV original")
+    parser.add_argument("progresos", nargs="+", help="Archivos de progreso JSON")
+    parser.add_argument("-o", "--salida", help="JSON de progreso fusionado")
+    parser.add_argument(
+        "--secuencial", action="store_true", help="Leer los archivos uno por uno"
+    )
+    args = parser.parse_args(argv)
+
+    procesador = ReporteProcessor()
+    exito, mensaje = procesador.cargar_archivo(args.reporte)
+    if not exito:
+        raise SystemExit(mensaje)
+
+    sesion = SesionInventario(ruta_reporte_original=args.reporte)
+    sesion.agregar_boletos(procesador.obtener_boletos())
+
+    exito, mensaje, resumen = fusionar_progresos(
+        sesion, args.progresos, paralelo=not args.secuencial
+    )
+    print(mensaje)
+    for conflicto in resumen.conflictos:
+        print(f"  • {conflicto}")
+    if resumen.total_conflictos > len(resumen.conflictos):
+        print(f"  ... y {resumen.total_conflictos - len(resumen.conflictos)} más")
+
+    if not exito:
+        raise SystemExit(1)
+
+    if args.salida:
+        exito, mensaje = sesion.guardar_progreso_rapido(args.salida)
+        print(mensaje)
+
+
+if __name__ == "__main__":
+    main()
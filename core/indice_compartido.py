@@ -0,0 +1,275 @@
+"""
+ÍNDICE DE CÓDIGOS COMPARTIDO ENTRE PROCESOS
+Archivo mapeado en memoria con los códigos del reporte ordenados, su fila y
+el estado de cada boleto: otro proceso (servidor de escaneo, exportador) se
+adjunta sin volver a leer el reporte y ve los escaneos al instante
+"""
+
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Estados en el orden de su código de un byte (valores de EstadoBoleto)
+ESTADOS = ("PENDIENTE", "ESCANEADO", "DUPLICADO", "NO_REPORTADO")
+CODIGO_ESTADO = {estado: numero for numero, estado in enumerate(ESTADOS)}
+
+MAGIA = b"BOLIDX01"
+# Magia, cantidad de códigos, ancho de cada código y desplazamiento de los
+# arreglos de códigos, filas, reportes y estados
+_CABECERA = struct.Struct("<8sQQQQQQ")
+_ALINEACION = 64
+
+
+def _alinear(posicion: int) -> int:
+    return (posicion + _ALINEACION - 1) // _ALINEACION * _ALINEACION
+
+
+class IndiceCompartido:
+    """
+    Vista de un índice de boletos en disco, mapeado con numpy.memmap.
+
+    Los códigos quedan ordenados como bytes de ancho fijo, así buscar uno es
+    un searchsorted en O(log n) sobre el mapa, sin armar un diccionario.
+    Los estados son un byte por boleto; marcar un escaneo bloquea solo ese
+    byte del archivo, así dos procesos no marcan el mismo boleto a la vez.
+    """
+
+    def __init__(self, ruta: str, solo_lectura: bool = True):
+        self.ruta = ruta
+        self.solo_lectura = solo_lectura
+        self._lock = threading.Lock()
+
+        with open(ruta, "rb") as f:
+            (
+                magia,
+                self.cantidad,
+                self.ancho,
+                inicio_codigos,
+                inicio_filas,
+                inicio_reportes,
+                self._inicio_estados,
+            ) = _CABECERA.unpack(f.read(_CABECERA.size))
+        if magia != MAGIA:
+            raise ValueError(f"{ruta} no es un índice de boletos compartido")
+
+        self._inodo = os.stat(ruta).st_ino
+        modo = "r" if solo_lectura else "r+"
+        forma = (max(self.cantidad, 1),)
+        self.codigos = np.memmap(
+            ruta, dtype=f"S{self.ancho}", mode="r", offset=inicio_codigos, shape=forma
+        )[: self.cantidad]
+        self.filas = np.memmap(
+            ruta, dtype=np.int64, mode="r", offset=inicio_filas, shape=forma
+        )[: self.cantidad]
+        self.reportes = np.memmap(
+            ruta, dtype=np.int32, mode="r", offset=inicio_reportes, shape=forma
+        )[: self.cantidad]
+        self.estados = np.memmap(
+            ruta, dtype=np.uint8, mode=modo, offset=self._inicio_estados, shape=forma
+        )[: self.cantidad]
+
+        # Descriptor aparte para los bloqueos de un byte
+        self._archivo_bloqueos = None if solo_lectura else open(ruta, "r+b")
+
+    @classmethod
+    def crear(
+        cls,
+        ruta: str,
+        codigos: List[str],
+        estados: Iterable[str],
+        filas: Optional[Iterable[int]] = None,
+        reportes: Optional[Iterable[int]] = None,
+    ) -> "IndiceCompartido":
+        """
+        Escribe un índice nuevo y lo abre para lectura y escritura.
+
+        El archivo se arma aparte y reemplaza al anterior de una vez: los
+        procesos adjuntos al viejo lo notan con desactualizado().
+
+        Args:
+            ruta: Archivo del índice
+            codigos: Códigos de los boletos
+            estados: Valor de EstadoBoleto de cada boleto
+            filas: Fila de cada boleto en su reporte (-1 si no se conoce)
+            reportes: Índice del reporte de cada boleto en la sesión
+
+        Returns:
+            IndiceCompartido abierto en modo escritura
+        """
+        cantidad = len(codigos)
+        ancho = max((len(codigo.encode()) for codigo in codigos), default=1)
+
+        arreglo_codigos = np.array(
+            [codigo.encode() for codigo in codigos], dtype=f"S{ancho}"
+        )
+        orden = np.argsort(arreglo_codigos, kind="stable")
+        arreglo_estados = np.fromiter(
+            (CODIGO_ESTADO.get(estado, 0) for estado in estados),
+            dtype=np.uint8,
+            count=cantidad,
+        )
+        arreglo_filas = (
+            np.fromiter(filas, dtype=np.int64, count=cantidad)
+            if filas is not None
+            else np.full(cantidad, -1, dtype=np.int64)
+        )
+        arreglo_reportes = (
+            np.fromiter(reportes, dtype=np.int32, count=cantidad)
+            if reportes is not None
+            else np.zeros(cantidad, dtype=np.int32)
+        )
+
+        inicio_codigos = _alinear(_CABECERA.size)
+        inicio_filas = _alinear(inicio_codigos + cantidad * ancho)
+        inicio_reportes = _alinear(inicio_filas + cantidad * 8)
+        inicio_estados = _alinear(inicio_reportes + cantidad * 4)
+
+        temporal = f"{ruta}.tmp{os.getpid()}"
+        with open(temporal, "wb") as f:
+            f.write(
+                _CABECERA.pack(
+                    MAGIA,
+                    cantidad,
+                    ancho,
+                    inicio_codigos,
+                    inicio_filas,
+                    inicio_reportes,
+                    inicio_estados,
+                )
+            )
+            for inicio, arreglo in (
+                (inicio_codigos, arreglo_codigos),
+                (inicio_filas, arreglo_filas),
+                (inicio_reportes, arreglo_reportes),
+                (inicio_estados, arreglo_estados),
+            ):
+                f.seek(inicio)
+                f.write(arreglo[orden].tobytes())
+            # Relleno para poder mapear los arreglos aunque no haya boletos
+            f.truncate(max(f.tell(), inicio_estados + _ALINEACION))
+        os.replace(temporal, ruta)
+        return cls(ruta, solo_lectura=False)
+
+    def __len__(self) -> int:
+        return self.cantidad
+
+    def desactualizado(self) -> bool:
+        """True si el archivo fue reemplazado (otro reporte o recarga)"""
+        try:
+            return os.stat(self.ruta).st_ino != self._inodo
+        except OSError:
+            return True
+
+    def posicion(self, codigo: str) -> int:
+        """Posición del código en el índice, o -1 si no está"""
+        clave = codigo.encode()
+        if len(clave) > self.ancho:
+            return -1
+        posicion = int(np.searchsorted(self.codigos, clave))
+        if posicion < self.cantidad and self.codigos[posicion] == clave:
+            return posicion
+        return -1
+
+    def posiciones(self, codigos: List[str]) -> np.ndarray:
+        """Posiciones de muchos códigos a la vez (-1 los que no están)"""
+        claves = np.array([codigo.encode() for codigo in codigos], dtype=object)
+        largos = np.fromiter(
+            (len(clave) for clave in claves), dtype=np.int64, count=len(claves)
+        )
+        claves = claves.astype(f"S{self.ancho}")
+        posiciones = np.searchsorted(self.codigos, claves)
+        dentro = posiciones < self.cantidad
+        encontrados = np.zeros(len(claves), dtype=bool)
+        encontrados[dentro] = self.codigos[posiciones[dentro]] == claves[dentro]
+        encontrados &= largos <= self.ancho
+        return np.where(encontrados, posiciones, -1)
+
+    def estado(self, codigo: str) -> Optional[str]:
+        """Estado actual del boleto, o None si el código no está"""
+        posicion = self.posicion(codigo)
+        return ESTADOS[self.estados[posicion]] if posicion >= 0 else None
+
+    def codigo_en(self, posicion: int) -> str:
+        return self.codigos[posicion].decode()
+
+    def contar_estados(self) -> Dict[str, int]:
+        """Cantidad de boletos en cada estado"""
+        conteo = np.bincount(self.estados, minlength=len(ESTADOS))
+        return {estado: int(conteo[numero]) for numero, estado in enumerate(ESTADOS)}
+
+    @contextmanager
+    def _bloqueo(self, posicion: int) -> Iterator[None]:
+        """Bloqueo exclusivo del byte de estado de una posición"""
+        byte = self._inicio_estados + posicion
+        with self._lock:
+            descriptor = self._archivo_bloqueos.fileno()
+            if fcntl is not None:
+                fcntl.lockf(descriptor, fcntl.LOCK_EX, 1, byte)
+            else:
+                os.lseek(descriptor, byte, os.SEEK_SET)
+                msvcrt.locking(descriptor, msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.lockf(descriptor, fcntl.LOCK_UN, 1, byte)
+                else:
+                    os.lseek(descriptor, byte, os.SEEK_SET)
+                    msvcrt.locking(descriptor, msvcrt.LK_UNLCK, 1)
+
+    def comparar_y_fijar(
+        self, posicion: int, esperado: str, nuevo: str
+    ) -> Tuple[bool, str]:
+        """
+        Pasa el boleto de una posición al estado nuevo solo si en el archivo
+        sigue en el estado esperado, bajo el bloqueo de su byte: lo usan
+        marcar_escaneo y la sesión dueña del índice, así un mismo boleto no
+        se acepta dos veces desde procesos distintos.
+
+        Returns:
+            Tuple (si se escribió, estado que quedó en el índice)
+        """
+        if self.solo_lectura:
+            raise PermissionError("Índice compartido abierto solo para lectura")
+        with self._bloqueo(posicion):
+            actual = ESTADOS[self.estados[posicion]]
+            if actual != esperado:
+                return False, actual
+            self.estados[posicion] = CODIGO_ESTADO[nuevo]
+            return True, nuevo
+
+    def marcar_escaneo(self, codigo: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Marca el escaneo de un boleto desde cualquier proceso adjunto: un
+        PENDIENTE pasa a ESCANEADO, cualquier otro estado queda igual
+        (escaneo repetido).
+
+        Returns:
+            Tuple (estado anterior, estado nuevo); (None, None) si no está
+        """
+        if self.solo_lectura:
+            raise PermissionError("Índice compartido abierto solo para lectura")
+        posicion = self.posicion(codigo)
+        if posicion < 0:
+            return None, None
+        marcado, actual = self.comparar_y_fijar(posicion, "PENDIENTE", "ESCANEADO")
+        return ("PENDIENTE" if marcado else actual), actual
+
+    def cerrar(self) -> None:
+        """Baja los estados a disco y suelta los mapas"""
+        if self.estados is not None and not self.solo_lectura:
+            self.estados.flush()
+        self.codigos = self.filas = self.reportes = self.estados = None
+        if self._archivo_bloqueos is not None:
+            self._archivo_bloqueos.close()
+            self._archivo_bloqueos = None
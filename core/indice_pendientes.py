@@ -0,0 +1,243 @@
+"""
+ÍNDICE DE BOLETOS PENDIENTES
+Conjunto ordenado (orden del reporte) de boletos sin escanear que se achica
+con cada escaneo: len() en O(1) y páginas en O(página · log n)
+"""
+
+from array import array
+from itertools import accumulate
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class IndicePendientes:
+    """
+    Conjunto de elementos pendientes sobre posiciones fijas.
+
+    Cada elemento ocupa la posición en que fue agregado; un árbol de Fenwick
+    cuenta los pendientes por prefijo para ubicar el k-ésimo en O(log n), y
+    un bytearray de marcas permite recorrer los siguientes sin tocar los ya
+    escaneados uno por uno.
+    """
+
+    def __init__(self):
+        self._elementos: List[Any] = []
+        self._marcas = bytearray()  # 1 = pendiente
+        self._arbol = array("l", [0])  # Fenwick, índice 1..n
+        self._cantidad = 0
+
+    def __len__(self) -> int:
+        return self._cantidad
+
+    def __iter__(self) -> Iterator[Any]:
+        return self.iterar_desde(0)
+
+    def agregar(self, elemento: Any, pendiente: bool) -> int:
+        """
+        Agrega un elemento al final.
+
+        Returns:
+            Posición asignada al elemento
+        """
+        posicion = len(self._elementos)
+        marca = 1 if pendiente else 0
+        self._elementos.append(elemento)
+        self._marcas.append(marca)
+
+        # El nodo i del árbol cubre (i - lowbit(i), i]: sumar los nodos hijos
+        i = posicion + 1
+        valor = marca
+        j = i - 1
+        limite = i - (i & -i)
+        while j > limite:
+            valor += self._arbol[j]
+            j -= j & -j
+        self._arbol.append(valor)
+
+        self._cantidad += marca
+        return posicion
+
+    def marcar(self, posicion: int, pendiente: bool) -> None:
+        """Cambia el estado de una posición (no hace nada si ya lo tenía)"""
+        marca = 1 if pendiente else 0
+        if self._marcas[posicion] == marca:
+            return
+
+        self._marcas[posicion] = marca
+        delta = 1 if pendiente else -1
+        self._cantidad += delta
+
+        i = posicion + 1
+        n = len(self._elementos)
+        while i <= n:
+            self._arbol[i] += delta
+            i += i & -i
+
+    def reconstruir(self, elementos_y_marcas) -> None:
+        """Arma el índice en O(n) desde pares (elemento, pendiente)"""
+        self._elementos = []
+        self._marcas = bytearray()
+        for elemento, pendiente in elementos_y_marcas:
+            self._elementos.append(elemento)
+            self._marcas.append(1 if pendiente else 0)
+
+        # Nodo i = suma de marcas en (i - lowbit(i), i] = diferencia de prefijos
+        prefijos = [0]
+        prefijos.extend(accumulate(self._marcas))
+        self._arbol = array(
+            "l",
+            [0] + [prefijos[i] - prefijos[i & (i - 1)] for i in range(1, len(prefijos))],
+        )
+        self._cantidad = self._marcas.count(1)
+
+    def posicion_del_pendiente(self, k: int) -> int:
+        """Posición del k-ésimo pendiente (desde 0), en O(log n)"""
+        if not 0 <= k < self._cantidad:
+            raise IndexError(k)
+
+        n = len(self._elementos)
+        posicion = 0
+        restante = k + 1
+        paso = 1 << (n.bit_length() - 1)
+        while paso:
+            siguiente = posicion + paso
+            if siguiente <= n and self._arbol[siguiente] < restante:
+                posicion = siguiente
+                restante -= self._arbol[siguiente]
+            paso >>= 1
+        return posicion
+
+    def iterar_desde(self, posicion: int) -> Iterator[Any]:
+        """Recorre los pendientes a partir de una posición"""
+        marcas = self._marcas
+        posicion = marcas.find(1, posicion)
+        while posicion != -1:
+            yield self._elementos[posicion]
+            posicion = marcas.find(1, posicion + 1)
+
+    def pagina(self, inicio: int, cantidad: int) -> List[Any]:
+        """Retorna hasta `cantidad` pendientes desde el pendiente número `inicio`"""
+        if inicio >= self._cantidad or cantidad <= 0:
+            return []
+
+        resultado = []
+        for elemento in self.iterar_desde(self.posicion_del_pendiente(inicio)):
+            resultado.append(elemento)
+            if len(resultado) == cantidad:
+                break
+        return resultado
+
+
+class PendientesSesion:
+    """
+    Pendientes de una sesión en orden del reporte, en general y por PDV.
+
+    No tiene lock propio: SesionInventario lo actualiza con su lock de
+    estadísticas adquirido.
+    """
+
+    def __init__(self):
+        self.general = IndicePendientes()
+        self.por_sucursal: Dict[str, IndicePendientes] = {}
+        self._posicion: Dict[str, int] = {}  # código -> posición general
+        self._posicion_en_sucursal = array("l")  # posición general -> en su PDV
+
+    def __len__(self) -> int:
+        return len(self.general)
+
+    def registrar_transicion(
+        self, boleto, estado_anterior: Optional[Any], estado_nuevo: Any
+    ) -> None:
+        """Agrega el boleto (estado_anterior None) o actualiza su marca"""
+        pendiente = estado_nuevo.value == "PENDIENTE"
+        indice_sucursal = self.por_sucursal.get(boleto.sucursal)
+        if indice_sucursal is None:
+            indice_sucursal = self.por_sucursal[boleto.sucursal] = IndicePendientes()
+
+        posicion = self._posicion.get(boleto.codigo)
+        if posicion is None:
+            self._posicion[boleto.codigo] = self.general.agregar(boleto, pendiente)
+            self._posicion_en_sucursal.append(
+                indice_sucursal.agregar(boleto, pendiente)
+            )
+        else:
+            self.general.marcar(posicion, pendiente)
+            indice_sucursal.marcar(self._posicion_en_sucursal[posicion], pendiente)
+
+    def reconstruir(self, boletos) -> None:
+        """Vuelve a armar los índices desde los boletos, en su orden"""
+        boletos = list(boletos)
+        marcas = [b.estado == "PENDIENTE" for b in boletos]  # str Enum
+        self.general.reconstruir(zip(boletos, marcas))
+        self._posicion = {b.codigo: i for i, b in enumerate(boletos)}
+
+        miembros: Dict[str, List[Any]] = {}
+        marcas_por_sucursal: Dict[str, List[bool]] = {}
+        posiciones = []
+        for boleto, pendiente in zip(boletos, marcas):
+            grupo = miembros.get(boleto.sucursal)
+            if grupo is None:
+                grupo = miembros[boleto.sucursal] = []
+                marcas_por_sucursal[boleto.sucursal] = []
+            posiciones.append(len(grupo))
+            grupo.append(boleto)
+            marcas_por_sucursal[boleto.sucursal].append(pendiente)
+        self._posicion_en_sucursal = array("l", posiciones)
+
+        self.por_sucursal = {}
+        for sucursal, grupo in miembros.items():
+            indice = self.por_sucursal[sucursal] = IndicePendientes()
+            indice.reconstruir(zip(grupo, marcas_por_sucursal[sucursal]))
+
+    def contar(self, sucursal: Optional[str] = None) -> int:
+        """Cantidad de pendientes, en total o de un PDV (O(1))"""
+        if sucursal is None:
+            return len(self.general)
+        indice = self.por_sucursal.get(sucursal)
+        return len(indice) if indice else 0
+
+    def conteo_por_sucursal(self) -> List[Tuple[str, int]]:
+        """Pares (PDV, pendientes) de los PDV con algo pendiente, ordenados"""
+        return sorted(
+            (sucursal, len(indice))
+            for sucursal, indice in self.por_sucursal.items()
+            if len(indice)
+        )
+
+    def pagina(
+        self,
+        inicio: int,
+        cantidad: int,
+        sucursal: Optional[str] = None,
+        agrupado_por_sucursal: bool = False,
+    ) -> List[Any]:
+        """
+        Retorna una página de boletos pendientes.
+
+        Args:
+            inicio: Número de pendiente desde el que empieza la página
+            cantidad: Tamaño de la página
+            sucursal: Limitar a un PDV
+            agrupado_por_sucursal: Ordenar por PDV y, dentro, por reporte
+
+        Returns:
+            Lista de boletos
+        """
+        if sucursal is not None:
+            indice = self.por_sucursal.get(sucursal)
+            return indice.pagina(inicio, cantidad) if indice else []
+
+        if not agrupado_por_sucursal:
+            return self.general.pagina(inicio, cantidad)
+
+        resultado = []
+        for sucursal, pendientes in self.conteo_por_sucursal():
+            if inicio >= pendientes:
+                inicio -= pendientes
+                continue
+            resultado.extend(
+                self.por_sucursal[sucursal].pagina(inicio, cantidad - len(resultado))
+            )
+            inicio = 0
+            if len(resultado) >= cantidad:
+                break
+        return resultado
@@ -0,0 +1,175 @@
+"""
+INSTRUMENTACIÓN DEL CAMINO DE ESCANEO
+Histogramas de latencia por etapa (perf_counter_ns) con costo casi nulo
+cuando está desactivada
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from functools import wraps
+from typing import Any, Callable, Dict, List, Tuple
+
+# Límites superiores de los buckets en nanosegundos: 1 µs a 1 s en escala 1-2-5.
+# El último bucket (sin límite) acumula todo lo que supere 1 s.
+LIMITES_BUCKETS_NS: Tuple[int, ...] = tuple(
+    base * factor
+    for base in (1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+    for factor in (1, 2, 5)
+) + (1_000_000_000,)
+
+
+class HistogramaLatencia:
+    """Histograma de latencias con buckets fijos"""
+
+    __slots__ = ("etapa", "conteos", "total", "suma_ns", "min_ns", "max_ns")
+
+    def __init__(self, etapa: str):
+        self.etapa = etapa
+        self.conteos: List[int] = [0] * (len(LIMITES_BUCKETS_NS) + 1)
+        self.total = 0
+        self.suma_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+
+    def registrar(self, duracion_ns: int) -> None:
+        """Agrega una medición al bucket correspondiente"""
+        self.conteos[bisect_left(LIMITES_BUCKETS_NS, duracion_ns)] += 1
+        if self.total == 0 or duracion_ns < self.min_ns:
+            self.min_ns = duracion_ns
+        if duracion_ns > self.max_ns:
+            self.max_ns = duracion_ns
+        self.total += 1
+        self.suma_ns += duracion_ns
+
+    def percentil(self, fraccion: float) -> int:
+        """
+        Retorna el límite superior del bucket que contiene el percentil.
+        Es una cota (no el valor exacto), suficiente para ubicar la demora.
+        """
+        if self.total == 0:
+            return 0
+
+        objetivo = fraccion * self.total
+        acumulado = 0
+        for indice, conteo in enumerate(self.conteos):
+            acumulado += conteo
+            if acumulado >= objetivo:
+                if indice < len(LIMITES_BUCKETS_NS):
+                    return min(LIMITES_BUCKETS_NS[indice], self.max_ns)
+                return self.max_ns
+        return self.max_ns
+
+    @property
+    def promedio_ns(self) -> float:
+        """Duración promedio en nanosegundos"""
+        return self.suma_ns / self.total if self.total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convierte el histograma a diccionario"""
+        return {
+            "etapa": self.etapa,
+            "total": self.total,
+            "promedio_us": round(self.promedio_ns / 1_000, 2),
+            "min_us": round(self.min_ns / 1_000, 2),
+            "p50_us": round(self.percentil(0.50) / 1_000, 2),
+            "p95_us": round(self.percentil(0.95) / 1_000, 2),
+            "p99_us": round(self.percentil(0.99) / 1_000, 2),
+            "max_us": round(self.max_ns / 1_000, 2),
+            "limites_buckets_ns": list(LIMITES_BUCKETS_NS),
+            "conteos": list(self.conteos),
+        }
+
+
+class Instrumentacion:
+    """
+    Registro de histogramas por etapa.
+
+    Desactivada, cada función medida solo paga la lectura de un atributo
+    antes de ejecutarse normalmente.
+    """
+
+    def __init__(self):
+        self.habilitada: bool = False
+        self._histogramas: Dict[str, HistogramaLatencia] = {}
+        self._lock = threading.Lock()
+
+    def configurar(self, habilitada: bool) -> None:
+        """Activa o desactiva la toma de mediciones"""
+        self.habilitada = bool(habilitada)
+
+    def registrar(self, etapa: str, duracion_ns: int) -> None:
+        """Registra una duración para una etapa"""
+        with self._lock:
+            histograma = self._histogramas.get(etapa)
+            if histograma is None:
+                histograma = self._histogramas[etapa] = HistogramaLatencia(etapa)
+            histograma.registrar(duracion_ns)
+
+    def medir(self, etapa: str) -> Callable:
+        """Decorador que mide cada llamada a la función bajo el nombre de etapa"""
+
+        def decorador(funcion: Callable) -> Callable:
+            @wraps(funcion)
+            def envoltura(*args, **kwargs):
+                if not self.habilitada:
+                    return funcion(*args, **kwargs)
+                inicio = time.perf_counter_ns()
+                try:
+                    return funcion(*args, **kwargs)
+                finally:
+                    self.registrar(etapa, time.perf_counter_ns() - inicio)
+
+            return envoltura
+
+        return decorador
+
+    def reiniciar(self) -> None:
+        """Descarta todas las mediciones"""
+        with self._lock:
+            self._histogramas.clear()
+
+    def resumen(self) -> List[Dict[str, Any]]:
+        """Retorna los histogramas de todas las etapas, ordenados por nombre"""
+        with self._lock:
+            return [
+                self._histogramas[etapa].to_dict()
+                for etapa in sorted(self._histogramas)
+            ]
+
+    def volcar_json(self, ruta_archivo: str) -> Tuple[bool, str]:
+        """
+        Guarda las mediciones actuales en un archivo JSON.
+
+        Returns:
+            Tuple (éxito, mensaje)
+        """
+        try:
+            directorio = os.path.dirname(ruta_archivo)
+            if directorio and not os.path.exists(directorio):
+                os.makedirs(directorio)
+
+            datos = {
+                "fecha": datetime.now().isoformat(),
+                "habilitada": self.habilitada,
+                "etapas": self.resumen(),
+            }
+            with open(ruta_archivo, "w", encoding="utf-8") as f:
+                json.dump(datos, f, indent=2, ensure_ascii=False)
+
+            return True, f"Métricas guardadas en {ruta_archivo}"
+
+        except Exception as e:
+            return False, f"Error al guardar métricas: {str(e)}"
+
+
+# Instancia única compartida por toda la aplicación
+instrumentacion = Instrumentacion()
+
+
+def medir(etapa: str) -> Callable:
+    """Atajo para decorar funciones con la instrumentación global"""
+    return instrumentacion.medir(etapa)
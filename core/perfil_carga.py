@@ -0,0 +1,110 @@
+"""
+PERFIL DE CARGA DE REPORTES
+Tiempos por etapa, filas de entrada/salida, filas descartadas por cada filtro
+y pico de memoria del proceso de carga
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+@dataclass
+class EtapaCarga:
+    """Medición de una etapa de la carga"""
+
+    nombre: str
+    segundos: float = 0.0
+    filas_entrada: Optional[int] = None
+    filas_salida: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convierte la etapa a diccionario"""
+        return {
+            "nombre": self.nombre,
+            "segundos": round(self.segundos, 6),
+            "filas_entrada": self.filas_entrada,
+            "filas_salida": self.filas_salida,
+        }
+
+
+@dataclass
+class PerfilCarga:
+    """Perfil completo de una carga de reporte"""
+
+    ruta_archivo: str = ""
+    fecha: datetime = field(default_factory=datetime.now)
+    etapas: List[EtapaCarga] = field(default_factory=list)
+    filas_descartadas: Dict[str, int] = field(default_factory=dict)
+    pico_memoria_bytes: Optional[int] = None
+    ruta_cprofile: Optional[str] = None
+    resumen_cprofile: str = ""
+
+    @contextmanager
+    def etapa(
+        self, nombre: str, filas_entrada: Optional[int] = None
+    ) -> Iterator[EtapaCarga]:
+        """
+        Mide el tiempo de un bloque como una etapa.
+        El bloque puede completar filas_salida en la etapa entregada.
+        """
+        medicion = EtapaCarga(nombre=nombre, filas_entrada=filas_entrada)
+        inicio = time.perf_counter()
+        try:
+            yield medicion
+        finally:
+            medicion.segundos = time.perf_counter() - inicio
+            self.etapas.append(medicion)
+
+    def registrar_descarte(self, filtro: str, filas: int) -> None:
+        """Acumula las filas eliminadas por un filtro de limpieza"""
+        self.filas_descartadas[filtro] = self.filas_descartadas.get(filtro, 0) + filas
+
+    @property
+    def segundos_totales(self) -> float:
+        """Suma de los tiempos de todas las etapas"""
+        return sum(e.segundos for e in self.etapas)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convierte el perfil a diccionario"""
+        return {
+            "ruta_archivo": self.ruta_archivo,
+            "fecha": self.fecha.isoformat(),
+            "segundos_totales": round(self.segundos_totales, 6),
+            "etapas": [e.to_dict() for e in self.etapas],
+            "filas_descartadas": self.filas_descartadas,
+            "pico_memoria_mb": round(self.pico_memoria_bytes / 1_048_576, 2)
+            if self.pico_memoria_bytes is not None
+            else None,
+            "ruta_cprofile": self.ruta_cprofile,
+            "resumen_cprofile": self.resumen_cprofile,
+        }
+
+    def ruta_junto_a_reporte(self, extension: str = ".json") -> str:
+        """Ruta sugerida para guardar el perfil al lado del reporte"""
+        base = os.path.splitext(self.ruta_archivo)[0]
+        fecha = self.fecha.strftime("%Y%m%d_%H%M%S")
+        return f"{base}_PERFIL_{fecha}{extension}"
+
+    def guardar_junto_a_reporte(self) -> Tuple[bool, str]:
+        """
+        Guarda el perfil en JSON en la misma carpeta del reporte.
+
+        Returns:
+            Tuple (éxito, mensaje)
+        """
+        try:
+            ruta = self.ruta_junto_a_reporte()
+            with open(ruta, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+            return True, f"Perfil de carga guardado en {ruta}"
+        except Exception as e:
+            return False, f"Error al guardar perfil de carga: {str(e)}"
+
+    def __str__(self) -> str:
+        etapas = ", ".join(f"{e.nombre}={e.segundos:.3f}s" for e in self.etapas)
+        return f"PerfilCarga({self.segundos_totales:.3f}s: {etapas})"
@@ -0,0 +1,361 @@
+"""
+REGISTRO PERSISTENTE DE BOLETOS VALIDADOS
+Tabla SQLite con cada boleto validado en cualquier sesión, con un filtro de
+Bloom en memoria delante: un boleto que ya se pagó en un conteo anterior y
+vuelve a aparecer en otro reporte se detecta al escanearlo o al cargar
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from itertools import groupby
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Filtro de Bloom: con 10 bits por código y 7 funciones la tasa de falsos
+# positivos es ~1% (cada positivo se confirma en SQLite)
+BITS_POR_CODIGO = 10
+NUM_HASHES = 7
+CAPACIDAD_MINIMA = 1 << 20
+
+_MASCARA_64 = (1 << 64) - 1
+
+
+def _clave_entera(codigo: str) -> int:
+    """Entero de 64 bits de un código (los numéricos se usan tal cual)"""
+    if codigo.isdigit() and len(codigo) <= 18:
+        return int(codigo)
+    resumen = hashlib.blake2b(codigo.encode(), digest_size=8).digest()
+    return int.from_bytes(resumen, "little")
+
+
+def _mezclar(x: int) -> int:
+    """Mezclador splitmix64: dispersa claves consecutivas por todo el filtro"""
+    x = (x + 0x9E3779B97F4A7C15) & _MASCARA_64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASCARA_64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASCARA_64
+    return x ^ (x >> 31)
+
+
+class FiltroBloom:
+    """
+    Conjunto probabilístico de códigos: "no está" es seguro, "puede estar"
+    se confirma aparte. Usa doble hashing (h1 + i*h2) sobre un mezclador de
+    64 bits, con la misma cuenta en Python (un código) y en NumPy (lote).
+    """
+
+    def __init__(self, capacidad: int = CAPACIDAD_MINIMA):
+        self.num_bits = max(capacidad, 1) * BITS_POR_CODIGO
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _posiciones(self, codigo: str) -> List[int]:
+        h = _mezclar(_clave_entera(codigo))
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(NUM_HASHES)]
+
+    def agregar(self, codigo: str) -> None:
+        for posicion in self._posiciones(codigo):
+            self.bits[posicion >> 3] |= 1 << (posicion & 7)
+
+    def __contains__(self, codigo: str) -> bool:
+        bits = self.bits
+        return all(
+            bits[posicion >> 3] & (1 << (posicion & 7))
+            for posicion in self._posiciones(codigo)
+        )
+
+    def contiene_lote(self, codigos: List[str]) -> List[bool]:
+        """
+        Consulta muchos códigos de una vez.
+
+        Con NumPy calcula los hashes de todo el lote en forma vectorizada;
+        sin NumPy consulta uno por uno.
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            return [codigo in self for codigo in codigos]
+
+        if not codigos:
+            return []
+
+        x = np.fromiter(
+            (_clave_entera(codigo) for codigo in codigos),
+            dtype=np.uint64,
+            count=len(codigos),
+        )
+        with np.errstate(over="ignore"):
+            x = x + np.uint64(0x9E3779B97F4A7C15)
+            x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+            x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+            x = x ^ (x >> np.uint64(31))
+
+            h1 = x & np.uint64(0xFFFFFFFF)
+            h2 = (x >> np.uint64(32)) | np.uint64(1)
+            bits = np.frombuffer(bytes(self.bits), dtype=np.uint8)
+            presentes = np.ones(len(codigos), dtype=bool)
+            for i in range(NUM_HASHES):
+                posiciones = (h1 + np.uint64(i) * h2) % np.uint64(self.num_bits)
+                byte = bits[(posiciones >> np.uint64(3)).astype(np.int64)]
+                mascara = (np.uint8(1) << (posiciones & np.uint64(7)).astype(np.uint8))
+                presentes &= (byte & mascara) != 0
+        return presentes.tolist()
+
+
+class RegistroValidados:
+    """
+    Registro en disco de los boletos validados en todas las sesiones.
+
+    Las altas y bajas se encolan en memoria, en orden, y se escriben por
+    lotes (cada TAMANO_LOTE cambios o INTERVALO_ESCRITURA segundos, y al
+    cerrar) desde escribir_si_corresponde: así quien registra no espera al
+    disco. El filtro de Bloom se actualiza en el acto.
+
+    Otros procesos (otra estación) pueden escribir en la misma base: cada
+    alta queda también en la tabla altas, con una secuencia creciente.
+    Cuando PRAGMA data_version cambia, el filtro suma las altas posteriores
+    a la última vista y vuelve a estar al día, sin releer toda la tabla.
+    """
+
+    TAMANO_LOTE = 64
+    INTERVALO_ESCRITURA = 2.0  # segundos
+    TAMANO_CONSULTA = 500  # Códigos por SELECT ... IN (...)
+
+    def __init__(self, ruta_db: str):
+        self.ruta_db = ruta_db
+        # _lock protege la cola y el filtro (operaciones cortas, sin disco);
+        # _lock_base la conexión. Quien tome ambos toma primero _lock_base
+        self._lock = threading.Lock()
+        self._lock_base = threading.Lock()
+        # ("alta"|"baja"|"sesion", fila)
+        self._pendientes: List[Tuple[str, tuple]] = []
+        self._ultima_escritura = time.monotonic()
+
+        directorio = os.path.dirname(ruta_db)
+        if directorio and not os.path.exists(directorio):
+            os.makedirs(directorio)
+        self._conexion = sqlite3.connect(ruta_db, check_same_thread=False)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.execute(
+            """
+            CREATE TABLE IF NOT EXISTS validados (
+                codigo TEXT PRIMARY KEY,
+                id_sesion TEXT NOT NULL,
+                fecha_validacion TEXT NOT NULL,
+                reporte TEXT
+            ) WITHOUT ROWID
+            """
+        )
+        self._conexion.execute(
+            """
+            CREATE TABLE IF NOT EXISTS altas (
+                secuencia INTEGER PRIMARY KEY,
+                codigo TEXT NOT NULL
+            )
+            """
+        )
+        self._conexion.commit()
+        self._cargar_filtro()
+
+    def _cargar_filtro(self) -> None:
+        """Arma el filtro de Bloom con los códigos ya registrados"""
+        (cantidad,) = self._conexion.execute(
+            "SELECT COUNT(*) FROM validados"
+        ).fetchone()
+        self.filtro = FiltroBloom(max(CAPACIDAD_MINIMA, cantidad * 2))
+        self._version_filtro = self._version_base()
+        (self._secuencia_filtro,) = self._conexion.execute(
+            "SELECT COALESCE(MAX(secuencia), 0) FROM altas"
+        ).fetchone()
+        for (codigo,) in self._conexion.execute("SELECT codigo FROM validados"):
+            self.filtro.agregar(codigo)
+
+    def _version_base(self) -> int:
+        """Cambia cuando otra conexión confirma cambios (con _lock_base)"""
+        return self._conexion.execute("PRAGMA data_version").fetchone()[0]
+
+    def _actualizar_filtro(self) -> bool:
+        """
+        Si otro proceso escribió, agrega al filtro sus altas (las de la tabla
+        altas posteriores a la última secuencia vista) y lo deja al día.
+        Las bajas no se quitan: quedan como falsos positivos. Con _lock_base.
+
+        Returns:
+            True si el filtro cambió
+        """
+        version = self._version_base()
+        if version == self._version_filtro:
+            return False
+        filas = self._conexion.execute(
+            "SELECT secuencia, codigo FROM altas WHERE secuencia > ? "
+            "ORDER BY secuencia",
+            (self._secuencia_filtro,),
+        ).fetchall()
+        with self._lock:
+            for _, codigo in filas:
+                self.filtro.agregar(codigo)
+        if filas:
+            self._secuencia_filtro = filas[-1][0]
+        self._version_filtro = version
+        return True
+
+    def __len__(self) -> int:
+        with self._lock_base:
+            self._escribir_pendientes()
+            (cantidad,) = self._conexion.execute(
+                "SELECT COUNT(*) FROM validados"
+            ).fetchone()
+            return cantidad
+
+    def registrar(self, codigo: str, id_sesion: str, reporte: str = "") -> None:
+        """
+        Anota un boleto validado (la primera validación es la que queda).
+        Solo encola el alta: la escribe escribir_si_corresponde.
+        """
+        fecha = time.strftime("%Y-%m-%dT%H:%M:%S")
+        with self._lock:
+            self.filtro.agregar(codigo)
+            self._pendientes.append(("alta", (codigo, id_sesion, fecha, reporte)))
+
+    def registrar_lote(self, altas: Iterable[Tuple[str, str, str]]) -> None:
+        """
+        Anota muchos boletos validados de una vez (fusión): un solo paso por
+        la cola y el filtro.
+
+        Args:
+            altas: Tuplas (código, id de sesión, reporte)
+        """
+        fecha = time.strftime("%Y-%m-%dT%H:%M:%S")
+        with self._lock:
+            for codigo, id_sesion, reporte in altas:
+                self.filtro.agregar(codigo)
+                self._pendientes.append(
+                    ("alta", (codigo, id_sesion, fecha, reporte))
+                )
+
+    def eliminar(self, codigo: str, id_sesion: str) -> None:
+        """
+        Quita la validación de un boleto hecha en una sesión (deshacer).
+        Se encola detrás de las altas anteriores, así se aplica en orden.
+        """
+        with self._lock:
+            self._pendientes.append(("baja", (codigo, id_sesion)))
+
+    def eliminar_sesion(self, id_sesion: str) -> None:
+        """
+        Quita todas las validaciones de una sesión descartada sin guardar,
+        para que sus escaneos no alerten a otras sesiones. Se encola como
+        las demás bajas.
+        """
+        with self._lock:
+            self._pendientes.append(("sesion", (id_sesion,)))
+
+    def escribir_si_corresponde(self) -> None:
+        """
+        Escribe los cambios encolados si ya son TAMANO_LOTE o pasaron
+        INTERVALO_ESCRITURA segundos desde la última escritura
+        """
+        with self._lock:
+            if not self._pendientes or (
+                len(self._pendientes) < self.TAMANO_LOTE
+                and time.monotonic() - self._ultima_escritura
+                < self.INTERVALO_ESCRITURA
+            ):
+                return
+        with self._lock_base:
+            self._escribir_pendientes()
+
+    def _escribir_pendientes(self) -> None:
+        """Escribe los cambios encolados en una transacción (con _lock_base)"""
+        with self._lock:
+            pendientes, self._pendientes = self._pendientes, []
+            self._ultima_escritura = time.monotonic()
+        if not pendientes:
+            return
+        for tipo, grupo in groupby(pendientes, key=lambda pendiente: pendiente[0]):
+            filas = [fila for _, fila in grupo]
+            if tipo == "alta":
+                self._conexion.executemany(
+                    "INSERT OR IGNORE INTO validados VALUES (?, ?, ?, ?)", filas
+                )
+                self._conexion.executemany(
+                    "INSERT INTO altas (codigo) VALUES (?)",
+                    [(fila[0],) for fila in filas],
+                )
+            elif tipo == "baja":
+                self._conexion.executemany(
+                    "DELETE FROM validados WHERE codigo = ? AND id_sesion = ?", filas
+                )
+            else:
+                self._conexion.executemany(
+                    "DELETE FROM validados WHERE id_sesion = ?", filas
+                )
+        self._conexion.commit()
+
+    def consultar(self, codigo: str) -> Optional[Dict[str, Any]]:
+        """
+        Retorna la validación registrada de un código, o None.
+        Si el filtro de Bloom (al día con lo que escribieron otros procesos)
+        descarta el código, no se consulta la tabla.
+        """
+        en_filtro = codigo in self.filtro
+        with self._lock_base:
+            if not en_filtro:
+                if not self._actualizar_filtro() or codigo not in self.filtro:
+                    return None
+                en_filtro = True
+            self._escribir_pendientes()
+            fila = self._conexion.execute(
+                "SELECT codigo, id_sesion, fecha_validacion, reporte "
+                "FROM validados WHERE codigo = ?",
+                (codigo,),
+            ).fetchone()
+        return self._a_dict(fila) if fila else None
+
+    def consultar_lote(self, codigos: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Busca muchos códigos a la vez: el filtro de Bloom (al día con lo que
+        escribieron otros procesos) se evalúa en lote y solo los posibles
+        positivos se consultan en la base.
+
+        Returns:
+            Diccionario código -> validación registrada
+        """
+        codigos = list(codigos)
+
+        encontrados: Dict[str, Dict[str, Any]] = {}
+        with self._lock_base:
+            self._actualizar_filtro()
+            presentes = self.filtro.contiene_lote(codigos)
+            candidatos = [
+                codigo for codigo, presente in zip(codigos, presentes) if presente
+            ]
+            self._escribir_pendientes()
+            for inicio in range(0, len(candidatos), self.TAMANO_CONSULTA):
+                tramo = candidatos[inicio : inicio + self.TAMANO_CONSULTA]
+                marcadores = ",".join("?" * len(tramo))
+                for fila in self._conexion.execute(
+                    "SELECT codigo, id_sesion, fecha_validacion, reporte "
+                    f"FROM validados WHERE codigo IN ({marcadores})",
+                    tramo,
+                ):
+                    encontrados[fila[0]] = self._a_dict(fila)
+        return encontrados
+
+    @staticmethod
+    def _a_dict(fila: tuple) -> Dict[str, Any]:
+        codigo, id_sesion, fecha, reporte = fila
+        return {
+            "codigo": codigo,
+            "id_sesion": id_sesion,
+            "fecha_validacion": fecha,
+            "reporte": reporte or "",
+        }
+
+    def cerrar(self) -> None:
+        """Escribe lo pendiente y cierra la base"""
+        with self._lock_base:
+            self._escribir_pendientes()
+            self._conexion.close()
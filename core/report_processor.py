@@ -4,13 +4,20 @@ Clase para cargar y procesar archivos Excel/CSV con reportes de boletos
 """
 
 import pandas as pd
+import numpy as np
+import hashlib
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
 from inventario_boletos.core.entities import Boleto
 from inventario_boletos.config.constants import AppConstants, AppConfig
 from inventario_boletos.core.entities import Boleto, EstadoBoleto  # Añadir EstadoBoleto
+from inventario_boletos.core.perfil_carga import PerfilCarga
+from inventario_boletos.core.tabla_boletos import TablaBoletos
+from inventario_boletos.core.codigo_barras import validar_ean13_lote
 
 
 class ReporteProcessorError(Exception):
@@ -29,9 +36,16 @@ class ReporteProcessor:
         """Inicializa el procesador de reportes"""
         self.config = config or AppConfig()
         self.constantes = self.config.constantes
-        self.df = None  # DataFrame de pandas
+        self.df = None  # DataFrame de pandas (el de self.tabla una vez cargado)
+        self.tabla: Optional[TablaBoletos] = None
         self.columnas_detectadas = {}
         self.errores = []
+        self.perfil_carga: Optional[PerfilCarga] = None  # Perfil de la última carga
+        self.ruta_archivo: Optional[str] = None
+        self.huella: str = ""  # SHA-256 del archivo cargado
+        # Huella del reporte cuya tabla se usa (la del original si el archivo
+        # se continuó desde la caché de reportes): clave de la caché
+        self.huella_reporte: str = ""
 
     def cargar_archivo(self, ruta_archivo: str) -> Tuple[bool, str]:
         """
@@ -44,39 +58,80 @@ class ReporteProcessor:
             Tuple (éxito, mensaje)
         """
         try:
+            # Cada carga registra su propio perfil de etapas
+            self.perfil_carga = PerfilCarga(ruta_archivo=ruta_archivo)
+            self.tabla = None
+            perfil = self.perfil_carga
+
             # Validar que el archivo existe
             if not os.path.exists(ruta_archivo):
                 raise FileNotFoundError(f"Archivo no encontrado: {ruta_archivo}")
 
             # Validar extensión
             extension = os.path.splitext(ruta_archivo)[1].lower()
-            if extension not in self.constantes.EXTENSIONES_PERMITIDAS:
-                extensiones = ", ".join(self.constantes.EXTENSIONES_PERMITIDAS)
+            permitidas = (
+                self.constantes.EXTENSIONES_PERMITIDAS
+                + self.constantes.EXTENSIONES_COLUMNARES
+            )
+            if extension not in permitidas:
+                extensiones = ", ".join(permitidas)
                 raise ValueError(f"Extensión no permitida. Use: {extensiones}")
 
+            # Huella del archivo: identifica el reporte en sesiones con varios.
+            # Se calcula en otro hilo mientras se lee (hashlib suelta el GIL)
+            self.ruta_archivo = ruta_archivo
+            ejecutor = ThreadPoolExecutor(max_workers=1)
+            futuro_huella = ejecutor.submit(self._calcular_huella, ruta_archivo)
+            ejecutor.shutdown(wait=False)
+
             # Cargar archivo según extensión
-            if extension == ".csv":
-                self.df = pd.read_csv(
-                    ruta_archivo, encoding=self.constantes.ENCODING, dtype=str
-                )
-            else:  # .xls o .xlsx
-                # Leer manteniendo los tipos originales como string
-                self.df = pd.read_excel(ruta_archivo, dtype=str)
+            with perfil.etapa("lectura") as etapa:
+                if extension == ".csv":
+                    self.df = pd.read_csv(
+                        ruta_archivo, encoding=self.constantes.ENCODING, dtype=str
+                    )
+                elif extension in self.constantes.EXTENSIONES_COLUMNARES:
+                    self.df = self._leer_columnar(ruta_archivo, extension)
+                else:  # .xls o .xlsx
+                    # Leer manteniendo los tipos originales como string
+                    self.df = pd.read_excel(ruta_archivo, dtype=str)
+                etapa.filas_salida = len(self.df)
 
             # Validar que el DataFrame no esté vacío
             if self.df.empty:
                 raise ValueError("El archivo está vacío o no contiene datos")
 
             # Detectar columnas relevantes
-            self._detectar_columnas()
+            with perfil.etapa("_detectar_columnas", len(self.df)) as etapa:
+                self._detectar_columnas()
+                etapa.filas_salida = len(self.df)
 
             # Validar columnas mínimas requeridas
-            if not self._validar_columnas_minimas():
+            with perfil.etapa("_validar_columnas_minimas", len(self.df)) as etapa:
+                columnas_validas = self._validar_columnas_minimas()
+                etapa.filas_salida = len(self.df)
+
+            if not columnas_validas:
                 columnas_req = self.constantes.COLUMNA_CODIGO_BARRA
                 raise ValueError(f"Columna requerida no encontrada: '{columnas_req}'")
 
             # Limpiar datos
-            self._limpiar_datos()
+            with perfil.etapa("_limpiar_datos", len(self.df)) as etapa:
+                self._limpiar_datos()
+                etapa.filas_salida = len(self.df)
+
+            # Única copia de los datos: los Boleto y la exportación leen de acá
+            self.huella = self.huella_reporte = futuro_huella.result()
+            self.tabla = TablaBoletos(
+                self.df, self.columnas_detectadas, self.huella, ruta_archivo
+            )
+            # Una vez por carga: continuar un progreso o un reporte exportado
+            # toma la tabla de la caché en vez de releer el archivo. Se guarda
+            # en segundo plano para no demorar la carga
+            if self.config.cache_reportes:
+                self.tabla.guardar_cache_en_segundo_plano(
+                    al_fallar=self.errores.append
+                )
 
             return True, self.constantes.MSG_CARGA_EXITOSA
 
@@ -84,6 +139,150 @@ class ReporteProcessor:
             self.errores.append(str(e))
             return False, f"Error al cargar archivo: {str(e)}"
 
+    @classmethod
+    def desde_tabla(
+        cls,
+        tabla: TablaBoletos,
+        config: Optional[AppConfig] = None,
+        huella: str = "",
+    ) -> "ReporteProcessor":
+        """
+        Procesador sobre una tabla ya limpia (por ejemplo, la de la caché de
+        reportes), sin volver a leer el archivo.
+
+        Args:
+            tabla: Tabla de boletos del reporte
+            config: Configuración de la aplicación
+            huella: Huella del archivo que se buscó en la caché, si no es el
+                reporte de la tabla (un archivo exportado enlazado a ella)
+
+        Returns:
+            ReporteProcessor listo para obtener boletos y exportar
+        """
+        procesador = cls(config)
+        procesador.tabla = tabla
+        procesador.df = tabla.df
+        procesador.columnas_detectadas = tabla.columnas_detectadas
+        procesador.huella = huella or tabla.huella
+        procesador.huella_reporte = tabla.huella
+        procesador.ruta_archivo = tabla.ruta_reporte or None
+        return procesador
+
+    @staticmethod
+    def _leer_columnar(
+        ruta_archivo: str, extension: str, columnas: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """Lee un .parquet/.feather exportado, con sus columnas tipadas"""
+        try:
+            if extension == ".parquet":
+                return pd.read_parquet(ruta_archivo, columns=columnas)
+            return pd.read_feather(ruta_archivo, columns=columnas)
+        except ImportError as e:
+            raise ValueError(
+                f"Leer archivos {extension} requiere pyarrow (pip install pyarrow)"
+            ) from e
+
+    @staticmethod
+    def _escribir_columnar(df: pd.DataFrame, ruta_salida: str, extension: str) -> None:
+        """Escribe un DataFrame como .parquet/.feather"""
+        try:
+            if extension == ".parquet":
+                df.to_parquet(ruta_salida, index=False)
+            else:
+                # Feather no guarda el índice: debe ser el rango por defecto
+                df.reset_index(drop=True).to_feather(ruta_salida)
+        except ImportError as e:
+            raise ValueError(
+                f"Exportar a {extension} requiere pyarrow (pip install pyarrow)"
+            ) from e
+
+    @staticmethod
+    def _calcular_huella(ruta_archivo: str) -> str:
+        """SHA-256 del contenido del archivo, leído por bloques"""
+        sha = hashlib.sha256()
+        with open(ruta_archivo, "rb") as f:
+            for bloque in iter(lambda: f.read(1 << 20), b""):
+                sha.update(bloque)
+        return sha.hexdigest()
+
+    def cargar_archivo_perfilado(
+        self,
+        ruta_archivo: str,
+        medir_memoria: bool = True,
+        usar_cprofile: bool = False,
+    ) -> Tuple[bool, str, List[Boleto], PerfilCarga]:
+        """
+        Carga un archivo y convierte sus filas en boletos midiendo cada etapa.
+
+        Args:
+            ruta_archivo: Ruta completa al archivo
+            medir_memoria: Registrar el pico de memoria con tracemalloc
+            usar_cprofile: Capturar un perfil cProfile (.prof junto al reporte)
+
+        Returns:
+            Tuple (éxito, mensaje, lista_de_boletos, perfil)
+        """
+        import tracemalloc
+
+        iniciado_aqui = False
+        if medir_memoria:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                iniciado_aqui = True
+            tracemalloc.reset_peak()
+
+        perfilador = None
+        if usar_cprofile:
+            import cProfile
+
+            perfilador = cProfile.Profile()
+            perfilador.enable()
+
+        boletos = []
+        try:
+            exito, mensaje = self.cargar_archivo(ruta_archivo)
+            if exito:
+                boletos = self.obtener_boletos()
+        finally:
+            if perfilador is not None:
+                perfilador.disable()
+
+            pico_memoria = None
+            if medir_memoria:
+                pico_memoria = tracemalloc.get_traced_memory()[1]
+                if iniciado_aqui:
+                    tracemalloc.stop()
+
+        perfil = self.perfil_carga or PerfilCarga(ruta_archivo=ruta_archivo)
+        perfil.pico_memoria_bytes = pico_memoria
+
+        if perfilador is not None:
+            self._guardar_cprofile(perfilador, perfil)
+
+        return exito, mensaje, boletos, perfil
+
+    def _guardar_cprofile(self, perfilador, perfil: PerfilCarga) -> None:
+        """Guarda el .prof junto al reporte y un resumen legible en el perfil"""
+        import io
+        import pstats
+
+        salida = io.StringIO()
+        estadisticas = pstats.Stats(perfilador, stream=salida)
+        estadisticas.sort_stats("cumulative").print_stats(25)
+        perfil.resumen_cprofile = salida.getvalue()
+
+        try:
+            ruta_prof = perfil.ruta_junto_a_reporte(".prof")
+            estadisticas.dump_stats(ruta_prof)
+            perfil.ruta_cprofile = ruta_prof
+        except Exception as e:
+            self.errores.append(f"No se pudo guardar el perfil cProfile: {e}")
+
+    def _registrar_descarte(self, filtro: str, filas_antes: int) -> None:
+        """Anota en el perfil las filas que eliminó un filtro de limpieza"""
+        if self.perfil_carga is not None:
+            self.perfil_carga.registrar_descarte(filtro, filas_antes - len(self.df))
+
     def _detectar_columnas(self) -> None:
         """Detecta automáticamente las columnas relevantes en el DataFrame"""
         if self.df is None or self.df.empty:
@@ -195,7 +394,9 @@ class ReporteProcessor:
             return
 
         # 1. Eliminar filas completamente vacías
+        filas_antes = len(self.df)
         self.df = self.df.dropna(how="all")
+        self._registrar_descarte("filas_vacias", filas_antes)
 
         # 2. Limpiar código de barras (columna clave) - PRESERVANDO CEROS A LA IZQUIERDA
         col_codigo = self.columnas_detectadas.get(self.constantes.COLUMNA_CODIGO_BARRA)
@@ -205,24 +406,34 @@ class ReporteProcessor:
                 lambda x: str(x).strip() if pd.notna(x) else ""
             )
             # Eliminar filas con código vacío
+            filas_antes = len(self.df)
             self.df = self.df[self.df[col_codigo] != ""]
+            self._registrar_descarte("codigo_vacio", filas_antes)
+
+            filas_antes = len(self.df)
             self.df = self.df[self.df[col_codigo].astype(str) != "nan"]
+            self._registrar_descarte("codigo_nan", filas_antes)
+
+            filas_antes = len(self.df)
             self.df = self.df[self.df[col_codigo].astype(str) != "None"]
+            self._registrar_descarte("codigo_none", filas_antes)
 
-        # 3. Limpiar otras columnas de texto
-        columnas_texto = [
-            self.columnas_detectadas.get(self.constantes.COLUMNA_SUCURSAL),
-            self.columnas_detectadas.get(self.constantes.COLUMNA_VENDEDOR_NOMBRE),
-            self.columnas_detectadas.get(self.constantes.COLUMNA_TIPO_PREMIO),
-            self.columnas_detectadas.get(self.constantes.COLUMNA_VENDEDOR_DOC),
+        # 3. Limpiar otras columnas de texto. PDV, vendedor y tipo de premio
+        # tienen unos cientos de valores distintos en cientos de miles de
+        # filas: quedan como categóricas (códigos enteros + valores únicos)
+        columnas_categoricas = self._columnas_categoricas()
+        columnas_texto = columnas_categoricas + [
             self.columnas_detectadas.get(self.constantes.COLUMNA_FECHA_PAGO),
         ]
 
         for col in columnas_texto:
             if col and col in self.df.columns:
-                self.df[col] = self.df[col].apply(
-                    lambda x: str(x).strip() if pd.notna(x) else ""
-                )
+                if col in columnas_categoricas:
+                    self.df[col] = self._texto_categorico(self.df[col])
+                else:
+                    self.df[col] = self.df[col].apply(
+                        lambda x: str(x).strip() if pd.notna(x) else ""
+                    )
 
         # 4. Limpiar columna de monto premio
         col_monto = self.columnas_detectadas.get(self.constantes.COLUMNA_MONTO_PREMIO)
@@ -234,7 +445,47 @@ class ReporteProcessor:
 
         # 5. Eliminar duplicados por código de barras
         if col_codigo:
+            filas_antes = len(self.df)
             self.df = self.df.drop_duplicates(subset=[col_codigo], keep="first")
+            self._registrar_descarte("codigo_duplicado", filas_antes)
+
+        # 6. Categorías que solo estaban en filas descartadas
+        for col in columnas_categoricas:
+            if col and isinstance(self.df[col].dtype, pd.CategoricalDtype):
+                self.df[col] = self.df[col].cat.remove_unused_categories()
+
+    def _columnas_categoricas(self) -> List[str]:
+        """Columnas detectadas de texto repetitivo que se guardan categóricas"""
+        # La detección aproximada puede asignar la columna del monto a un
+        # campo de texto ("TIPO PREMIO" ~ "TOTAL PREMIO"): esa queda numérica
+        col_monto = self.columnas_detectadas.get(self.constantes.COLUMNA_MONTO_PREMIO)
+        return [
+            col
+            for col in (
+                self.columnas_detectadas.get(self.constantes.COLUMNA_SUCURSAL),
+                self.columnas_detectadas.get(self.constantes.COLUMNA_VENDEDOR_NOMBRE),
+                self.columnas_detectadas.get(self.constantes.COLUMNA_TIPO_PREMIO),
+                self.columnas_detectadas.get(self.constantes.COLUMNA_VENDEDOR_DOC),
+            )
+            if col and col != col_monto
+        ]
+
+    @staticmethod
+    def _texto_categorico(serie: pd.Series) -> pd.Series:
+        """
+        Limpia una columna de texto y la codifica como categórica. El strip
+        se hace una vez por valor distinto y cada valor queda internado, así
+        los Boleto creados desde la columna comparten la misma cadena.
+        """
+        codigos, valores = pd.factorize(serie)  # Faltantes: código -1
+        # El último valor ("") recibe los faltantes al indexar con -1
+        limpios = [sys.intern(str(valor).strip()) for valor in valores] + [""]
+        codigos_limpios, categorias = pd.factorize(np.array(limpios, dtype=object))
+        return pd.Series(
+            pd.Categorical.from_codes(codigos_limpios[codigos], categories=categorias),
+            index=serie.index,
+            name=serie.name,
+        )
 
     def obtener_boletos(self) -> List[Boleto]:
         """
@@ -246,65 +497,22 @@ class ReporteProcessor:
         if self.df is None or self.df.empty:
             return []
 
-        boletos = []
+        if self.perfil_carga is None:
+            return self._crear_boletos()
 
-        for idx, fila in self.df.iterrows():
-            try:
-                # Obtener valores de las columnas detectadas
-                datos_boleto = {}
-
-                for col_estandar, col_real in self.columnas_detectadas.items():
-                    if col_real in fila:
-                        valor = fila[col_real]
-                        # Convertir a string preservando el formato
-                        if pd.isna(valor):
-                            datos_boleto[col_estandar] = ""
-                        else:
-                            # Para código de barras, preservar exactamente como está
-                            if col_estandar == self.constantes.COLUMNA_CODIGO_BARRA:
-                                # Preservar ceros a la izquierda y formato original
-                                datos_boleto[col_estandar] = str(valor).strip()
-                            else:
-                                datos_boleto[col_estandar] = str(valor).strip()
-                    else:
-                        datos_boleto[col_estandar] = ""
-
-                # Asegurar que el código sea string y tenga ceros a la izquierda
-                codigo = datos_boleto[self.constantes.COLUMNA_CODIGO_BARRA]
-
-                # Convertir monto premio a float seguro
-                monto_str = datos_boleto.get(self.constantes.COLUMNA_MONTO_PREMIO, "0")
-                try:
-                    monto = float(monto_str)
-                except (ValueError, TypeError):
-                    monto = 0.0
-
-                # Crear boleto
-                boleto = Boleto(
-                    codigo=codigo,
-                    sucursal=datos_boleto.get(self.constantes.COLUMNA_SUCURSAL, ""),
-                    vendedor_documento=datos_boleto.get(
-                        self.constantes.COLUMNA_VENDEDOR_DOC, ""
-                    ),
-                    vendedor_nombre=datos_boleto.get(
-                        self.constantes.COLUMNA_VENDEDOR_NOMBRE, ""
-                    ),
-                    fecha_pago=datos_boleto.get(self.constantes.COLUMNA_FECHA_PAGO, ""),
-                    monto_premio=monto,
-                    tipo_premio=datos_boleto.get(
-                        self.constantes.COLUMNA_TIPO_PREMIO, ""
-                    ),
-                    datos_originales=fila.to_dict(),
-                )
-
-                boletos.append(boleto)
-
-            except Exception as e:
-                error_msg = f"Error procesando fila {idx}: {str(e)}"
-                self.errores.append(error_msg)
-                if self.config.debug_mode:
-                    print(f"DEBUG: {error_msg}")
+        with self.perfil_carga.etapa("obtener_boletos", len(self.df)) as etapa:
+            boletos = self._crear_boletos()
+            etapa.filas_salida = len(boletos)
+        return boletos
 
+    def _crear_boletos(self) -> List[Boleto]:
+        """Crea un Boleto por fila desde las columnas de la tabla"""
+        errores: List[str] = []
+        boletos = self.tabla.crear_boletos(errores)
+        self.errores.extend(errores)
+        if self.config.debug_mode:
+            for error_msg in errores:
+                print(f"DEBUG: {error_msg}")
         return boletos
 
     def obtener_resumen(self) -> Dict[str, Any]:
@@ -333,6 +541,11 @@ class ReporteProcessor:
                 "fecha_carga": datetime.now().isoformat(),
             }
 
+            # Códigos con dígito de control EAN-13 incorrecto (en lote)
+            if col_codigo:
+                validos = validar_ean13_lote(self.df[col_codigo].astype(str))
+                resumen["codigos_digito_control_invalido"] = validos.count(False)
+
             # Estadísticas por sucursal si existe la columna
             col_sucursal = self.columnas_detectadas.get(
                 self.constantes.COLUMNA_SUCURSAL
@@ -430,17 +643,15 @@ class ReporteProcessor:
     def exportar_con_resultados(self, sesion, ruta_salida: str) -> Tuple[bool, str]:
         """
         Exporta el reporte original con columnas adicionales de resultados.
+
+        En Excel/CSV solo agrega VALIDADO. En .parquet/.feather agrega además
+        el estado como categórico y la hora de escaneo como fecha, así el
+        archivo se vuelve a leer con sus tipos sin convertir texto.
         """
         try:
             if self.df is None:
                 raise ValueError("No hay datos cargados para exportar")
 
-            # Crear copia del DataFrame original
-            df_export = self.df.copy()
-
-            # Agregar columnas de resultados - SOLO VALIDADO
-            resultados = []
-
             # Columna de código de barras detectada
             col_codigo = self.columnas_detectadas.get(
                 self.constantes.COLUMNA_CODIGO_BARRA
@@ -448,138 +659,237 @@ class ReporteProcessor:
             if not col_codigo:
                 raise ValueError("No se detectó columna de código de barras")
 
-            # Importar EstadoBoleto aquí para la comparación
-            from inventario_boletos.core.entities import EstadoBoleto
-
-            # Para cada fila en el DataFrame original
-            for _, fila in df_export.iterrows():
-                codigo = str(fila[col_codigo]).strip()
-                boleto = sesion.buscar_boleto(codigo)
+            # Copia del original sin resultados de una exportación anterior
+            col_estado = self.constantes.COLUMNA_ESTADO_ESCANEO
+            col_hora = self.constantes.COLUMNA_HORA_ESCANEO
+            df_export = self.df.drop(columns=[col_estado, col_hora], errors="ignore")
 
-                if boleto and boleto.estado == EstadoBoleto.ESCANEADO:
-                    resultados.append({"VALIDADO": "OK"})
-                else:
-                    resultados.append({"VALIDADO": ""})
-
-            # Convertir resultados a DataFrame y unir
-            df_resultados = pd.DataFrame(resultados)
-            df_export = pd.concat([df_export, df_resultados], axis=1)
+            estados, horas = self._resultados_de_sesion(sesion, df_export[col_codigo])
+            df_export[self.constantes.COLUMNA_VALIDADO] = np.where(
+                estados == EstadoBoleto.ESCANEADO.value, "OK", ""
+            )
 
             # Guardar archivo según extensión
             extension = os.path.splitext(ruta_salida)[1].lower()
 
-            if extension == ".csv":
+            if extension in self.constantes.EXTENSIONES_COLUMNARES:
+                df_export[col_estado] = pd.Categorical(
+                    estados, categories=[estado.value for estado in EstadoBoleto]
+                )
+                df_export[col_hora] = pd.to_datetime(horas)
+                self._escribir_columnar(df_export, ruta_salida, extension)
+            elif extension == ".csv":
                 df_export.to_csv(
                     ruta_salida, index=False, encoding=self.constantes.ENCODING
                 )
             else:
                 df_export.to_excel(ruta_salida, index=False)
 
-            return True, f"Archivo exportado exitosamente: {ruta_salida}"
+            # Enlace a la caché del reporte (guardada al cargarlo): continuar
+            # desde este archivo lee solo el código y los estados
+            mensaje = f"Archivo exportado exitosamente: {ruta_salida}"
+            if self.tabla is not None:
+                self.tabla.esperar_cache()  # Guardada en segundo plano
+            if self.tabla is not None and self.tabla.ruta_en_cache:
+                enlazado, detalle = self.tabla.enlazar_cache(
+                    self._calcular_huella(ruta_salida)
+                )
+                if not enlazado:
+                    self.errores.append(detalle)
+                    mensaje += f"\n({detalle})"
+
+            return True, mensaje
 
         except Exception as e:
             return False, f"Error al exportar: {str(e)}"
 
+    @staticmethod
+    def _resultados_de_sesion(sesion, codigos: pd.Series) -> Tuple[np.ndarray, list]:
+        """
+        Estado y hora de escaneo de cada fila según la sesión, en el orden
+        del DataFrame (None si el código no está en la sesión).
+
+        Returns:
+            Tuple (arreglo de valores de EstadoBoleto, lista de datetime/None)
+        """
+        boletos = sesion.boletos
+        estados = []
+        horas = []
+        for codigo in codigos.astype(str).str.strip():
+            boleto = boletos.get(codigo)
+            if boleto is None:
+                estados.append(None)
+                horas.append(None)
+            else:
+                estados.append(boleto.estado.value)
+                horas.append(boleto.fecha_escaneo)
+        return np.array(estados, dtype=object), horas
+
     def cargar_reporte_con_estados(self, ruta_archivo: str):
         """
         Carga un reporte que ya contiene columna de estado VALIDADO.
 
+        Si el archivo está enlazado a la caché del reporte original (se
+        exportó desde esta aplicación), solo se leen el código de barras y
+        las columnas de estado; los demás datos salen de la caché.
+
         Returns:
             Tuple (éxito, mensaje, lista_de_boletos)
         """
         try:
+            mensaje_exito = "Reporte con estado VALIDADO cargado exitosamente"
+
+            aviso_cache = ""
+            if os.path.exists(ruta_archivo):
+                boletos, aviso_cache = self._cargar_estados_desde_cache(ruta_archivo)
+                if boletos is not None:
+                    return True, mensaje_exito, boletos
+
             # Cargar archivo normalmente
             exito, mensaje = self.cargar_archivo(ruta_archivo)
             if not exito:
                 return False, mensaje, []
+            if aviso_cache:
+                self.errores.append(aviso_cache)
+                mensaje_exito += f"\n({aviso_cache})"
 
             # Verificar que tenga columna VALIDADO (antes era ESTADO_ESCANEO)
-            tiene_valido = "VALIDADO" in self.df.columns
+            tiene_valido = self.constantes.COLUMNA_VALIDADO in self.df.columns
             if not tiene_valido:
                 return False, "El archivo no contiene columna 'VALIDADO'", []
 
             # Obtener boletos con sus estados
             boletos_con_estado = self._obtener_boletos_con_estado()
 
-            return (
-                True,
-                "Reporte con estado VALIDADO cargado exitosamente",
-                boletos_con_estado,
-            )
+            return True, mensaje_exito, boletos_con_estado
 
         except Exception as e:
             return False, f"Error al cargar reporte con estados: {str(e)}", []
 
-    def _obtener_boletos_con_estado(self):
-        """Obtiene boletos desde un reporte que ya tiene columna VALIDADO"""
-        if self.df is None or self.df.empty:
-            return []
-
-        boletos = []
+    def _cargar_estados_desde_cache(
+        self, ruta_archivo: str
+    ) -> Tuple[Optional[List[Boleto]], str]:
+        """
+        Camino rápido de cargar_reporte_con_estados: tabla desde la caché
+        de reportes y estados leyendo solo sus columnas del archivo.
 
-        for idx, fila in self.df.iterrows():
-            try:
-                # Obtener datos básicos
-                datos_boleto = {}
-                for col_estandar, col_real in self.columnas_detectadas.items():
-                    if col_real in fila:
-                        valor = fila[col_real]
-                        datos_boleto[col_estandar] = (
-                            str(valor).strip() if pd.notna(valor) else ""
-                        )
-                    else:
-                        datos_boleto[col_estandar] = ""
-
-                # Obtener valor de VALIDADO si existe
-                validado_str = str(fila.get("VALIDADO", "")).strip()
-
-                # Asegurar que el código sea string
-                codigo = datos_boleto[self.constantes.COLUMNA_CODIGO_BARRA]
-
-                # Convertir monto premio
-                monto_str = datos_boleto.get(self.constantes.COLUMNA_MONTO_PREMIO, "0")
-                try:
-                    monto = float(monto_str)
-                except:
-                    monto = 0.0
-
-                # Crear boleto
-                boleto = Boleto(
-                    codigo=codigo,
-                    sucursal=datos_boleto.get(self.constantes.COLUMNA_SUCURSAL, ""),
-                    vendedor_documento=datos_boleto.get(
-                        self.constantes.COLUMNA_VENDEDOR_DOC, ""
-                    ),
-                    vendedor_nombre=datos_boleto.get(
-                        self.constantes.COLUMNA_VENDEDOR_NOMBRE, ""
-                    ),
-                    fecha_pago=datos_boleto.get(self.constantes.COLUMNA_FECHA_PAGO, ""),
-                    monto_premio=monto,
-                    tipo_premio=datos_boleto.get(
-                        self.constantes.COLUMNA_TIPO_PREMIO, ""
-                    ),
-                    datos_originales=fila.to_dict(),
+        Returns:
+            Tuple (lista de boletos, aviso). La lista es None si no hay caché
+            o el archivo no trae las columnas esperadas (se carga completo);
+            el aviso dice por qué, o queda vacío si simplemente no había caché
+        """
+        huella = self._calcular_huella(ruta_archivo)
+        tabla, aviso = TablaBoletos.cargar_cache(huella)
+        if tabla is None:
+            return None, aviso
+
+        col_codigo = tabla.columnas_detectadas.get(self.constantes.COLUMNA_CODIGO_BARRA)
+        columnas = [col_codigo, self.constantes.COLUMNA_VALIDADO]
+        extension = os.path.splitext(ruta_archivo)[1].lower()
+        try:
+            if extension == ".csv":
+                df_estados = pd.read_csv(
+                    ruta_archivo,
+                    encoding=self.constantes.ENCODING,
+                    dtype=str,
+                    usecols=columnas,
                 )
+            elif extension in self.constantes.EXTENSIONES_COLUMNARES:
+                columnas += [
+                    self.constantes.COLUMNA_ESTADO_ESCANEO,
+                    self.constantes.COLUMNA_HORA_ESCANEO,
+                ]
+                df_estados = self._leer_columnar(ruta_archivo, extension, columnas)
+            else:
+                df_estados = pd.read_excel(ruta_archivo, dtype=str, usecols=columnas)
+        except ValueError as e:
+            # Columnas renombradas o faltantes: cargar el archivo completo
+            return None, f"Reporte con estados leído completo: {e}"
+
+        # Los datos del reporte son los de la caché, pero el procesador queda
+        # identificado por el archivo cargado (diario sin guardar, sesiones
+        # con varios reportes); la huella del original queda para la caché
+        self.tabla = tabla
+        self.df = tabla.df
+        self.columnas_detectadas = tabla.columnas_detectadas
+        self.huella = huella
+        self.huella_reporte = tabla.huella
+        self.ruta_archivo = ruta_archivo
+
+        return self._obtener_boletos_con_estado(df_estados), ""
+
+    def _obtener_boletos_con_estado(
+        self, df_estados: Optional[pd.DataFrame] = None
+    ) -> List[Boleto]:
+        """
+        Obtiene boletos desde un reporte que ya tiene columna VALIDADO.
 
-                # Importar EstadoBoleto
-                from inventario_boletos.core.entities import EstadoBoleto
-
-                # Determinar estado basado en columna VALIDADO
-                # Si tiene "OK", significa que fue escaneado previamente
-                if validado_str.upper() == "OK":
-                    boleto.estado = EstadoBoleto.ESCANEADO
-                    # También podemos marcar que ya fue escaneado
-                    boleto.escaneos_realizados = 1
-                else:
-                    # Si no tiene "OK", asumimos PENDIENTE
-                    boleto.estado = EstadoBoleto.PENDIENTE
-                    boleto.escaneos_realizados = 0
+        Args:
+            df_estados: Código de barras y columnas de estado del archivo
+                exportado (por defecto, el propio DataFrame cargado)
 
-                boletos.append(boleto)
+        Returns:
+            Lista de boletos con el estado de cada uno
+        """
+        if self.df is None or self.df.empty:
+            return []
 
-            except Exception as e:
-                error_msg = f"Error procesando fila {idx}: {str(e)}"
-                self.errores.append(error_msg)
+        boletos = self._crear_boletos()
+        if df_estados is None:
+            df_estados = self.df
+
+        col_codigo = self.columnas_detectadas[self.constantes.COLUMNA_CODIGO_BARRA]
+        col_validado = self.constantes.COLUMNA_VALIDADO
+        col_estado = self.constantes.COLUMNA_ESTADO_ESCANEO
+        col_hora = self.constantes.COLUMNA_HORA_ESCANEO
+        pendiente = EstadoBoleto.PENDIENTE.value
+
+        # Los formatos columnares traen el estado y la hora tipados; si no,
+        # "OK" en VALIDADO significa que fue escaneado previamente
+        if col_estado in df_estados.columns:
+            estados = df_estados[col_estado].astype(object)
+            estados = estados.where(estados.isin(EstadoBoleto.__members__), pendiente)
+        else:
+            # Se compara cada valor distinto una vez, no cada fila
+            codigos_validado, valores = pd.factorize(df_estados[col_validado])
+            ok = np.array(
+                [str(valor).strip().upper() == "OK" for valor in valores] + [False]
+            )
+            estados = pd.Series(
+                np.where(ok[codigos_validado], EstadoBoleto.ESCANEADO.value, pendiente),
+                index=df_estados.index,
+            )
+        estados = estados.to_numpy()
+        horas = (
+            pd.to_datetime(df_estados[col_hora], errors="coerce").to_numpy()
+            if col_hora in df_estados.columns
+            else None
+        )
+
+        # Fila del archivo de estados de cada boleto, buscando por código (si
+        # un código se repite vale su primera fila, como al limpiar)
+        codigos = df_estados[col_codigo].fillna("").astype(str).str.strip()
+        primeras = ~codigos.duplicated().to_numpy()
+        if not primeras.all():
+            codigos = codigos[primeras]
+            estados = estados[primeras]
+            horas = horas[primeras] if horas is not None else None
+        if len(boletos) == len(self.df):
+            # Los boletos salen de la tabla en su orden: sus códigos son la columna
+            codigos_boletos = self.df[col_codigo].to_numpy()
+        else:
+            codigos_boletos = [boleto.codigo for boleto in boletos]
+        posiciones = pd.Index(codigos).get_indexer(codigos_boletos)
+        estados_boletos = np.where(posiciones >= 0, estados[posiciones], pendiente)
+
+        # Solo se tocan los boletos ya escaneados
+        for i in np.flatnonzero(estados_boletos != pendiente):
+            boleto = boletos[i]
+            boleto.estado = EstadoBoleto(estados_boletos[i])
+            boleto.escaneos_realizados = 1
+            hora = horas[posiciones[i]] if horas is not None else None
+            if hora is not None and not pd.isna(hora):
+                boleto.fecha_escaneo = pd.Timestamp(hora).to_pydatetime()
 
         return boletos
 
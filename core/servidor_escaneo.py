@@ -0,0 +1,503 @@
+"""
+SERVIDOR DE ESCANEO EN RED
+Servidor asyncio (solo biblioteca estándar) que expone el escaneo de una
+SesionInventario a varias estaciones de la misma red local
+"""
+
+import argparse
+import asyncio
+import random
+import socket
+import threading
+import time
+from collections import Counter, deque
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from inventario_boletos.config.constants import AppConstants
+from inventario_boletos.core.entities import Boleto, SesionInventario
+
+
+def _sin_retardo_nagle(writer: asyncio.StreamWriter) -> None:
+    """Desactiva Nagle para que cada respuesta corta salga de inmediato"""
+    sock = writer.get_extra_info("socket")
+    if sock is not None:
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            pass
+
+
+class ServidorEscaneo:
+    """
+    Servidor TCP de escaneo para estaciones remotas.
+
+    Protocolo por líneas (UTF-8): la estación envía un código por línea y
+    recibe, en el mismo orden, una línea "RESULTADO CODIGO" donde RESULTADO
+    es EXITO, DUPLICADO, NO_ENCONTRADO, LECTURA_INVALIDA o ERROR. Tras ERROR
+    sigue el motivo ("ERROR CODIGO motivo"). Una estación puede enviar
+    varios códigos seguidos sin esperar cada respuesta.
+
+    Los códigos de todas las estaciones pasan por una cola acotada y se
+    procesan por lotes con SesionInventario.procesar_escaneos_lote, en un
+    hilo aparte para que el event loop siga atendiendo conexiones. Cuando
+    la cola se llena el servidor deja de leer de los sockets, de modo que el
+    propio TCP frena a las estaciones (backpressure).
+    """
+
+    def __init__(
+        self,
+        sesion: Optional[SesionInventario],
+        host: Optional[str] = None,
+        puerto: Optional[int] = None,
+        on_escaneo: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        """
+        Inicializa el servidor (no abre el puerto todavía).
+
+        Args:
+            sesion: Sesión cuyos boletos se escanean
+            host: Interfaz donde escuchar ("0.0.0.0" para toda la red local)
+            puerto: Puerto TCP (0 elige uno libre)
+            on_escaneo: Callback opcional por cada resultado (hilo del servidor)
+        """
+        constantes = AppConstants()
+        self.sesion = sesion
+        self.host = host or constantes.HOST_SERVIDOR_ESCANEO
+        self.puerto = constantes.PUERTO_SERVIDOR_ESCANEO if puerto is None else puerto
+        self.lote_maximo = constantes.LOTE_MAXIMO_SERVIDOR
+        self.cola_maxima = constantes.COLA_MAXIMA_SERVIDOR
+        self.on_escaneo = on_escaneo
+
+        self.escaneos_atendidos = 0
+        self.conexiones_activas = 0
+        # Último error al procesar un lote o en on_escaneo, para la interfaz
+        self.ultimo_error: Optional[str] = None
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._servidor: Optional[asyncio.AbstractServer] = None
+        self._cola: Optional[asyncio.Queue] = None
+        self._tarea_lotes: Optional[asyncio.Task] = None
+        self._hilo: Optional[threading.Thread] = None
+        self._listo = threading.Event()
+        self._error_inicio: Optional[str] = None
+
+    @property
+    def activo(self) -> bool:
+        """Indica si el servidor está aceptando conexiones"""
+        return self._servidor is not None and self._servidor.is_serving()
+
+    async def iniciar(self) -> None:
+        """Abre el puerto y arranca el procesador de lotes"""
+        self._loop = asyncio.get_running_loop()
+        self._cola = asyncio.Queue(maxsize=self.cola_maxima)
+        self._tarea_lotes = asyncio.create_task(self._procesar_lotes())
+        self._servidor = await asyncio.start_server(
+            self._atender_estacion, self.host, self.puerto
+        )
+        # Si se pidió el puerto 0, publicar el que asignó el sistema
+        self.puerto = self._servidor.sockets[0].getsockname()[1]
+
+    async def detener(self) -> None:
+        """Cierra el puerto y detiene el procesador de lotes"""
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+            self._servidor = None
+
+        if self._tarea_lotes is not None:
+            self._tarea_lotes.cancel()
+            try:
+                await self._tarea_lotes
+            except asyncio.CancelledError:
+                pass
+            self._tarea_lotes = None
+
+    async def servir_siempre(self) -> None:
+        """Inicia el servidor y atiende estaciones hasta ser cancelado"""
+        await self.iniciar()
+        try:
+            await self._servidor.serve_forever()
+        finally:
+            await self.detener()
+
+    def iniciar_en_hilo(self) -> Tuple[bool, str]:
+        """
+        Inicia el servidor en un hilo propio (para usarlo junto a Tkinter).
+
+        Returns:
+            Tuple (éxito, mensaje)
+        """
+        if self._hilo is not None and self._hilo.is_alive():
+            return True, f"Servidor ya activo en {self.host}:{self.puerto}"
+
+        self._listo.clear()
+        self._error_inicio = None
+
+        def _ejecutar():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self.iniciar())
+            except Exception as e:
+                self._error_inicio = str(e)
+                self._listo.set()
+                loop.close()
+                return
+
+            self._listo.set()
+            try:
+                loop.run_forever()
+            finally:
+                loop.run_until_complete(self.detener())
+                loop.close()
+
+        self._hilo = threading.Thread(
+            target=_ejecutar, name="ServidorEscaneo", daemon=True
+        )
+        self._hilo.start()
+        self._listo.wait(timeout=5)
+
+        if self._error_inicio:
+            return False, f"No se pudo iniciar el servidor: {self._error_inicio}"
+        return True, f"Servidor de escaneo escuchando en {self.host}:{self.puerto}"
+
+    def detener_hilo(self) -> None:
+        """Detiene un servidor iniciado con iniciar_en_hilo"""
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._hilo is not None:
+            self._hilo.join(timeout=5)
+            self._hilo = None
+
+    async def _procesar_lotes(self) -> None:
+        """Toma códigos de la cola y los procesa por lotes contra la sesión"""
+        while True:
+            pendientes = [await self._cola.get()]
+            while len(pendientes) < self.lote_maximo:
+                try:
+                    pendientes.append(self._cola.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            sesion = self.sesion
+            if sesion is None:
+                self._responder_error(pendientes, "No hay reporte cargado")
+                continue
+
+            # En un hilo del executor: mientras la sesión procesa el lote, el
+            # loop sigue leyendo y respondiendo a las demás estaciones
+            try:
+                resultados = await self._loop.run_in_executor(
+                    None,
+                    partial(
+                        sesion.procesar_escaneos_lote,
+                        [codigo for codigo, _ in pendientes],
+                        remoto=True,
+                    ),
+                )
+            except Exception as e:
+                self.ultimo_error = f"Error procesando lote de escaneos remotos: {e}"
+                self._responder_error(pendientes, str(e))
+                continue
+
+            for (_, futuro), resultado in zip(pendientes, resultados):
+                if not futuro.done():
+                    futuro.set_result(resultado)
+
+            self.escaneos_atendidos += len(resultados)
+
+            if self.on_escaneo:
+                for resultado in resultados:
+                    try:
+                        self.on_escaneo(resultado)
+                    except Exception as e:
+                        self.ultimo_error = f"Error en callback de escaneo remoto: {e}"
+
+    @staticmethod
+    def _responder_error(pendientes: List[Tuple[str, asyncio.Future]], motivo: str):
+        """Resuelve los códigos de un lote que no se pudo procesar con ERROR"""
+        for _, futuro in pendientes:
+            if not futuro.done():
+                futuro.set_result({"resultado": None, "mensaje": motivo})
+
+    async def _atender_estacion(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Lee códigos de una estación y encola sus respuestas en orden"""
+        _sin_retardo_nagle(writer)
+        self.conexiones_activas += 1
+
+        # Respuestas pendientes de esta estación; acotada para que una sola
+        # estación no acapare la cola global
+        en_vuelo: asyncio.Queue = asyncio.Queue(maxsize=self.lote_maximo)
+        escritor = asyncio.create_task(self._responder(en_vuelo, writer))
+
+        try:
+            while not escritor.done():
+                linea = await reader.readline()
+                if not linea:
+                    break
+
+                codigo = linea.decode(errors="replace").strip()
+                if not codigo:
+                    continue
+
+                futuro = self._loop.create_future()
+                await en_vuelo.put((codigo, futuro))
+                await self._cola.put((codigo, futuro))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if not escritor.done():
+                await en_vuelo.put(None)
+                try:
+                    await escritor
+                except Exception:
+                    pass
+            writer.close()
+            self.conexiones_activas -= 1
+
+    async def _responder(
+        self, en_vuelo: asyncio.Queue, writer: asyncio.StreamWriter
+    ) -> None:
+        """Escribe las respuestas de una estación en el orden de llegada"""
+        try:
+            while True:
+                item = await en_vuelo.get()
+                if item is None:
+                    break
+
+                codigo, futuro = item
+                resultado = await futuro
+                if resultado["resultado"] is None:
+                    # Una línea por código: el motivo no puede traer saltos
+                    motivo = " ".join(str(resultado.get("mensaje", "")).split())
+                    texto = f"ERROR {codigo} {motivo}".rstrip()
+                else:
+                    texto = f"{resultado['resultado'].value} {codigo}"
+
+                writer.write(f"{texto}\n".encode())
+
+                # Agrupar escrituras: vaciar el buffer solo si no hay más listas
+                if en_vuelo.empty():
+                    await writer.drain()
+        except ConnectionError:
+            pass
+
+
+class ClienteCargaEscaneo:
+    """
+    Cliente de prueba de carga: simula varias estaciones enviando códigos
+    en ráfaga y mide la latencia de cada respuesta.
+    """
+
+    def __init__(
+        self, host: str, puerto: int, conexiones: int = 4, ventana: int = 32
+    ):
+        """
+        Args:
+            host: Host del servidor
+            puerto: Puerto del servidor
+            conexiones: Número de estaciones simultáneas
+            ventana: Códigos enviados sin respuesta por estación
+        """
+        self.host = host
+        self.puerto = puerto
+        self.conexiones = max(1, conexiones)
+        self.ventana = max(1, ventana)
+
+    async def _estacion(
+        self, codigos: List[str], latencias: List[int], resultados: Counter
+    ) -> None:
+        """Envía una lista de códigos por una conexión y mide cada respuesta"""
+        reader, writer = await asyncio.open_connection(self.host, self.puerto)
+        _sin_retardo_nagle(writer)
+
+        enviados = deque()
+        ventana = asyncio.Semaphore(self.ventana)
+
+        async def _recibir():
+            for _ in codigos:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                latencias.append(time.perf_counter_ns() - enviados.popleft())
+                resultados[linea.split(b" ", 1)[0].decode()] += 1
+                ventana.release()
+
+        receptor = asyncio.create_task(_recibir())
+
+        for codigo in codigos:
+            await ventana.acquire()
+            enviados.append(time.perf_counter_ns())
+            writer.write(f"{codigo}\n".encode())
+            await writer.drain()
+
+        await receptor
+        writer.close()
+        await writer.wait_closed()
+
+    async def ejecutar(self, codigos: List[str]) -> Dict[str, Any]:
+        """
+        Reparte los códigos entre las estaciones y los envía.
+
+        Returns:
+            Diccionario con throughput, percentiles de latencia y resultados
+        """
+        latencias: List[int] = []
+        resultados: Counter = Counter()
+        partes = [codigos[i :: self.conexiones] for i in range(self.conexiones)]
+
+        inicio = time.perf_counter()
+        await asyncio.gather(
+            *(self._estacion(parte, latencias, resultados) for parte in partes if parte)
+        )
+        segundos = time.perf_counter() - inicio
+
+        latencias.sort()
+
+        def _percentil(p: float) -> float:
+            if not latencias:
+                return 0.0
+            indice = min(len(latencias) - 1, int(len(latencias) * p))
+            return round(latencias[indice] / 1e6, 3)
+
+        return {
+            "escaneos": len(latencias),
+            "conexiones": self.conexiones,
+            "segundos": round(segundos, 3),
+            "escaneos_por_segundo": round(len(latencias) / segundos, 1)
+            if segundos
+            else 0.0,
+            "latencia_p50_ms": _percentil(0.50),
+            "latencia_p95_ms": _percentil(0.95),
+            "latencia_p99_ms": _percentil(0.99),
+            "latencia_max_ms": _percentil(1.0),
+            "resultados": dict(resultados),
+        }
+
+
+async def _prueba_carga_local(
+    total_boletos: int, total_escaneos: int, conexiones: int, ventana: int
+) -> Dict[str, Any]:
+    """Levanta un servidor en loopback con una sesión sintética y lo carga"""
+    sesion = SesionInventario()
+    codigos = [f"{i:013d}" for i in range(1, total_boletos + 1)]
+    sesion.agregar_boletos([Boleto(codigo=codigo) for codigo in codigos])
+
+    servidor = ServidorEscaneo(sesion, host="127.0.0.1", puerto=0)
+    await servidor.iniciar()
+    try:
+        # Mezcla realista: mayoría de boletos válidos, algunos repetidos y ajenos
+        azar = random.Random(0)
+        muestra = []
+        for _ in range(total_escaneos):
+            if azar.random() < 0.05:
+                muestra.append(f"{azar.randrange(10**12, 10**13)}")
+            else:
+                muestra.append(azar.choice(codigos))
+
+        cliente = ClienteCargaEscaneo("127.0.0.1", servidor.puerto, conexiones, ventana)
+        return await cliente.ejecutar(muestra)
+    finally:
+        await servidor.detener()
+
+
+async def _sincronizar_indice(sesion: SesionInventario, intervalo: float) -> None:
+    """
+    Trae periódicamente a la sesión los escaneos que otros procesos marcan en
+    el índice compartido, fuera del bucle de eventos (toma el lock global)
+    """
+    loop = asyncio.get_running_loop()
+    while sesion.indice_compartido is not None:
+        await asyncio.sleep(intervalo)
+        await loop.run_in_executor(None, sesion.sincronizar_indice_compartido)
+    if sesion.aviso_indice_compartido:
+        print(sesion.aviso_indice_compartido)
+
+
+def _servir_reporte(
+    ruta_reporte: str, host: str, puerto: int, indice_compartido: bool = False
+) -> None:
+    """
+    Carga un reporte y lo expone a las estaciones hasta Ctrl+C. Con
+    indice_compartido publica además el índice mapeado en memoria para que
+    otros procesos (exportador, interfaz) se adjunten sin cargar el reporte.
+    """
+    from inventario_boletos.core.report_processor import ReporteProcessor
+
+    procesador = ReporteProcessor()
+    exito, mensaje = procesador.cargar_archivo(ruta_reporte)
+    if not exito:
+        raise SystemExit(mensaje)
+
+    sesion = SesionInventario(ruta_reporte_original=ruta_reporte)
+    sesion.agregar_boletos(procesador.obtener_boletos())
+    servidor = ServidorEscaneo(sesion, host=host, puerto=puerto)
+    publicado = False
+    if indice_compartido:
+        publicado, mensaje = sesion.publicar_indice_compartido()
+        print(mensaje)
+
+    async def _servir() -> None:
+        tareas = [servidor.servir_siempre()]
+        if publicado:
+            tareas.append(
+                _sincronizar_indice(
+                    sesion, sesion.constantes.INTERVALO_SINCRONIZAR_INDICE_S
+                )
+            )
+        await asyncio.gather(*tareas)
+
+    print(f"{len(sesion.boletos)} boletos cargados. Escuchando en {host}:{puerto}")
+    try:
+        asyncio.run(_servir())
+    except KeyboardInterrupt:
+        print(f"\n{sesion}")
+    finally:
+        sesion.cerrar_indice_compartido()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Punto de entrada de línea de comandos"""
+    constantes = AppConstants()
+    parser = argparse.ArgumentParser(description="Servidor de escaneo en red")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    servir = sub.add_parser("servir", help="Exponer un reporte a las estaciones")
+    servir.add_argument("reporte", help="Reporte Excel/CSV a inventariar")
+    servir.add_argument("--host", default=constantes.HOST_SERVIDOR_ESCANEO)
+    servir.add_argument(
+        "--puerto", type=int, default=constantes.PUERTO_SERVIDOR_ESCANEO
+    )
+    servir.add_argument(
+        "--indice-compartido",
+        action="store_true",
+        help="Publicar el índice de códigos mapeado en memoria junto al reporte",
+    )
+
+    carga = sub.add_parser("carga", help="Prueba de carga en loopback")
+    carga.add_argument("--boletos", type=int, default=100_000)
+    carga.add_argument("--escaneos", type=int, default=20_000)
+    carga.add_argument("--conexiones", type=int, default=6)
+    carga.add_argument("--ventana", type=int, default=1)
+
+    args = parser.parse_args(argv)
+
+    if args.comando == "servir":
+        _servir_reporte(
+            args.reporte, args.host, args.puerto, args.indice_compartido
+        )
+    else:
+        resumen = asyncio.run(
+            _prueba_carga_local(
+                args.boletos, args.escaneos, args.conexiones, args.ventana
+            )
+        )
+        for clave, valor in resumen.items():
+            print(f"{clave}: {valor}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+SUGERENCIAS PARA CÓDIGOS MAL LEÍDOS
+Un código de barras dañado suele leerse con un solo dígito cambiado: se
+buscan los códigos del reporte a distancia de Hamming 1 del leído
+"""
+
+from typing import Container, List
+
+DIGITOS = "0123456789"
+
+
+def vecinos_hamming(codigo: str) -> List[str]:
+    """
+    Genera todas las variantes del código con exactamente un dígito distinto.
+
+    Args:
+        codigo: Código de solo dígitos
+
+    Returns:
+        Lista de 9 * len(codigo) variantes (117 para 13 dígitos)
+    """
+    variantes = []
+    for posicion, original in enumerate(codigo):
+        prefijo = codigo[:posicion]
+        sufijo = codigo[posicion + 1 :]
+        for digito in DIGITOS:
+            if digito != original:
+                variantes.append(prefijo + digito + sufijo)
+    return variantes
+
+
+def sugerir_codigos(codigo: str, existentes: Container[str], maximo: int = 5) -> List[str]:
+    """
+    Busca códigos existentes a distancia de Hamming 1 del código leído.
+
+    No hace falta un índice aparte: cada variante se consulta en el
+    diccionario de boletos de la sesión (O(1)), unas 117 búsquedas en total
+    para un código de 13 dígitos, del orden de decenas de microsegundos.
+
+    Args:
+        codigo: Código normalizado que no se encontró
+        existentes: Conjunto o diccionario de códigos del reporte
+        maximo: Cantidad máxima de sugerencias
+
+    Returns:
+        Códigos sugeridos, de izquierda a derecha según el dígito cambiado
+    """
+    if not codigo or not codigo.isdigit():
+        return []
+
+    sugerencias = []
+    for variante in vecinos_hamming(codigo):
+        if variante in existentes:
+            sugerencias.append(variante)
+            if len(sugerencias) >= maximo:
+                break
+    return sugerencias
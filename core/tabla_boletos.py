@@ -0,0 +1,306 @@
+"""
+TABLA COLUMNAR DE BOLETOS
+Única copia de los datos del reporte ya limpio: el procesador la arma, los
+Boleto de la sesión se crean desde sus columnas y la exportación la lee.
+Se guarda en caché por huella del archivo para continuar un progreso sin
+volver a leer y limpiar el Excel
+"""
+
+import os
+import pickle
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from inventario_boletos.config.constants import AppConstants
+from inventario_boletos.core.entities import Boleto
+
+# Versión del formato de caché: otra versión se descarta y se relee el reporte
+VERSION_CACHE = 1
+# Enlace de la huella de otro archivo a la caché de una tabla
+EXTENSION_ENLACE = ".enlace"
+
+
+class TablaBoletos:
+    """
+    DataFrame limpio del reporte (texto repetitivo categórico, montos
+    numéricos) con las columnas detectadas. El índice es la fila del
+    reporte, la misma que guarda Boleto.fila.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        columnas_detectadas: Dict[str, str],
+        huella: str = "",
+        ruta_reporte: str = "",
+    ):
+        self.df = df
+        self.columnas_detectadas = columnas_detectadas
+        self.huella = huella
+        self.ruta_reporte = ruta_reporte
+        self.constantes = AppConstants()
+        # Archivo de caché de esta tabla, una vez guardada o leída de ahí
+        self.ruta_en_cache: Optional[str] = None
+        self._hilo_cache: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def _valores(self, columna_estandar: str, defecto: Any = "") -> List[Any]:
+        """Valores de una columna detectada, o el defecto en todas las filas"""
+        col = self.columnas_detectadas.get(columna_estandar)
+        if not col or col not in self.df.columns:
+            return [defecto] * len(self.df)
+        serie = self.df[col]
+        if defecto == "" and not (
+            isinstance(serie.dtype, pd.CategoricalDtype)
+            or pd.api.types.is_object_dtype(serie.dtype)
+        ):
+            # Columna de texto detectada sobre una numérica o de fechas
+            return [str(valor) if pd.notna(valor) else "" for valor in serie]
+        return serie.tolist()
+
+    def datos_de_fila(self, fila: int) -> Dict[str, Any]:
+        """Todas las columnas originales de una fila del reporte"""
+        return self.df.loc[fila].to_dict()
+
+    def crear_boletos(self, errores: Optional[List[str]] = None) -> List[Boleto]:
+        """
+        Crea un Boleto por fila recorriendo las columnas (no las filas). Los
+        textos categóricos se entregan como la cadena compartida de su
+        categoría.
+
+        Args:
+            errores: Lista donde anotar las filas que no se pudieron convertir
+
+        Returns:
+            Lista de objetos Boleto en el orden del reporte
+        """
+        c = self.constantes
+        columnas = zip(
+            self.df.index.tolist(),
+            self._valores(c.COLUMNA_CODIGO_BARRA),
+            self._valores(c.COLUMNA_SUCURSAL),
+            self._valores(c.COLUMNA_VENDEDOR_DOC),
+            self._valores(c.COLUMNA_VENDEDOR_NOMBRE),
+            self._valores(c.COLUMNA_FECHA_PAGO),
+            self._valores(c.COLUMNA_MONTO_PREMIO, 0.0),
+            self._valores(c.COLUMNA_TIPO_PREMIO),
+        )
+
+        boletos = []
+        for fila, codigo, sucursal, documento, vendedor, fecha, monto, tipo in columnas:
+            try:
+                try:
+                    monto = float(monto)
+                except (ValueError, TypeError):
+                    monto = 0.0
+                boletos.append(
+                    Boleto(
+                        codigo=codigo,
+                        sucursal=sucursal,
+                        vendedor_documento=documento,
+                        vendedor_nombre=vendedor,
+                        fecha_pago=fecha,
+                        monto_premio=monto,
+                        tipo_premio=tipo,
+                        fila=int(fila),
+                    )
+                )
+            except Exception as e:
+                if errores is not None:
+                    errores.append(f"Error procesando fila {fila}: {str(e)}")
+        return boletos
+
+    @staticmethod
+    def ruta_cache(huella: str, carpeta: Optional[str] = None) -> str:
+        """
+        Ruta del archivo de caché de una huella (no lo crea ni verifica
+        que exista).
+
+        Args:
+            huella: Huella SHA-256 del archivo del reporte
+            carpeta: Carpeta de la caché; por defecto CARPETA_CACHE_REPORTES
+
+        Returns:
+            Ruta del archivo .pkl de esa huella
+        """
+        carpeta = carpeta or AppConstants().CARPETA_CACHE_REPORTES
+        return os.path.join(carpeta, f"{huella}.pkl")
+
+    def guardar_cache(self, carpeta: Optional[str] = None) -> Tuple[bool, str]:
+        """
+        Guarda la tabla en la caché de reportes (una por huella). Se conservan
+        los MAX_CACHE_REPORTES archivos más recientes.
+
+        Returns:
+            Tuple (éxito, ruta del archivo de caché o mensaje de error)
+        """
+        if not self.huella:
+            return False, "La tabla no tiene huella de archivo"
+        if self.ruta_en_cache and os.path.exists(self.ruta_en_cache):
+            return True, self.ruta_en_cache
+        try:
+            ruta = self.ruta_cache(self.huella, carpeta)
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            if not os.path.exists(ruta):
+                temporal = f"{ruta}.tmp"
+                with open(temporal, "wb") as f:
+                    pickle.dump(
+                        {
+                            "version": VERSION_CACHE,
+                            "huella": self.huella,
+                            "ruta_reporte": self.ruta_reporte,
+                            "columnas_detectadas": self.columnas_detectadas,
+                            "df": self.df,
+                        },
+                        f,
+                        protocol=pickle.HIGHEST_PROTOCOL,
+                    )
+                os.replace(temporal, ruta)
+            else:
+                os.utime(ruta)  # Usada recién: que no se descarte
+            self._podar_cache(os.path.dirname(ruta))
+            self.ruta_en_cache = ruta
+            return True, ruta
+        except Exception as e:
+            return False, f"No se pudo guardar la caché del reporte: {e}"
+
+    def guardar_cache_en_segundo_plano(
+        self,
+        carpeta: Optional[str] = None,
+        al_fallar: Optional[Callable[[str], None]] = None,
+    ) -> threading.Thread:
+        """
+        Guarda la caché (guardar_cache) en un hilo aparte, así la carga del
+        reporte no espera a serializar la tabla. esperar_cache lo espera.
+
+        Args:
+            carpeta: Carpeta de la caché (se resuelve antes de lanzar el hilo)
+            al_fallar: Se llama con el mensaje si no se pudo guardar
+
+        Returns:
+            Hilo que guarda la caché
+        """
+        carpeta = os.path.dirname(self.ruta_cache(self.huella, carpeta))
+
+        def _guardar():
+            guardada, detalle = self.guardar_cache(carpeta)
+            if not guardada and al_fallar is not None:
+                al_fallar(detalle)
+
+        self._hilo_cache = threading.Thread(target=_guardar, name="cache-reporte")
+        self._hilo_cache.start()
+        return self._hilo_cache
+
+    def esperar_cache(self, timeout: Optional[float] = None) -> None:
+        """Espera a que termine de guardarse la caché, si se está guardando"""
+        if self._hilo_cache is not None:
+            self._hilo_cache.join(timeout)
+
+    def enlazar_cache(
+        self, huella_archivo: str, carpeta: Optional[str] = None
+    ) -> Tuple[bool, str]:
+        """
+        Enlaza otro archivo con los mismos boletos (por ejemplo, un reporte
+        exportado con la columna VALIDADO) a la caché de esta tabla, así
+        cargar_cache(huella_archivo) devuelve esta tabla.
+
+        Returns:
+            Tuple (éxito, ruta del enlace o mensaje de error)
+        """
+        if not self.huella or not huella_archivo or huella_archivo == self.huella:
+            return False, "No hay otra huella que enlazar"
+        try:
+            ruta = self.ruta_cache(huella_archivo, carpeta)[: -len(".pkl")]
+            ruta += EXTENSION_ENLACE
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            with open(ruta, "w", encoding="utf-8") as f:
+                f.write(self.huella)
+            return True, ruta
+        except Exception as e:
+            return False, f"No se pudo enlazar la caché del reporte: {e}"
+
+    def _podar_cache(self, carpeta: str) -> None:
+        """
+        Borra las cachés más viejas por encima de MAX_CACHE_REPORTES y los
+        enlaces que apuntaban a ellas
+        """
+        nombres = os.listdir(carpeta)
+        archivos = sorted(
+            (
+                os.path.join(carpeta, nombre)
+                for nombre in nombres
+                if nombre.endswith(".pkl")
+            ),
+            key=os.path.getmtime,
+            reverse=True,
+        )
+        for ruta in archivos[self.constantes.MAX_CACHE_REPORTES :]:
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+
+        for nombre in nombres:
+            if not nombre.endswith(EXTENSION_ENLACE):
+                continue
+            ruta = os.path.join(carpeta, nombre)
+            try:
+                with open(ruta, encoding="utf-8") as f:
+                    destino = f.read().strip()
+                if not os.path.exists(self.ruta_cache(destino, carpeta)):
+                    os.remove(ruta)
+            except OSError:
+                pass
+
+    @classmethod
+    def cargar_cache(
+        cls, huella: str, carpeta: Optional[str] = None
+    ) -> Tuple[Optional["TablaBoletos"], str]:
+        """
+        Recupera la tabla de un reporte por su huella, o por la de un
+        archivo enlazado a ella.
+
+        El archivo se deserializa con pickle, que puede ejecutar código: la
+        carpeta de caché del usuario se trata como entrada de confianza (solo
+        la escribe esta aplicación) y no debe apuntar a una carpeta
+        compartida.
+
+        Returns:
+            Tuple (TablaBoletos o None, mensaje). Sin caché para esa huella
+            el mensaje queda vacío; si la caché no se pudo usar, dice por qué
+        """
+        if not huella:
+            return None, ""
+        ruta = cls.ruta_cache(huella, carpeta)
+        if not os.path.exists(ruta):
+            # Archivo enlazado a la tabla de otro (ver enlazar_cache)
+            enlace = ruta[: -len(".pkl")] + EXTENSION_ENLACE
+            if not os.path.exists(enlace):
+                return None, ""
+            try:
+                with open(enlace, encoding="utf-8") as f:
+                    huella = f.read().strip()
+            except OSError as e:
+                return None, f"Enlace de caché ilegible: {e}"
+            ruta = cls.ruta_cache(huella, carpeta)
+            if not os.path.exists(ruta):
+                return None, ""
+        try:
+            with open(ruta, "rb") as f:
+                datos = pickle.load(f)
+            if datos.get("version") != VERSION_CACHE or datos.get("huella") != huella:
+                return None, "Caché de reporte de otra versión: se relee el reporte"
+            tabla = cls(
+                datos["df"],
+                datos["columnas_detectadas"],
+                huella=huella,
+                ruta_reporte=datos.get("ruta_reporte", ""),
+            )
+            tabla.ruta_en_cache = ruta
+            return tabla, ""
+        except Exception as e:
+            return None, f"Caché de reporte ignorada ({os.path.basename(ruta)}): {e}"
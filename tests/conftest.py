@@ -0,0 +1,59 @@
+"""
+Configuración común de las pruebas: el repositorio es el paquete
+inventario_boletos, aunque la carpeta clonada tenga otro nombre
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+if importlib.util.find_spec("inventario_boletos") is None:
+    spec = importlib.util.spec_from_file_location(
+        "inventario_boletos",
+        RAIZ / "__init__.py",
+        submodule_search_locations=[str(RAIZ)],
+    )
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules["inventario_boletos"] = modulo
+    spec.loader.exec_module(modulo)
+
+from inventario_boletos.core.entities import Boleto, SesionInventario  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def hogar(tmp_path, monkeypatch):
+    """Carpeta personal temporal: caché de reportes, registro y progresos"""
+    carpeta = tmp_path / "hogar"
+    carpeta.mkdir()
+    monkeypatch.setenv("HOME", str(carpeta))
+    monkeypatch.setenv("USERPROFILE", str(carpeta))
+    return carpeta
+
+
+def codigos_ean13(cantidad: int, inicio: int = 779000000000):
+    """Códigos EAN-13 válidos y consecutivos"""
+    codigos = []
+    for base in range(inicio, inicio + cantidad):
+        primeros_doce = f"{base:012d}"
+        suma = sum(
+            int(digito) * (3 if posicion % 2 else 1)
+            for posicion, digito in enumerate(primeros_doce)
+        )
+        codigos.append(f"{primeros_doce}{(10 - suma % 10) % 10}")
+    return codigos
+
+
+def nueva_sesion(codigos, ruta: str = "reporte.xlsx"):
+    """Sesión con un boleto por código"""
+    sesion = SesionInventario(ruta_reporte_original=ruta)
+    sesion.agregar_boletos(
+        [
+            Boleto(codigo=codigo, sucursal="PDV 1", monto_premio=10.0)
+            for codigo in codigos
+        ]
+    )
+    return sesion
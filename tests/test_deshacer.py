@@ -0,0 +1,83 @@
+"""Deshacer y rehacer escaneos"""
+
+from conftest import codigos_ean13, nueva_sesion
+from inventario_boletos.core.entities import EstadoBoleto
+
+
+def test_deshacer_y_rehacer_restauran_estado_y_contadores():
+    codigos = codigos_ean13(5)
+    sesion = nueva_sesion(codigos)
+    sesion.procesar_escaneo(codigos[0])
+    sesion.procesar_escaneo(codigos[1])
+    sesion.procesar_escaneo(codigos[1])  # Duplicado: no entra al historial
+    fecha = sesion.boletos[codigos[1]].fecha_escaneo
+
+    exito, _ = sesion.deshacer_escaneo()
+    assert exito
+    boleto = sesion.boletos[codigos[1]]
+    assert boleto.estado == EstadoBoleto.PENDIENTE
+    assert boleto.fecha_escaneo is None
+    assert sesion.estadisticas.escaneados == 1
+    assert sesion.estadisticas.pendientes == 4
+    assert sesion.agregados.general.escaneados == 1
+
+    exito, _ = sesion.rehacer_escaneo()
+    assert exito
+    assert boleto.estado == EstadoBoleto.ESCANEADO
+    assert boleto.fecha_escaneo == fecha
+    assert sesion.estadisticas.escaneados == 2
+
+    assert sesion.deshacer_escaneo()[0]
+    assert sesion.deshacer_escaneo()[0]
+    exito, mensaje = sesion.deshacer_escaneo()
+    assert not exito
+    assert mensaje == "No hay escaneos para deshacer"
+    assert sesion.estadisticas.escaneados == 0
+    assert sesion.estadisticas.pendientes == 5
+
+
+def test_escaneo_nuevo_descarta_lo_que_se_podia_rehacer():
+    codigos = codigos_ean13(3)
+    sesion = nueva_sesion(codigos)
+    sesion.procesar_escaneo(codigos[0])
+    sesion.deshacer_escaneo()
+    sesion.procesar_escaneo(codigos[1])
+
+    exito, _ = sesion.rehacer_escaneo()
+    assert not exito
+    assert sesion.boletos[codigos[0]].estado == EstadoBoleto.PENDIENTE
+
+
+def test_escaneos_remotos_no_se_deshacen_localmente():
+    codigos = codigos_ean13(3)
+    sesion = nueva_sesion(codigos)
+    sesion.procesar_escaneo(codigos[0])
+    sesion.procesar_escaneos_lote([codigos[1]], remoto=True)
+
+    exito, mensaje = sesion.deshacer_escaneo()
+    assert exito
+    assert codigos[0] in mensaje
+    assert not sesion.deshacer_escaneo()[0]
+    assert sesion.boletos[codigos[1]].estado == EstadoBoleto.ESCANEADO
+
+    # Lo deshecho que otra estación volvió a escanear ya no se rehace
+    sesion.procesar_escaneos_lote([codigos[0]], remoto=True)
+    assert not sesion.rehacer_escaneo()[0]
+    assert sesion.estadisticas.escaneados == 2
+
+
+def test_deshacer_se_anota_en_el_diario(tmp_path):
+    codigos = codigos_ean13(3)
+    sesion = nueva_sesion(codigos)
+    ruta = tmp_path / "progreso.json"
+    assert sesion.guardar_progreso_rapido(str(ruta))[0]
+    sesion.procesar_escaneo(codigos[0])
+    sesion.procesar_escaneo(codigos[1])
+    sesion.deshacer_escaneo()
+    sesion.cerrar_diario()
+
+    _, _, cargada = type(sesion).cargar_progreso_rapido(str(ruta))
+    assert cargada.boletos[codigos[0]].estado == EstadoBoleto.ESCANEADO
+    assert cargada.boletos[codigos[1]].estado == EstadoBoleto.PENDIENTE
+    assert cargada.estadisticas.escaneados == 1
+    cargada.cerrar_diario()
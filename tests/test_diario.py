@@ -0,0 +1,102 @@
+"""Diario de cambios: recuperar lo escaneado después del último guardado"""
+
+import os
+
+from conftest import codigos_ean13, nueva_sesion
+from inventario_boletos.core.entities import EstadoBoleto, SesionInventario
+
+
+def _ruta_diario(ruta_json):
+    return ruta_json + SesionInventario().constantes.SUFIJO_DIARIO
+
+
+def test_cargar_progreso_reaplica_el_diario(tmp_path):
+    codigos = codigos_ean13(10)
+    sesion = nueva_sesion(codigos)
+    ruta = str(tmp_path / "progreso.json")
+    sesion.procesar_escaneo(codigos[0])
+    assert sesion.guardar_progreso_rapido(ruta)[0]
+
+    # Escaneos posteriores al guardado y cierre sin guardar de nuevo
+    sesion.procesar_escaneo(codigos[1])
+    sesion.procesar_escaneo(codigos[2])
+    sesion.deshacer_escaneo()
+    fecha = sesion.boletos[codigos[1]].fecha_escaneo
+    sesion.cerrar_diario()
+
+    exito, mensaje, cargada = SesionInventario.cargar_progreso_rapido(ruta)
+    assert exito
+    assert "3 cambios recuperados del diario" in mensaje
+    assert cargada.boletos[codigos[0]].estado == EstadoBoleto.ESCANEADO
+    assert cargada.boletos[codigos[1]].estado == EstadoBoleto.ESCANEADO
+    assert cargada.boletos[codigos[1]].fecha_escaneo == fecha
+    assert cargada.boletos[codigos[2]].estado == EstadoBoleto.PENDIENTE
+    assert cargada.estadisticas.escaneados == 2
+    assert cargada.estadisticas.pendientes == 8
+
+    # La sesión cargada sigue anotando en el mismo diario
+    cargada.procesar_escaneo(codigos[3])
+    cargada.cerrar_diario()
+    _, mensaje, otra = SesionInventario.cargar_progreso_rapido(ruta)
+    assert "4 cambios recuperados del diario" in mensaje
+    assert otra.estadisticas.escaneados == 3
+    otra.cerrar_diario()
+
+
+def test_guardar_descarta_lo_ya_incluido(tmp_path):
+    codigos = codigos_ean13(4)
+    sesion = nueva_sesion(codigos)
+    ruta = str(tmp_path / "progreso.json")
+    sesion.guardar_progreso_rapido(ruta)
+    sesion.procesar_escaneo(codigos[0])
+    sesion.guardar_progreso_rapido(ruta)
+    sesion.cerrar_diario()
+
+    exito, mensaje, cargada = SesionInventario.cargar_progreso_rapido(ruta)
+    assert exito
+    assert "recuperados" not in mensaje
+    assert cargada.estadisticas.escaneados == 1
+    cargada.cerrar_diario()
+
+
+def test_linea_cortada_al_final_se_ignora(tmp_path):
+    codigos = codigos_ean13(4)
+    sesion = nueva_sesion(codigos)
+    ruta = str(tmp_path / "progreso.json")
+    sesion.guardar_progreso_rapido(ruta)
+    sesion.procesar_escaneo(codigos[0])
+    sesion.cerrar_diario()
+    with open(_ruta_diario(ruta), "ab") as f:
+        f.write(b'{"tipo": "ESCANEO", "codigo": "77')
+
+    exito, mensaje, cargada = SesionInventario.cargar_progreso_rapido(ruta)
+    assert exito
+    assert "1 cambios recuperados del diario" in mensaje
+    assert cargada.estadisticas.escaneados == 1
+    cargada.cerrar_diario()
+
+
+def test_diario_de_sesion_sin_guardar(tmp_path):
+    codigos = codigos_ean13(6)
+    temporal = str(tmp_path / "sin_guardar_x.diario.jsonl")
+    sesion = nueva_sesion(codigos)
+    sesion.abrir_diario(temporal, truncar=True, sin_guardar=True)
+    sesion.procesar_escaneo(codigos[0])
+    sesion.procesar_escaneo(codigos[1])
+    sesion.deshacer_escaneo()
+    # Cierre inesperado: el diario nunca se cerró
+    with open(temporal, "rb") as f:
+        assert b"\r" not in f.read()
+
+    recuperada = nueva_sesion(codigos)
+    assert recuperada.recuperar_diario(temporal) == 3
+    assert recuperada.estadisticas.escaneados == 1
+    assert recuperada.boletos[codigos[0]].estado == EstadoBoleto.ESCANEADO
+
+    # Al guardar por primera vez el diario temporal ya no hace falta
+    ruta = str(tmp_path / "progreso.json")
+    assert recuperada.guardar_progreso_rapido(ruta)[0]
+    assert not os.path.exists(temporal)
+    assert not recuperada.diario_sin_guardar
+    recuperada.cerrar_diario()
+    sesion.cerrar_diario()
@@ -0,0 +1,172 @@
+"""Escaneos simultáneos desde varios hilos (teclado y estaciones de red)"""
+
+import sys
+import threading
+from collections import Counter
+
+import pytest
+
+from conftest import codigos_ean13, nueva_sesion
+from inventario_boletos.core.entities import EstadoBoleto, ResultadoEscaneo
+
+HILOS = 8
+REPETICIONES = 2
+
+
+@pytest.fixture(autouse=True)
+def cambio_de_hilo_frecuente():
+    """Fuerza que los hilos se intercalen a mitad de cada escaneo"""
+    anterior = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(anterior)
+
+
+def _escanear_en_hilos(sesion, tandas):
+    """Cada hilo escanea su tanda; todos arrancan a la vez"""
+    resultados = [[] for _ in tandas]
+    barrera = threading.Barrier(len(tandas))
+
+    def _trabajar(indice, codigos):
+        barrera.wait()
+        for codigo in codigos:
+            resultados[indice].append(sesion.procesar_escaneo(codigo))
+
+    hilos = [
+        threading.Thread(target=_trabajar, args=(indice, codigos))
+        for indice, codigos in enumerate(tandas)
+    ]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return [resultado for tanda in resultados for resultado in tanda]
+
+
+def _exitos_por_codigo(resultados):
+    return Counter(
+        r["boleto"].codigo
+        for r in resultados
+        if r["resultado"] == ResultadoEscaneo.EXITO
+    )
+
+
+@pytest.mark.parametrize("ronda", range(5))
+def test_mismos_codigos_desde_varios_hilos(ronda):
+    codigos = codigos_ean13(3000)
+    sesion = nueva_sesion(codigos + codigos_ean13(1000, inicio=779000010000))
+
+    resultados = _escanear_en_hilos(sesion, [codigos * REPETICIONES] * HILOS)
+
+    exitos = _exitos_por_codigo(resultados)
+    assert set(exitos) == set(codigos)
+    assert set(exitos.values()) == {1}
+    por_resultado = Counter(r["resultado"] for r in resultados)
+    assert por_resultado[ResultadoEscaneo.DUPLICADO] == len(codigos) * (
+        HILOS * REPETICIONES - 1
+    )
+
+    assert sesion.estadisticas.to_dict() == {
+        "total_boletos": 4000,
+        "escaneados": 3000,
+        "duplicados": 0,
+        "no_encontrados": 0,
+        "pendientes": 1000,
+        "porcentaje_escaneados": 75.0,
+    }
+    assert len(sesion.escaneos) == len(resultados)
+    estados = Counter(b.estado for b in sesion.boletos.values())
+    assert estados[EstadoBoleto.ESCANEADO] == 3000
+    assert all(sesion.boletos[codigo].escaneos_realizados == 1 for codigo in codigos)
+
+
+def test_codigos_distintos_por_hilo():
+    codigos = codigos_ean13(HILOS * 200)
+    sesion = nueva_sesion(codigos)
+
+    resultados = _escanear_en_hilos(sesion, [codigos[i::HILOS] for i in range(HILOS)])
+
+    assert len(resultados) == len(codigos)
+    assert _exitos_por_codigo(resultados) == Counter(codigos)
+    estadisticas = sesion.estadisticas
+    assert estadisticas.escaneados == len(codigos)
+    assert estadisticas.pendientes == 0
+    assert estadisticas.total_boletos == len(codigos)
+    assert estadisticas.porcentaje_escaneados == 100.0
+
+
+def test_contadores_coinciden_con_un_recalculo():
+    codigos = codigos_ean13(500)
+    sesion = nueva_sesion(codigos)
+    ajenos = codigos_ean13(50, inicio=779000009000)
+
+    _escanear_en_hilos(
+        sesion, [codigos[i::4] + ajenos + codigos[::7] for i in range(4)]
+    )
+
+    incremental = sesion.estadisticas.to_dict()
+    sesion.actualizar_estadisticas()
+    assert sesion.estadisticas.to_dict() == incremental
+    assert incremental["escaneados"] == 500
+    assert incremental["pendientes"] == 0
+
+
+def test_lotes_del_servidor_junto_a_escaneos_sueltos():
+    codigos = codigos_ean13(HILOS * 200)
+    sesion = nueva_sesion(codigos)
+    tandas = [codigos[i::HILOS] for i in range(HILOS)]
+    resultados = []
+    lock = threading.Lock()
+    barrera = threading.Barrier(HILOS)
+
+    # La mitad de los hilos usa el camino por lotes del servidor de red
+    def _por_lotes(tanda):
+        barrera.wait()
+        for inicio in range(0, len(tanda), 16):
+            lote = sesion.procesar_escaneos_lote(tanda[inicio : inicio + 16])
+            with lock:
+                resultados.extend(lote)
+
+    def _de_a_uno(tanda):
+        barrera.wait()
+        for codigo in tanda + tanda[:10]:
+            resultado = sesion.procesar_escaneo(codigo)
+            with lock:
+                resultados.append(resultado)
+
+    hilos = [
+        threading.Thread(target=_por_lotes if i % 2 else _de_a_uno, args=(tanda,))
+        for i, tanda in enumerate(tandas)
+    ]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert len(resultados) == len(codigos) + 10 * (HILOS // 2)
+    assert _exitos_por_codigo(resultados) == Counter(codigos)
+    assert sesion.estadisticas.escaneados == len(codigos)
+    assert sesion.estadisticas.pendientes == 0
+
+
+@pytest.mark.parametrize("ronda", range(5))
+def test_recalculo_durante_los_escaneos(ronda):
+    codigos = codigos_ean13(HILOS * 300)
+    sesion = nueva_sesion(codigos)
+
+    # Lo que hace agregar_reporte o la interfaz mientras el servidor escanea;
+    # se detiene a mitad de camino para que ningún recálculo final tape un
+    # boleto contado dos veces
+    def _recalcular():
+        while len(sesion.escaneos) < len(codigos) // 2:
+            sesion.actualizar_estadisticas()
+
+    recalculo = threading.Thread(target=_recalcular)
+    recalculo.start()
+    _escanear_en_hilos(sesion, [codigos[i::HILOS] for i in range(HILOS)])
+    recalculo.join()
+
+    assert sesion.estadisticas.escaneados == len(codigos)
+    assert sesion.estadisticas.pendientes == 0
+    assert sesion.agregados.general.escaneados == len(codigos)
+    assert len(sesion.pendientes) == 0
@@ -0,0 +1,95 @@
+"""Fusión de los progresos de varias estaciones"""
+
+import os
+from datetime import datetime
+
+from conftest import codigos_ean13, nueva_sesion
+from inventario_boletos.core.entities import EstadoBoleto, SesionInventario
+from inventario_boletos.core.fusion_progresos import fusionar_progresos
+from inventario_boletos.core.registro_validados import RegistroValidados
+
+ANTIGUA = datetime(2020, 1, 1, 8, 30)
+
+
+def _progreso_de_estacion(tmp_path, nombre, codigos, escaneados, antiguos=()):
+    """Guarda el progreso de una estación que escaneó algunos códigos"""
+    estacion = nueva_sesion(codigos)
+    for codigo in escaneados:
+        estacion.procesar_escaneo(codigo)
+    for codigo in antiguos:
+        estacion.boletos[codigo].fecha_escaneo = ANTIGUA
+    ruta = str(tmp_path / f"{nombre}.json")
+    assert estacion.guardar_progreso_rapido(ruta)[0]
+    estacion.cerrar_diario()
+    return ruta
+
+
+def test_fusion_une_estaciones_y_gana_el_escaneo_mas_antiguo(tmp_path):
+    codigos = codigos_ean13(20)
+    ajeno = codigos_ean13(1, inicio=779000005000)[0]
+    ruta_a = _progreso_de_estacion(tmp_path, "a", codigos, codigos[0:3])
+    ruta_b = _progreso_de_estacion(
+        tmp_path, "b", codigos + [ajeno], [codigos[2], codigos[3], ajeno], [codigos[2]]
+    )
+
+    sesion = nueva_sesion(codigos)
+    sesion.procesar_escaneo(codigos[4])
+    exito, _, resumen = fusionar_progresos(sesion, [ruta_a, ruta_b], paralelo=False)
+
+    assert exito
+    assert resumen.escaneados_nuevos == 4
+    assert resumen.duplicados_entre_estaciones == 1
+    assert resumen.no_encontrados == 1
+    assert resumen.archivos_con_error == 0
+    assert sesion.boletos[codigos[2]].fecha_escaneo == ANTIGUA
+    assert sesion.estadisticas.escaneados == 5
+    assert sesion.estadisticas.pendientes == 15
+    assert sesion.agregados.general.escaneados == 5
+    estadisticas = sesion.estadisticas.to_dict()
+    sesion.actualizar_estadisticas()
+    assert sesion.estadisticas.to_dict() == estadisticas
+
+
+def test_fusion_se_anota_en_el_diario(tmp_path):
+    codigos = codigos_ean13(10)
+    ruta_a = _progreso_de_estacion(tmp_path, "a", codigos, codigos[0:2], codigos[:1])
+
+    sesion = nueva_sesion(codigos)
+    ruta = str(tmp_path / "principal.json")
+    sesion.guardar_progreso_rapido(ruta)
+    fusionar_progresos(sesion, [ruta_a], paralelo=False)
+    sesion.cerrar_diario()
+
+    # Sin volver a guardar, el progreso más el diario traen lo fusionado
+    exito, mensaje, cargada = SesionInventario.cargar_progreso_rapido(ruta)
+    assert exito
+    assert "2 cambios recuperados del diario" in mensaje
+    assert cargada.estadisticas.escaneados == 2
+    assert cargada.boletos[codigos[0]].fecha_escaneo == ANTIGUA
+    assert cargada.boletos[codigos[1]].estado == EstadoBoleto.ESCANEADO
+    cargada.cerrar_diario()
+
+
+def test_fusion_actualiza_el_registro_de_validados(tmp_path):
+    codigos = codigos_ean13(10)
+    ruta_a = _progreso_de_estacion(tmp_path, "a", codigos, codigos[0:3])
+    registro = RegistroValidados(str(tmp_path / "registro.sqlite3"))
+
+    sesion = nueva_sesion(codigos)
+    sesion.conectar_registro(registro)
+    fusionar_progresos(sesion, [ruta_a], paralelo=False)
+    registro.cerrar()
+
+    registro = RegistroValidados(str(tmp_path / "registro.sqlite3"))
+    assert set(registro.consultar_lote(codigos)) == set(codigos[0:3])
+    assert registro.consultar(codigos[0])["id_sesion"] == sesion.id_sesion
+    registro.cerrar()
+
+
+def test_fusion_sin_archivos_legibles(tmp_path):
+    sesion = nueva_sesion(codigos_ean13(3))
+    ruta = str(tmp_path / "no_existe.json")
+    exito, _, resumen = fusionar_progresos(sesion, [ruta], paralelo=False)
+    assert not exito
+    assert resumen.archivos_con_error == 1
+    assert not os.path.exists(ruta)
@@ -0,0 +1,57 @@
+"""Índice compartido: escaneos marcados por otros procesos sobre el mismo reporte"""
+
+import pytest
+
+from conftest import codigos_ean13, nueva_sesion
+from inventario_boletos.core.diario import DiarioPersistente
+from inventario_boletos.core.entities import EstadoBoleto, ResultadoEscaneo
+from inventario_boletos.core.indice_compartido import IndiceCompartido
+
+
+@pytest.fixture
+def publicada(tmp_path):
+    """Sesión dueña del índice y un segundo proceso adjunto a él"""
+    codigos = codigos_ean13(10)
+    sesion = nueva_sesion(codigos)
+    ruta = str(tmp_path / "reporte.indice.bin")
+    assert sesion.publicar_indice_compartido(ruta)[0]
+    adjunto = IndiceCompartido(ruta, solo_lectura=False)
+    yield sesion, adjunto, codigos
+    adjunto.cerrar()
+    sesion.cerrar_indice_compartido()
+    sesion.cerrar_diario()
+
+
+def test_escaneo_de_otro_proceso_no_se_acepta_dos_veces(publicada):
+    sesion, adjunto, codigos = publicada
+    assert adjunto.marcar_escaneo(codigos[0]) == ("PENDIENTE", "ESCANEADO")
+
+    # Todavía sin sincronizar: el byte del índice decide
+    resultado = sesion.procesar_escaneo(codigos[0])
+    assert resultado["resultado"] == ResultadoEscaneo.DUPLICADO
+    assert sesion.estadisticas.escaneados == 0
+
+    assert sesion.procesar_escaneo(codigos[1])["resultado"] == ResultadoEscaneo.EXITO
+    assert adjunto.marcar_escaneo(codigos[1]) == ("ESCANEADO", "ESCANEADO")
+
+
+def test_sincronizar_anota_lo_traido(publicada, tmp_path):
+    sesion, adjunto, codigos = publicada
+    ruta_diario = str(tmp_path / "diario.jsonl")
+    sesion.abrir_diario(ruta_diario)
+    adjunto.marcar_escaneo(codigos[2])
+    adjunto.marcar_escaneo(codigos[3])
+
+    assert sesion.sincronizar_indice_compartido() == 2
+    assert sesion.sincronizar_indice_compartido() == 0
+    assert sesion.boletos[codigos[2]].estado == EstadoBoleto.ESCANEADO
+    assert sesion.estadisticas.escaneados == 2
+    # Escaneos de otro proceso: no se deshacen desde esta sesión
+    assert not sesion.deshacer_escaneo()[0]
+
+    sesion.cerrar_diario()
+    lineas = list(DiarioPersistente.leer(ruta_diario))
+    assert [(linea["tipo"], linea["codigo"]) for linea in lineas] == [
+        ("INDICE", codigos[2]),
+        ("INDICE", codigos[3]),
+    ]
@@ -0,0 +1,98 @@
+"""Continuar un reporte exportado con VALIDADO desde la caché de reportes"""
+
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from conftest import codigos_ean13
+from inventario_boletos.config.constants import AppConstants
+from inventario_boletos.core.entities import EstadoBoleto, SesionInventario
+from inventario_boletos.core.report_processor import ReporteProcessor
+
+CODIGOS = codigos_ean13(30)
+ESCANEADOS = CODIGOS[3:6]
+
+
+@pytest.fixture
+def exportado(tmp_path):
+    """Carga un reporte, escanea algunos boletos y exporta con VALIDADO"""
+    ruta_reporte = str(tmp_path / "reporte.csv")
+    pd.DataFrame(
+        {
+            "CODIGO DE BARRA": CODIGOS,
+            "PDV": ["PDV 1"] * len(CODIGOS),
+            "TOTAL PREMIO": ["10"] * len(CODIGOS),
+        }
+    ).to_csv(ruta_reporte, index=False)
+
+    procesador = ReporteProcessor()
+    exito, _ = procesador.cargar_archivo(ruta_reporte)
+    assert exito
+    # La caché se guarda en segundo plano
+    procesador.tabla.esperar_cache()
+    assert procesador.tabla.ruta_en_cache
+
+    sesion = SesionInventario(ruta_reporte_original=ruta_reporte)
+    boletos = procesador.obtener_boletos()
+    sesion.agregar_reporte(boletos, ruta_reporte, procesador.huella)
+    for codigo in ESCANEADOS:
+        sesion.procesar_escaneo(codigo)
+
+    ruta_exportada = str(tmp_path / "resultados.csv")
+    exito, mensaje = procesador.exportar_con_resultados(sesion, ruta_exportada)
+    assert exito, mensaje
+    return procesador, ruta_exportada
+
+
+def _escaneados(boletos):
+    return sorted(b.codigo for b in boletos if b.estado == EstadoBoleto.ESCANEADO)
+
+
+def test_reporte_exportado_se_carga_desde_la_cache(exportado):
+    original, ruta_exportada = exportado
+    archivos = os.listdir(AppConstants().CARPETA_CACHE_REPORTES)
+    # Una tabla por carga y un enlace por exportación
+    assert sum(nombre.endswith(".pkl") for nombre in archivos) == 1
+    assert sum(nombre.endswith(".enlace") for nombre in archivos) == 1
+
+    procesador = ReporteProcessor()
+    exito, mensaje, boletos = procesador.cargar_reporte_con_estados(ruta_exportada)
+
+    assert exito, mensaje
+    assert procesador.tabla.ruta_en_cache == original.tabla.ruta_en_cache
+    # Misma tabla que el original, pero identificado por su propio archivo
+    assert procesador.huella_reporte == original.huella
+    assert procesador.huella != original.huella
+    assert len(boletos) == len(CODIGOS)
+    assert _escaneados(boletos) == sorted(ESCANEADOS)
+    assert procesador.errores == []
+
+
+def test_sin_cache_se_lee_el_archivo_completo(exportado):
+    original, ruta_exportada = exportado
+    shutil.rmtree(AppConstants().CARPETA_CACHE_REPORTES)
+
+    procesador = ReporteProcessor()
+    procesador.config.cache_reportes = False
+    exito, mensaje, boletos = procesador.cargar_reporte_con_estados(ruta_exportada)
+
+    assert exito, mensaje
+    assert procesador.huella != original.huella
+    assert _escaneados(boletos) == sorted(ESCANEADOS)
+    assert not os.path.exists(AppConstants().CARPETA_CACHE_REPORTES)
+
+
+def test_cache_danada_se_informa_y_se_lee_el_archivo(exportado):
+    original, ruta_exportada = exportado
+    with open(original.tabla.ruta_en_cache, "wb") as f:
+        f.write(b"no es un pickle")
+
+    procesador = ReporteProcessor()
+    exito, mensaje, boletos = procesador.cargar_reporte_con_estados(ruta_exportada)
+
+    assert exito
+    assert "Caché de reporte ignorada" in mensaje
+    assert any("Caché de reporte ignorada" in error for error in procesador.errores)
+    assert _escaneados(boletos) == sorted(ESCANEADOS)
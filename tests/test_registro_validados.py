@@ -0,0 +1,80 @@
+"""Registro de boletos validados compartido entre sesiones y estaciones"""
+
+from conftest import codigos_ean13, nueva_sesion
+from inventario_boletos.core.registro_validados import RegistroValidados
+
+
+def test_estaciones_ven_las_validaciones_de_las_otras(tmp_path):
+    ruta = str(tmp_path / "registro.sqlite3")
+    codigos = codigos_ean13(5)
+    estacion_a = RegistroValidados(ruta)
+    estacion_b = RegistroValidados(ruta)
+    assert estacion_b.consultar(codigos[0]) is None
+
+    estacion_a.registrar(codigos[0], "SESION_A", "reporte.xlsx")
+    estacion_a.cerrar()
+
+    # Escrito por otro proceso después de cargar el filtro de b
+    assert estacion_b.consultar(codigos[0])["id_sesion"] == "SESION_A"
+    assert list(estacion_b.consultar_lote(codigos)) == [codigos[0]]
+    estacion_b.cerrar()
+
+
+def test_filtro_suma_las_altas_de_otra_estacion(tmp_path):
+    ruta = str(tmp_path / "registro.sqlite3")
+    codigos = codigos_ean13(400)
+    estacion_a = RegistroValidados(ruta)
+    estacion_b = RegistroValidados(ruta)
+
+    for codigo in codigos[:300]:
+        estacion_a.registrar(codigo, "SESION_A")
+    estacion_a.cerrar()
+
+    # La primera consulta trae las altas nuevas y el filtro queda al día
+    assert estacion_b.consultar(codigos[399]) is None
+    assert all(codigo in estacion_b.filtro for codigo in codigos[:300])
+    assert len(estacion_b.consultar_lote(codigos)) == 300
+
+    estacion_c = RegistroValidados(ruta)
+    estacion_c.registrar(codigos[350], "SESION_C")
+    estacion_c.cerrar()
+    assert estacion_b.consultar(codigos[350])["id_sesion"] == "SESION_C"
+    estacion_b.cerrar()
+
+
+def test_escaneo_avisa_boleto_validado_en_otra_sesion(tmp_path):
+    ruta = str(tmp_path / "registro.sqlite3")
+    codigos = codigos_ean13(3)
+    anterior = RegistroValidados(ruta)
+    anterior.registrar(codigos[1], "SESION_ANTERIOR")
+    anterior.cerrar()
+
+    registro = RegistroValidados(ruta)
+    sesion = nueva_sesion(codigos)
+    assert sesion.conectar_registro(registro) == 1
+
+    resultado = sesion.procesar_escaneo(codigos[1])
+    assert resultado["validado_en_otra_sesion"]["id_sesion"] == "SESION_ANTERIOR"
+    assert "validado_en_otra_sesion" not in sesion.procesar_escaneo(codigos[0])
+    registro.cerrar()
+
+
+def test_sesion_descartada_se_retira_del_registro(tmp_path):
+    ruta = str(tmp_path / "registro.sqlite3")
+    codigos = codigos_ean13(5)
+    registro = RegistroValidados(ruta)
+    descartada = nueva_sesion(codigos)
+    descartada.conectar_registro(registro)
+    descartada.procesar_escaneo(codigos[0])
+    descartada.procesar_escaneo(codigos[1])
+
+    otra = RegistroValidados(ruta)
+    otra.registrar(codigos[2], "SESION_OTRA")
+    otra.cerrar()
+
+    descartada.retirar_del_registro()
+    # Al volver a cargar el reporte solo alerta lo validado en la otra sesión
+    sesion = nueva_sesion(codigos)
+    assert sesion.conectar_registro(registro) == 1
+    assert list(sesion.validados_en_otras_sesiones) == [codigos[2]]
+    registro.cerrar()
@@ -2,7 +2,17 @@
 Módulo UI - Interfaz de usuario
 """
 from .main_window import MainWindow
-from .widgets import CampoEscaneo, PanelEstadisticas, ListaEscaneos
+from .widgets import (
+    CampoEscaneo,
+    PanelEstadisticas,
+    ListaEscaneos,
+    VentanaDepuracion,
+    VentanaAgregados,
+    Notificacion,
+    ListaVirtual,
+    VentanaFaltantes,
+    VentanaBusqueda
+)
 from .styles import AppStyles, AppColors
 
 __all__ = [
@@ -10,6 +20,12 @@ __all__ = [
     'CampoEscaneo',
     'PanelEstadisticas',
     'ListaEscaneos',
+    'VentanaDepuracion',
+    'VentanaAgregados',
+    'Notificacion',
+    'ListaVirtual',
+    'VentanaFaltantes',
+    'VentanaBusqueda',
     'AppStyles',
     'AppColors'
 ]
\ No newline at end of file
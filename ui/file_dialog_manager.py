@@ -52,7 +52,7 @@ class FileDialogManager:
         self, titulo: str = "Seleccionar reporte para continuar"
     ) -> Optional[str]:
         """
-        Abre diálogo para seleccionar un reporte Excel/CSV para continuar escaneo
+        Abre diálogo para seleccionar un reporte exportado para continuar escaneo
 
         Args:
             titulo: Título del diálogo
@@ -63,10 +63,10 @@ class FileDialogManager:
         # Usar carpeta de resultados como ubicación inicial
         initialdir = self.constantes.CARPETA_RESULTADOS
 
-        # SOLO Excel y CSV (sin JSON)
+        # Excel, CSV o columnares exportados si hay pyarrow (sin JSON)
         ruta = filedialog.askopenfilename(
             title=titulo,
-            filetypes=self.constantes.FILTRO_EXCEL_CSV,
+            filetypes=self.constantes.FILTRO_CONTINUAR,
             initialdir=initialdir,
         )
 
@@ -101,6 +101,30 @@ class FileDialogManager:
 
         return ""  # Retornar cadena vacía en lugar de None
 
+    def seleccionar_progresos_json_multiples(
+        self, titulo: str = "Seleccionar progresos de las estaciones"
+    ) -> List[str]:
+        """
+        Abre diálogo para seleccionar varios archivos de progreso JSON
+
+        Args:
+            titulo: Título del diálogo
+
+        Returns:
+            Lista de rutas seleccionadas (vacía si se cancela)
+        """
+        # Usar carpeta de progreso como ubicación inicial
+        initialdir = self.constantes.CARPETA_PROGRESO
+
+        rutas = filedialog.askopenfilenames(
+            title=titulo, filetypes=self.constantes.FILTRO_JSON, initialdir=initialdir
+        )
+
+        if rutas:
+            self._ultima_ruta = os.path.dirname(rutas[0])
+
+        return list(rutas) if rutas else []
+
     def guardar_resultados(
         self, nombre_base: str = "reporte", titulo: str = "Guardar resultados como"
     ) -> Optional[str]:
@@ -124,12 +148,12 @@ class FileDialogManager:
         fecha = datetime.now().strftime("%Y%m%d_%H%M%S")
         nombre_sugerido = f"{nombre_base}_RESULTADOS_{fecha}.xlsx"
 
-        # Filtro para exportación (solo Excel y CSV, Excel por defecto)
+        # Filtro para exportación (Excel por defecto)
         ruta = filedialog.asksaveasfilename(
             title=titulo,
             defaultextension=".xlsx",
             initialfile=nombre_sugerido,
-            filetypes=self.constantes.FILTRO_EXPORTACION,  # Solo Excel y CSV
+            filetypes=self.constantes.FILTRO_EXPORTACION,  # Excel, CSV, columnar
             initialdir=initialdir,
         )
 
@@ -138,6 +162,29 @@ class FileDialogManager:
 
         return ruta if ruta else None
 
+    def seleccionar_carpeta_exportacion(
+        self, titulo: str = "Seleccionar carpeta de destino"
+    ) -> Optional[str]:
+        """
+        Abre diálogo para elegir la carpeta donde exportar varios archivos
+
+        Args:
+            titulo: Título del diálogo
+
+        Returns:
+            Carpeta seleccionada o None
+        """
+        # Usar carpeta de resultados como ubicación inicial
+        initialdir = self.constantes.CARPETA_RESULTADOS
+        os.makedirs(initialdir, exist_ok=True)
+
+        carpeta = filedialog.askdirectory(title=titulo, initialdir=initialdir)
+
+        if carpeta:
+            self._ultima_ruta = carpeta
+
+        return carpeta if carpeta else None
+
     def guardar_progreso_json(
         self, nombre_base: str = "progreso", titulo: str = "Guardar progreso rápido"
     ) -> Optional[str]:
@@ -175,6 +222,38 @@ class FileDialogManager:
 
         return ruta if ruta else None
 
+    def guardar_metricas_json(
+        self, nombre_base: str = "latencias", titulo: str = "Guardar métricas"
+    ) -> Optional[str]:
+        """
+        Abre diálogo para guardar las métricas de latencia en JSON
+
+        Args:
+            nombre_base: Nombre base para sugerir
+            titulo: Título del diálogo
+
+        Returns:
+            Ruta donde guardar o None
+        """
+        # Usar carpeta de progreso como ubicación inicial
+        initialdir = self.constantes.CARPETA_PROGRESO
+
+        fecha = datetime.now().strftime("%Y%m%d_%H%M%S")
+        nombre_sugerido = f"{nombre_base}_METRICAS_{fecha}.json"
+
+        ruta = filedialog.asksaveasfilename(
+            title=titulo,
+            defaultextension=".json",
+            initialfile=nombre_sugerido,
+            filetypes=self.constantes.FILTRO_JSON,
+            initialdir=initialdir,
+        )
+
+        if ruta:
+            self._ultima_ruta = os.path.dirname(ruta)
+
+        return ruta if ruta else None
+
     def _obtener_ubicacion_inicial(self, tipo: str) -> str:
         """
         Obtiene la ubicación inicial inteligente para diálogos
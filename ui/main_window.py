@@ -7,42 +7,86 @@ from tkinter import ttk, filedialog, messagebox
 import os
 from datetime import datetime
 import sys
+from typing import TYPE_CHECKING, Dict, List, Tuple
 
 from inventario_boletos.core.entities import SesionInventario, EstadoBoleto
-from inventario_boletos.core.report_processor import ReporteProcessor
+from inventario_boletos.core.instrumentacion import instrumentacion, medir
+from inventario_boletos.config.constants import AppConfig
 from inventario_boletos.ui.styles import AppStyles, AppColors
-from inventario_boletos.ui.widgets import CampoEscaneo, PanelEstadisticas, ListaEscaneos
+from inventario_boletos.ui.widgets import (
+    CampoEscaneo,
+    PanelEstadisticas,
+    ListaEscaneos,
+    VentanaDepuracion,
+    VentanaAgregados,
+    VentanaFaltantes,
+    VentanaBusqueda,
+    Notificacion,
+)
 from inventario_boletos.ui.sound_manager import SoundManager, TipoSonido
 from inventario_boletos.ui.file_dialog_manager import FileDialogManager
 
+# Al agrupar una tanda de escaneos suena el resultado más grave
+PRIORIDAD_RESULTADO = {"exito": 1, "advertencia": 2, "error": 3}
+
+# Teclas para aceptar las sugerencias de un código no encontrado
+TECLAS_SUGERENCIA = ("F1", "F2", "F3", "F4")
+
+if TYPE_CHECKING:
+    # pandas se importa recién al cargar el primer reporte; el servidor y el
+    # registro recién al usarlos
+    from inventario_boletos.core.registro_validados import RegistroValidados
+    from inventario_boletos.core.report_processor import ReporteProcessor
+    from inventario_boletos.core.servidor_escaneo import ServidorEscaneo
+
 
 class MainWindow:
     """Ventana principal de la aplicación"""
 
     def __init__(self):
         self.root = tk.Tk()
+        self.config = AppConfig()
         self.sesion: SesionInventario = None
-        self.reporte_processor: ReporteProcessor = None
+        self.reporte_processor: "ReporteProcessor" = None
+        # Procesadores de los reportes sumados a la sesión después del primero
+        self.procesadores_adicionales: Dict[int, "ReporteProcessor"] = {}
         self.ruta_reporte_actual: str = None
-
-        # Inicializar Manejador de Sonidos
+        self.servidor_red: "ServidorEscaneo" = None
+        self._escaneos_red_vistos = 0
+        self.ventana_depuracion: VentanaDepuracion = None
+        self.ventana_agregados: VentanaAgregados = None
+        self.ventana_faltantes: VentanaFaltantes = None
+        self.ventana_busqueda: VentanaBusqueda = None
+        self.sugerencias_activas: List[str] = []
+        # Registro de validados entre sesiones (se abre con el primer reporte)
+        self.registro_validados: "RegistroValidados" = None
+        # Sesión que publicó el índice compartido con otros procesos
+        self._sesion_indice_compartido: SesionInventario = None
+
+        # Estado del tick de refresco de la interfaz
+        self._clave_estadisticas_mostrada = None
+        self._texto_estado_pendiente: str = None
+
+        # Instrumentación de latencias solo en modo depuración
+        instrumentacion.configurar(self.config.debug_mode)
+
+        # Inicializar Manejador de Sonidos (pygame y los mp3 se cargan en
+        # el hilo de audio, sin demorar la aparición de la ventana)
         self.sound_manager = SoundManager()
 
         # Inicializar Gestor de diálogos de archivo
         self.file_dialog_manager = FileDialogManager()
 
-        # Verificar que las carpetas en español existan
-        self._verificar_carpetas_espanol()
-
-        # Mostrar estado de sonidos (opcional, para debug)
-        sound_status = self.sound_manager.get_sounds_status()
-        print(f"Estado de sonidos: {sound_status}")
-
         self._configurar_ventana()
         self._construir_widgets()
         self._configurar_estilos()
         self._configurar_eventos()
 
+        # Único ciclo que pinta estadísticas y barra de estado
+        self.root.after(
+            self.config.constantes.INTERVALO_REFRESCO_UI_MS, self._refrescar_interfaz
+        )
+
     def _configurar_ventana(self):
         """Configura las propiedades de la ventana"""
         self.root.title("Inventario de Boletos - Raspa y Gane")
@@ -68,6 +112,9 @@ class MainWindow:
 
     def _construir_widgets(self):
         """Construye todos los widgets de la interfaz"""
+        # Menú de herramientas
+        self._construir_menu()
+
         # Título
         self.lbl_titulo = ttk.Label(
             self.root, text="INVENTARIO DE BOLETOS - RASPA Y GANE", style="Title.TLabel"
@@ -98,6 +145,77 @@ class MainWindow:
         )
         self.barra_estado.grid(row=4, column=0, padx=20, pady=(0, 10), sticky="ew")
 
+    def _construir_menu(self):
+        """Construye la barra de menú con las herramientas adicionales"""
+        self.menu_principal = tk.Menu(self.root)
+
+        self.menu_herramientas = tk.Menu(self.menu_principal, tearoff=0)
+        self.menu_herramientas.add_command(
+            label="Deshacer último escaneo",
+            accelerator="Ctrl+Z",
+            command=self._deshacer_escaneo,
+        )
+        self.menu_herramientas.add_command(
+            label="Rehacer escaneo", accelerator="Ctrl+Y", command=self._rehacer_escaneo
+        )
+        self.menu_herramientas.add_separator()
+        self.var_servidor_red = tk.BooleanVar(value=False)
+        self.menu_herramientas.add_checkbutton(
+            label="Servidor de escaneo en red",
+            variable=self.var_servidor_red,
+            command=self._alternar_servidor_red,
+        )
+        self.var_indice_compartido = tk.BooleanVar(value=False)
+        self.menu_herramientas.add_checkbutton(
+            label="Compartir índice de códigos con otros procesos",
+            variable=self.var_indice_compartido,
+            command=self._compartir_indice,
+        )
+        self.menu_herramientas.add_command(
+            label="Agregar otro reporte a la sesión...",
+            command=self._agregar_reporte,
+        )
+        self.menu_herramientas.add_command(
+            label="Fusionar progresos de estaciones...",
+            command=self._fusionar_progresos,
+        )
+        self.menu_herramientas.add_command(
+            label="Exportar un archivo por PDV...",
+            command=self._exportar_por_pdv,
+        )
+        self.menu_herramientas.add_command(
+            label="Avance y conciliación de premios...",
+            command=self._abrir_panel_agregados,
+        )
+        self.menu_herramientas.add_command(
+            label="Buscar por código parcial...",
+            accelerator="Ctrl+F",
+            command=self._abrir_busqueda,
+        )
+        self.menu_herramientas.add_separator()
+        self.var_modo_depuracion = tk.BooleanVar(value=self.config.debug_mode)
+        self.menu_herramientas.add_checkbutton(
+            label="Modo depuración (medir latencias)",
+            variable=self.var_modo_depuracion,
+            command=self._alternar_modo_depuracion,
+        )
+        self.menu_herramientas.add_command(
+            label="Panel de depuración...", command=self._abrir_panel_depuracion
+        )
+        self.var_cprofile_carga = tk.BooleanVar(value=self.config.cprofile_carga)
+        self.menu_herramientas.add_checkbutton(
+            label="Perfilar carga de reportes con cProfile",
+            variable=self.var_cprofile_carga,
+            command=lambda: setattr(
+                self.config, "cprofile_carga", self.var_cprofile_carga.get()
+            ),
+        )
+
+        self.menu_principal.add_cascade(
+            label="Herramientas", menu=self.menu_herramientas
+        )
+        self.root.config(menu=self.menu_principal)
+
     def _construir_panel_controles(self):
         """Construye el panel de controles superiores"""
         self.frame_controles.grid_columnconfigure(1, weight=1)
@@ -152,17 +270,22 @@ class MainWindow:
         """Construye el panel principal de escaneo"""
         # Configurar grid
         self.frame_escaneo.grid_columnconfigure(0, weight=1)
-        self.frame_escaneo.grid_rowconfigure(1, weight=1)
+        self.frame_escaneo.grid_rowconfigure(2, weight=1)
 
-        # Campo de escaneo
+        # Campo de escaneo (encola los códigos y los entrega en tandas)
         self.campo_escaneo = CampoEscaneo(
-            self.frame_escaneo, on_escaneo=self._procesar_escaneo
+            self.frame_escaneo, on_lote=self._procesar_escaneos
         )
         self.campo_escaneo.grid(row=0, column=0, padx=20, pady=20, sticky="ew")
 
+        # Avisos no modales del camino de escaneo (oculto hasta que haya uno)
+        self.notificacion = Notificacion(self.frame_escaneo)
+        self.notificacion.grid(row=1, column=0, padx=20, pady=(0, 10), sticky="ew")
+        self.notificacion.ocultar()
+
         # Lista de escaneos
         self.lista_escaneos = ListaEscaneos(self.frame_escaneo, max_items=15)
-        self.lista_escaneos.grid(row=1, column=0, padx=20, pady=(0, 20), sticky="nsew")
+        self.lista_escaneos.grid(row=2, column=0, padx=20, pady=(0, 20), sticky="nsew")
 
     def _construir_panel_botones(self):
         """Construye el panel de botones inferiores"""
@@ -234,9 +357,22 @@ class MainWindow:
         # Atajo de teclado Ctrl+L para limpiar
         self.root.bind("<Control-l>", lambda e: self._limpiar_todo())
 
+        # Ctrl+Z / Ctrl+Y deshacen y rehacen escaneos
+        self.root.bind("<Control-z>", lambda e: self._deshacer_escaneo())
+        self.root.bind("<Control-y>", lambda e: self._rehacer_escaneo())
+
+        # Atajo de teclado Ctrl+F para buscar por código parcial
+        self.root.bind("<Control-f>", lambda e: self._abrir_busqueda())
+
         # Atajo de teclado F5 para calcular faltantes
         self.root.bind("<F5>", lambda e: self._calcular_faltantes())
 
+        # F1-F4 aceptan la sugerencia correspondiente de un código mal leído
+        for indice, tecla in enumerate(TECLAS_SUGERENCIA):
+            self.root.bind(
+                f"<{tecla}>", lambda e, i=indice: self._aceptar_sugerencia(i)
+            )
+
     def _cargar_reporte(self):
         """Carga un archivo de reporte Excel/CSV"""
         # USAR EL NUEVO GESTOR DE DIÁLOGOS
@@ -248,19 +384,40 @@ class MainWindow:
             return
 
         try:
-            # Crear nuevo procesador y cargar archivo
-            self.reporte_processor = ReporteProcessor()
-            exito, mensaje = self.reporte_processor.cargar_archivo(ruta_archivo)
+            # Crear nuevo procesador y cargar archivo (con perfil por etapas)
+            self.reporte_processor = self._nuevo_reporte_processor(self.config)
+            exito, mensaje, boletos, perfil = (
+                self.reporte_processor.cargar_archivo_perfilado(
+                    ruta_archivo,
+                    medir_memoria=self.config.debug_mode,
+                    usar_cprofile=self.config.cprofile_carga,
+                )
+            )
 
             if not exito:
                 messagebox.showerror("Error", mensaje)
                 return
 
-            # Crear nueva sesión
+            # Crear nueva sesión con este reporte como el primero
+            self._cerrar_diario_sesion()
             self.sesion = SesionInventario()
-            self.sesion.ruta_reporte_original = ruta_archivo
-            boletos = self.reporte_processor.obtener_boletos()
-            self.sesion.agregar_boletos(boletos)
+            self.procesadores_adicionales = {}
+            with perfil.etapa("SesionInventario.agregar_boletos", len(boletos)) as etapa:
+                self.sesion.agregar_reporte(
+                    boletos, ruta_archivo, self.reporte_processor.huella
+                )
+                etapa.filas_salida = len(self.sesion.boletos)
+            # Registro antes del diario: lo recuperado se anota como validado
+            self._conectar_registro_validados()
+            self._abrir_diario_sin_guardar()
+
+            # En modo depuración dejar el perfil junto al reporte (se avisa
+            # en la barra de estado)
+            mensaje_perfil = None
+            if self.config.debug_mode or self.config.cprofile_carga:
+                _, mensaje_perfil = perfil.guardar_junto_a_reporte()
+            self._sincronizar_servidor_red()
+            self._compartir_indice()
 
             # Actualizar interfaz
             self.ruta_reporte_actual = ruta_archivo
@@ -285,7 +442,16 @@ class MainWindow:
             self.lista_escaneos.limpiar()
 
             # Actualizar barra de estado
-            self.barra_estado.config(text=f"Reporte cargado: {len(boletos)} boletos")
+            estado = f"Reporte cargado: {len(boletos)} boletos"
+            if self.sesion.codigos_ean13_invalidos:
+                estado += (
+                    f" ({self.sesion.codigos_ean13_invalidos} códigos con dígito"
+                    " de control inválido: no se rechazan lecturas por dígito"
+                    " de control)"
+                )
+            if mensaje_perfil:
+                estado += f". {mensaje_perfil}"
+            self._mostrar_estado(estado)
 
             # Enfocar campo de escaneo
             self.campo_escaneo.entry.focus_set()
@@ -298,89 +464,266 @@ class MainWindow:
         except Exception as e:
             messagebox.showerror("Error", f"Error al cargar el reporte:\n{str(e)}")
 
-    def _procesar_escaneo(self, codigo: str):
-        """Procesa un código escaneado"""
+    @medir("ui.procesar_escaneos")
+    def _procesar_escaneos(self, codigos: List[str]):
+        """
+        Procesa una tanda de códigos tomada de la cola del campo de escaneo.
+        Los errores se informan con avisos no modales para no frenar la cola.
+        """
         if not self.sesion:
-            messagebox.showwarning("Advertencia", "Primero cargue un reporte.")
-            self.campo_escaneo.limpiar()
+            self.notificacion.mostrar("Primero cargue un reporte.", "advertencia")
             return
 
         try:
-            # Procesar el escaneo
-            resultado = self.sesion.procesar_escaneo(codigo)
-            boleto = resultado["boleto"]
-
-            # Determinar estado y mensaje
-            if resultado["resultado"] == "EXITO":
-                estado = boleto.estado.value
-                mensaje = f"✅ {boleto.vendedor_nombre}"
-                self._reproducir_sonido("exito")
-            elif resultado["resultado"] == "DUPLICADO":
-                estado = "DUPLICADO"
-                mensaje = f"⚠️ Ya escaneado - {boleto.vendedor_nombre}"
-                self._reproducir_sonido("advertencia")
-            else:  # NO_ENCONTRADO
-                estado = "NO_REPORTADO"
-                mensaje = "❌ No encontrado en reporte"
-                self._reproducir_sonido("error")
-                # Para NO_REPORTADO, no hay objeto boleto
-                boleto = None
-
-            # Agregar a la lista (solo si hay boleto o es NO_REPORTADO)
-            timestamp = resultado["timestamp"].strftime("%H:%M:%S")
-            if boleto or resultado["resultado"] == "NO_ENCONTRADO":
-                self.lista_escaneos.agregar_escaneo(codigo, estado, mensaje, timestamp)
-
-            # Actualizar estadísticas SOLO si fue escaneo exitoso
-            if resultado["resultado"] == "EXITO":
-                self._actualizar_estadisticas()
+            resultados = self.sesion.procesar_escaneos_lote(codigos)
+        except Exception as e:
+            self.notificacion.mostrar(f"Error al procesar escaneo: {str(e)}")
+            return
 
-            # Actualizar barra de estado
-            self.barra_estado.config(text=f"Último escaneo: {codigo} - {mensaje}")
+        # La lista solo conserva los últimos max_items: no crear filas de más
+        primero_visible = len(resultados) - self.lista_escaneos.max_items
+        sonido = None
+        mensaje = ""
+        no_encontrado = None
+
+        for indice, (codigo, resultado) in enumerate(zip(codigos, resultados)):
+            try:
+                estado, mensaje, tipo_sonido = self._describir_resultado(resultado)
+                prioridad = PRIORIDAD_RESULTADO[tipo_sonido]
+                if prioridad > PRIORIDAD_RESULTADO.get(sonido, 0):
+                    sonido = tipo_sonido
+                if resultado["resultado"] in ("NO_ENCONTRADO", "LECTURA_INVALIDA"):
+                    no_encontrado = (codigo, resultado)
+                if resultado.get("validado_en_otra_sesion"):
+                    self.notificacion.mostrar(resultado["mensaje"], "advertencia")
+
+                if indice >= primero_visible:
+                    timestamp = resultado["timestamp"].strftime("%H:%M:%S")
+                    self.lista_escaneos.agregar_escaneo(
+                        codigo, estado, mensaje, timestamp
+                    )
+            except Exception as e:
+                self.notificacion.mostrar(f"Error al procesar escaneo: {str(e)}")
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al procesar escaneo:\n{str(e)}")
-        finally:
-            self.campo_escaneo.limpiar()
+        # Un solo sonido por tanda: el del resultado más grave
+        if sonido:
+            self._reproducir_sonido(sonido)
 
+        self._ofrecer_sugerencias(no_encontrado)
+
+        # Estadísticas y barra de estado se pintan en el próximo tick
+        self._mostrar_estado(f"Último escaneo: {codigo} - {mensaje}")
+
+    def _ofrecer_sugerencias(self, no_encontrado):
+        """
+        Ofrece los códigos parecidos al último no encontrado de la tanda,
+        cada uno con su tecla para aceptarlo.
+
+        Args:
+            no_encontrado: Tuple (código leído, resultado) o None
+        """
+        self.sugerencias_activas = []
+        if not no_encontrado:
+            return
+
+        codigo, resultado = no_encontrado
+        sugerencias = resultado.get("sugerencias", [])[: len(TECLAS_SUGERENCIA)]
+        if not sugerencias:
+            return
+
+        self.sugerencias_activas = sugerencias
+        motivo = (
+            "es una lectura inválida"
+            if resultado["resultado"] == "LECTURA_INVALIDA"
+            else "no encontrado"
+        )
+        opciones = "   ".join(
+            f"[{tecla}] {sugerido}"
+            for tecla, sugerido in zip(TECLAS_SUGERENCIA, sugerencias)
+        )
+        self.notificacion.mostrar(
+            f"❌ {codigo} {motivo}. ¿Quiso decir?   {opciones}", "advertencia"
+        )
+
+    def _aceptar_sugerencia(self, indice: int):
+        """Escanea la sugerencia elegida como si la hubiera leído el lector"""
+        if indice >= len(self.sugerencias_activas):
+            return
+        codigo = self.sugerencias_activas[indice]
+        self.sugerencias_activas = []
+        self.notificacion.ocultar()
+        self.campo_escaneo.encolar(codigo)
+        return "break"
+
+    def _deshacer_escaneo(self):
+        """Revierte el último escaneo (boleto de otro lote, lectura errónea)"""
+        if not self.sesion:
+            return "break"
+        exito, mensaje = self.sesion.deshacer_escaneo()
+        self.notificacion.mostrar(mensaje, "info" if exito else "advertencia")
+        self._mostrar_estado(mensaje)
+        return "break"
+
+    def _rehacer_escaneo(self):
+        """Vuelve a aplicar el último escaneo deshecho"""
+        if not self.sesion:
+            return "break"
+        exito, mensaje = self.sesion.rehacer_escaneo()
+        self.notificacion.mostrar(mensaje, "info" if exito else "advertencia")
+        self._mostrar_estado(mensaje)
+        return "break"
+
+    def _describir_resultado(self, resultado: dict):
+        """
+        Traduce el resultado de un escaneo para la interfaz.
+
+        Returns:
+            Tuple (estado para la lista, mensaje, tipo de sonido)
+        """
+        boleto = resultado["boleto"]
+
+        # Con varios reportes se indica en cuál está el boleto
+        origen = ""
+        if boleto and len(self.sesion.reportes) > 1:
+            reporte = self.sesion.reporte_de(boleto)
+            if reporte:
+                origen = f" [{reporte.nombre}]"
+
+        if resultado["resultado"] == "EXITO":
+            validacion = resultado.get("validado_en_otra_sesion")
+            if validacion:
+                return (
+                    boleto.estado.value,
+                    f"⚠️ Ya validado el {validacion['fecha_validacion']}"
+                    f" - {boleto.vendedor_nombre}{origen}",
+                    "advertencia",
+                )
+            return boleto.estado.value, f"✅ {boleto.vendedor_nombre}{origen}", "exito"
+        elif resultado["resultado"] == "DUPLICADO":
+            return (
+                "DUPLICADO",
+                f"⚠️ Ya escaneado - {boleto.vendedor_nombre}{origen}",
+                "advertencia",
+            )
+        elif resultado["resultado"] == "LECTURA_INVALIDA":
+            return "NO_REPORTADO", "⚠️ Lectura inválida - reescanear", "error"
+        else:  # NO_ENCONTRADO
+            return "NO_REPORTADO", "❌ No encontrado en reporte", "error"
+
+    @medir("ui.actualizar_estadisticas")
     def _actualizar_estadisticas(self):
-        """Actualiza las estadísticas en el panel"""
+        """
+        Recalcula las estadísticas de la sesión completa (tras cargas y
+        fusiones). El panel se redibuja en el próximo tick de refresco.
+        """
         if self.sesion:
             self.sesion.actualizar_estadisticas()
-            stats = self.sesion.estadisticas
 
-            self.panel_estadisticas.actualizar(
-                total=stats.total_boletos,
-                escaneados=stats.escaneados,
-                faltantes=stats.pendientes,
-                duplicados=stats.duplicados,
+    def _mostrar_estado(self, texto: str, inmediato: bool = False):
+        """
+        Pide mostrar un texto en la barra de estado.
+
+        Args:
+            texto: Texto a mostrar
+            inmediato: Pintarlo ya (antes de una operación larga) en lugar
+                de esperar al próximo tick
+        """
+        if inmediato:
+            self._texto_estado_pendiente = None
+            self.barra_estado.config(text=texto)
+        else:
+            self._texto_estado_pendiente = texto
+
+    def _refrescar_interfaz(self):
+        """
+        Tick de refresco (~30 Hz): compara la versión de las estadísticas de
+        la sesión con la última pintada y solo redibuja lo que cambió. Así el
+        procesamiento de escaneos nunca espera por el dibujo de widgets.
+        """
+        try:
+            clave = (
+                (id(self.sesion), self.sesion.version_estadisticas)
+                if self.sesion
+                else None
+            )
+            if clave != self._clave_estadisticas_mostrada:
+                self._clave_estadisticas_mostrada = clave
+                self._pintar_estadisticas()
+
+            # Escaneos marcados por otros procesos en el índice compartido
+            if self.sesion and self.sesion.indice_compartido is not None:
+                self.sesion.sincronizar_indice_compartido()
+            elif self.sesion and self.sesion.aviso_indice_compartido:
+                # La sesión dejó de publicarlo (ver _reconstruir_indices)
+                self.var_indice_compartido.set(False)
+                self._sesion_indice_compartido = None
+                self._mostrar_estado(self.sesion.aviso_indice_compartido)
+                self.sesion.aviso_indice_compartido = None
+
+            # Escaneos recibidos de estaciones remotas
+            if self.servidor_red:
+                atendidos = self.servidor_red.escaneos_atendidos
+                if atendidos != self._escaneos_red_vistos:
+                    self._escaneos_red_vistos = atendidos
+                    self._mostrar_estado(
+                        f"Servidor de red: {atendidos} escaneos remotos, "
+                        f"{self.servidor_red.conexiones_activas} estaciones conectadas"
+                    )
+                if self.servidor_red.ultimo_error:
+                    self._mostrar_estado(self.servidor_red.ultimo_error)
+                    self.servidor_red.ultimo_error = None
+
+            if self._texto_estado_pendiente is not None:
+                self.barra_estado.config(text=self._texto_estado_pendiente)
+                self._texto_estado_pendiente = None
+        finally:
+            self.root.after(
+                self.config.constantes.INTERVALO_REFRESCO_UI_MS,
+                self._refrescar_interfaz,
             )
 
+    @medir("ui.pintar_estadisticas")
+    def _pintar_estadisticas(self):
+        """Vuelca los contadores de la sesión en el panel de estadísticas"""
+        if not self.sesion:
+            self.panel_estadisticas.actualizar(0, 0, 0, 0)
+            return
+
+        stats = self.sesion.estadisticas
+        self.panel_estadisticas.actualizar(
+            total=stats.total_boletos,
+            escaneados=stats.escaneados,
+            faltantes=stats.pendientes,
+            duplicados=stats.duplicados,
+        )
+
     def _calcular_faltantes(self):
         """Calcula y muestra los boletos faltantes"""
         if not self.sesion:
             messagebox.showwarning("Advertencia", "Primero cargue un reporte.")
             return
 
-        faltantes = self.sesion.obtener_boletos_faltantes()
+        # El índice de pendientes da el total en O(1) y solo la primera página
+        cantidad_faltantes = self.sesion.contar_faltantes()
+        primeros = self.sesion.obtener_pagina_faltantes(0, 10)
         total = self.sesion.estadisticas.total_boletos
         escaneados = self.sesion.estadisticas.escaneados
 
         mensaje = f"✅ {escaneados} de {total} boletos escaneados\n"
-        mensaje += f"📋 {len(faltantes)} boletos faltantes por escanear"
+        mensaje += f"📋 {cantidad_faltantes} boletos faltantes por escanear"
 
-        if faltantes:
+        if primeros:
             mensaje += "\n\nBoletos faltantes:\n"
-            for boleto in faltantes[:10]:  # Mostrar solo primeros 10
+            for boleto in primeros:  # Mostrar solo primeros 10
                 mensaje += f"• {boleto.codigo} - {boleto.vendedor_nombre}\n"
 
-            if len(faltantes) > 10:
-                mensaje += f"\n... y {len(faltantes) - 10} más"
+            if cantidad_faltantes > len(primeros):
+                mensaje += f"\n... y {cantidad_faltantes - len(primeros)} más"
 
         messagebox.showinfo("Resultado del Cálculo", mensaje)
 
         # Actualizar barra de estado
-        self.barra_estado.config(text=f"Cálculo completado: {len(faltantes)} faltantes")
+        self._mostrar_estado(f"Cálculo completado: {cantidad_faltantes} faltantes")
 
     def _ver_faltantes(self):
         """Muestra una ventana con la lista completa de boletos faltantes"""
@@ -388,69 +731,32 @@ class MainWindow:
             messagebox.showwarning("Advertencia", "Primero cargue un reporte.")
             return
 
-        faltantes = self.sesion.obtener_boletos_faltantes()
+        if self.ventana_faltantes and self.ventana_faltantes.winfo_exists():
+            self.ventana_faltantes.lift()
+            return
 
-        if not faltantes:
+        if not self.sesion.contar_faltantes():
             messagebox.showinfo("Faltantes", "¡Excelente! No hay boletos faltantes.")
             return
 
-        # Crear ventana de diálogo
-        ventana_faltantes = tk.Toplevel(self.root)
-        ventana_faltantes.title("Boletos Faltantes")
-        ventana_faltantes.geometry("600x400")
-
-        # Frame con scroll
-        frame_principal = ttk.Frame(ventana_faltantes)
-        frame_principal.pack(fill="both", expand=True, padx=10, pady=10)
-
-        # Canvas con scrollbar
-        canvas = tk.Canvas(frame_principal)
-        scrollbar = ttk.Scrollbar(
-            frame_principal, orient="vertical", command=canvas.yview
+        # Se consulta siempre la sesión activa y solo la página visible
+        self.ventana_faltantes = VentanaFaltantes(
+            self.root,
+            contar=lambda sucursal=None: (
+                self.sesion.contar_faltantes(sucursal) if self.sesion else 0
+            ),
+            obtener_pagina=lambda *args: (
+                self.sesion.obtener_pagina_faltantes(*args) if self.sesion else []
+            ),
+            obtener_sucursales=lambda: (
+                self.sesion.obtener_faltantes_por_sucursal() if self.sesion else []
+            ),
+            obtener_version=lambda: (
+                (id(self.sesion), self.sesion.version_estadisticas)
+                if self.sesion
+                else None
+            ),
         )
-        scrollable_frame = ttk.Frame(canvas)
-
-        scrollable_frame.bind(
-            "<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-
-        # Empaquetar
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-
-        # Mostrar boletos faltantes
-        ttk.Label(
-            scrollable_frame,
-            text=f"📋 {len(faltantes)} BOLETOS FALTANTES",
-            style="Title.TLabel",
-        ).pack(pady=(0, 10))
-
-        for boleto in faltantes:
-            frame_boleto = ttk.Frame(scrollable_frame)
-            frame_boleto.pack(fill="x", padx=5, pady=2)
-
-            ttk.Label(
-                frame_boleto,
-                text=f"• {boleto.codigo}",
-                font=AppStyles.FUENTE_MONOSPACE,
-                width=15,
-            ).pack(side="left")
-
-            ttk.Label(
-                frame_boleto,
-                text=f"Vendedor: {boleto.vendedor_nombre}",
-                font=AppStyles.FUENTE_NORMAL,
-            ).pack(side="left", padx=(10, 0))
-
-            ttk.Label(
-                frame_boleto,
-                text=f"Sucursal: {boleto.sucursal}",
-                font=AppStyles.FUENTE_NORMAL,
-                foreground=AppColors.PENDIENTE,
-            ).pack(side="left", padx=(10, 0))
 
     def _exportar_resultados(self):
         """Exporta los resultados a un archivo Excel"""
@@ -477,14 +783,12 @@ class MainWindow:
             return
 
         try:
-            exito, mensaje = self.reporte_processor.exportar_con_resultados(
-                self.sesion, ruta_guardar
-            )
+            exito, mensaje = self._exportar_por_reporte(ruta_guardar)
 
             if exito:
                 messagebox.showinfo("Éxito", mensaje)
-                self.barra_estado.config(
-                    text=f"Resultados exportados: {os.path.basename(ruta_guardar)}"
+                self._mostrar_estado(
+                    f"Resultados exportados: {os.path.basename(ruta_guardar)}"
                 )
             else:
                 messagebox.showerror("Error", mensaje)
@@ -492,6 +796,134 @@ class MainWindow:
         except Exception as e:
             messagebox.showerror("Error", f"Error al exportar:\n{str(e)}")
 
+    def _exportar_por_pdv(self):
+        """Exporta un archivo de resultados o de faltantes por cada PDV"""
+        if not self.sesion or not self.sesion.boletos:
+            messagebox.showwarning("Advertencia", "Primero cargue un reporte.")
+            return
+
+        solo_faltantes = messagebox.askyesnocancel(
+            "Exportar por PDV",
+            "¿Exportar solo los boletos faltantes?\n\n"
+            + "• Sí: un archivo de faltantes por PDV\n"
+            + "• No: resultados completos por PDV\n"
+            + "• Cancelar: Volver a la aplicación",
+        )
+        if solo_faltantes is None:
+            return
+
+        carpeta_base = self.file_dialog_manager.seleccionar_carpeta_exportacion(
+            "Carpeta donde crear los archivos por PDV"
+        )
+        if not carpeta_base:
+            return
+
+        nombre_base = "resultados"
+        if self.ruta_reporte_actual:
+            nombre_base = os.path.splitext(os.path.basename(self.ruta_reporte_actual))[
+                0
+            ]
+        tipo = "FALTANTES" if solo_faltantes else "RESULTADOS"
+        fecha = datetime.now().strftime("%Y%m%d_%H%M%S")
+        carpeta = os.path.join(carpeta_base, f"{nombre_base}_{tipo}_PDV_{fecha}")
+
+        self._mostrar_estado("Exportando archivos por PDV...", inmediato=True)
+        self.root.update_idletasks()
+
+        from inventario_boletos.core.exportacion_pdv import exportar_por_pdv
+
+        try:
+            exito, mensaje, resumen = exportar_por_pdv(
+                self.sesion, carpeta, solo_faltantes=solo_faltantes
+            )
+            self._mostrar_estado(mensaje)
+            if exito:
+                messagebox.showinfo("Exportar por PDV", mensaje)
+            else:
+                detalle = "\n".join(f"• {error}" for error in resumen.errores[:10])
+                messagebox.showerror("Error", f"{mensaje}\n\n{detalle}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al exportar por PDV:\n{str(e)}")
+        finally:
+            self.campo_escaneo.entry.focus_set()
+
+    def _exportar_por_reporte(self, ruta_salida: str) -> Tuple[bool, str]:
+        """
+        Exporta los resultados: con un solo reporte en ruta_salida; con
+        varios, un archivo por reporte de origen (ruta_salida + nombre).
+
+        Returns:
+            Tuple (éxito, mensaje)
+        """
+        procesadores = {0: self.reporte_processor, **self.procesadores_adicionales}
+        if len(procesadores) == 1:
+            return self.reporte_processor.exportar_con_resultados(
+                self.sesion, ruta_salida
+            )
+
+        raiz, extension = os.path.splitext(ruta_salida)
+        mensajes = []
+        todos_exitosos = True
+        for indice, procesador in sorted(procesadores.items()):
+            reporte = self.sesion.reportes[indice]
+            exito, mensaje = procesador.exportar_con_resultados(
+                self.sesion, f"{raiz}_{reporte.nombre}{extension}"
+            )
+            todos_exitosos = todos_exitosos and exito
+            mensajes.append(mensaje)
+        return todos_exitosos, "\n".join(mensajes)
+
+    def _agregar_reporte(self):
+        """Suma otro reporte a la sesión actual (inventario de varias semanas)"""
+        if not self.sesion or not self.reporte_processor:
+            messagebox.showwarning("Advertencia", "Primero cargue un reporte.")
+            return
+
+        ruta_archivo = self.file_dialog_manager.seleccionar_reporte_nuevo(
+            "Seleccionar reporte para agregar a la sesión"
+        )
+        if not ruta_archivo:
+            return
+
+        self._mostrar_estado("Agregando reporte...", inmediato=True)
+        self.root.update_idletasks()
+
+        try:
+            procesador = self._nuevo_reporte_processor(self.config)
+            exito, mensaje = procesador.cargar_archivo(ruta_archivo)
+            if not exito:
+                messagebox.showerror("Error", mensaje)
+                return
+
+            ya_validados = set(self.sesion.validados_en_otras_sesiones)
+            exito, mensaje, reporte = self.sesion.agregar_reporte(
+                procesador.obtener_boletos(), ruta_archivo, procesador.huella
+            )
+            if not exito:
+                messagebox.showwarning("Reporte repetido", mensaje)
+                return
+            self._avisar_validados_antes(
+                [
+                    codigo
+                    for codigo in self.sesion.validados_en_otras_sesiones
+                    if codigo not in ya_validados
+                ]
+            )
+
+            self.procesadores_adicionales[reporte.indice] = procesador
+            self.lbl_archivo.config(
+                text=f"📄 {len(self.sesion.reportes)} reportes "
+                f"({len(self.sesion.boletos)} boletos)",
+                foreground=AppColors.EXITO,
+            )
+            self._mostrar_estado(mensaje)
+            messagebox.showinfo("Reporte agregado", mensaje)
+
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al agregar reporte:\n{str(e)}")
+        finally:
+            self.campo_escaneo.entry.focus_set()
+
     def _cargar_continuar_excel(self):
         """Carga un reporte exportado (Excel/CSV) para continuar el escaneo"""
         ruta_archivo = self.file_dialog_manager.seleccionar_reporte_continuar(
@@ -534,7 +966,11 @@ class MainWindow:
                 return
 
             # Asignar la sesión cargada
+            self._cerrar_diario_sesion()
             self.sesion = sesion_cargada
+            self._sincronizar_servidor_red()
+            self._conectar_registro_validados()
+            self._compartir_indice()
 
             # Necesitamos también el reporte processor
             # Para esto, cargamos el reporte original desde la ruta guardada en la sesión
@@ -542,9 +978,11 @@ class MainWindow:
                 hasattr(self.sesion, "ruta_reporte_original")
                 and self.sesion.ruta_reporte_original
             ):
-                self.reporte_processor = ReporteProcessor()
-                exito_carga, mensaje_carga = self.reporte_processor.cargar_archivo(
-                    self.sesion.ruta_reporte_original
+                huella = self.sesion.reportes[0].huella if self.sesion.reportes else ""
+                self.reporte_processor, exito_carga, mensaje_carga = (
+                    self._procesador_para_reporte(
+                        self.sesion.ruta_reporte_original, huella
+                    )
                 )
 
                 if not exito_carga:
@@ -553,6 +991,18 @@ class MainWindow:
                         f"Se cargó el progreso pero no se pudo cargar el reporte original:\n{mensaje_carga}",
                     )
 
+            # Y los demás reportes de la sesión, para exportar uno por reporte
+            self.procesadores_adicionales = {}
+            no_cargados = []
+            for reporte in self.sesion.reportes[1:]:
+                procesador, exito_carga, mensaje_carga = (
+                    self._procesador_para_reporte(reporte.ruta, reporte.huella)
+                )
+                if exito_carga:
+                    self.procesadores_adicionales[reporte.indice] = procesador
+                else:
+                    no_cargados.append(f"• {reporte.nombre}: {mensaje_carga}")
+
             # Actualizar interfaz
             self.ruta_reporte_actual = getattr(
                 self.sesion, "ruta_reporte_original", "Desconocida"
@@ -593,8 +1043,8 @@ class MainWindow:
             )
 
             # Actualizar barra de estado
-            self.barra_estado.config(
-                text=f"Progreso cargado: {stats.escaneados}/{stats.total_boletos} boletos procesados"
+            self._mostrar_estado(
+                f"Progreso cargado: {stats.escaneados}/{stats.total_boletos} boletos procesados"
             )
 
             # Enfocar campo de escaneo
@@ -608,6 +1058,12 @@ class MainWindow:
                 f"• Pendientes: {stats.pendientes}\n"
                 f"• Duplicados: {stats.duplicados}",
             )
+            if no_cargados:
+                messagebox.showwarning(
+                    "Advertencia",
+                    "No se pudieron cargar estos reportes de la sesión "
+                    "(no se exportarán):\n\n" + "\n".join(no_cargados),
+                )
 
         except Exception as e:
             messagebox.showerror(
@@ -618,7 +1074,7 @@ class MainWindow:
         """Carga un reporte Excel/CSV que ya tiene estados"""
         try:
             # Crear nuevo procesador
-            self.reporte_processor = ReporteProcessor()
+            self.reporte_processor = self._nuevo_reporte_processor()
 
             # Cargar reporte con estados
             exito, mensaje, boletos = self.reporte_processor.cargar_reporte_con_estados(
@@ -630,9 +1086,17 @@ class MainWindow:
                 return
 
             # Crear nueva sesión con los boletos cargados
+            self._cerrar_diario_sesion()
             self.sesion = SesionInventario()
-            self.sesion.ruta_reporte_original = ruta_archivo
-            self.sesion.agregar_boletos(boletos)
+            self.procesadores_adicionales = {}
+            self.sesion.agregar_reporte(
+                boletos, ruta_archivo, self.reporte_processor.huella
+            )
+            # Registro antes del diario: lo recuperado se anota como validado
+            self._conectar_registro_validados()
+            self._abrir_diario_sin_guardar()
+            self._sincronizar_servidor_red()
+            self._compartir_indice()
 
             # Actualizar interfaz
             self.ruta_reporte_actual = ruta_archivo
@@ -669,8 +1133,8 @@ class MainWindow:
             )
 
             # Actualizar barra de estado
-            self.barra_estado.config(
-                text=f"Continuando escaneo: {escaneados}/{total} boletos ya procesados"
+            self._mostrar_estado(
+                f"Continuando escaneo: {escaneados}/{total} boletos ya procesados"
             )
 
             # Enfocar campo de escaneo
@@ -717,8 +1181,8 @@ class MainWindow:
                 messagebox.showinfo(
                     "Éxito", f"Progreso guardado:\n{os.path.basename(ruta_guardar)}"
                 )
-                self.barra_estado.config(
-                    text=f"Progreso guardado: {os.path.basename(ruta_guardar)}"
+                self._mostrar_estado(
+                    f"Progreso guardado: {os.path.basename(ruta_guardar)}"
                 )
             else:
                 messagebox.showerror("Error", mensaje)
@@ -732,17 +1196,20 @@ class MainWindow:
             "Confirmar",
             "¿Está seguro de que desea limpiar todo?\nSe perderán todos los escaneos actuales.",
         ):
-            # Crear nueva sesión vacía
+            # Crear nueva sesión vacía (los escaneos se descartan con su diario)
+            self._cerrar_diario_sesion(descartar=True)
             self.sesion = SesionInventario()
             self.reporte_processor = None
+            self.procesadores_adicionales = {}
             self.ruta_reporte_actual = None
+            self._sincronizar_servidor_red()
+            self._compartir_indice()
 
             # Actualizar interfaz
             self.lbl_archivo.config(
                 text="No hay archivo cargado", foreground=AppColors.PENDIENTE
             )
 
-            self.panel_estadisticas.actualizar(0, 0, 0, 0)
             self.lista_escaneos.limpiar()
             self.campo_escaneo.limpiar()
 
@@ -755,8 +1222,8 @@ class MainWindow:
             self.btn_guardar_progreso.config(state="disabled")
 
             # Actualizar barra de estado
-            self.barra_estado.config(
-                text="Sesión limpiada. Listo para cargar nuevo reporte."
+            self._mostrar_estado(
+                "Sesión limpiada. Listo para cargar nuevo reporte."
             )
 
             # Enfocar campo de escaneo
@@ -780,6 +1247,303 @@ class MainWindow:
             # Solo imprimir en consola para debug
             print(f"Nota: No se pudo reproducir sonido '{tipo}': {e}")
 
+    def _alternar_servidor_red(self):
+        """Inicia o detiene el servidor de escaneo para estaciones remotas"""
+        if not self.var_servidor_red.get():
+            if self.servidor_red:
+                self.servidor_red.detener_hilo()
+                self.servidor_red = None
+            self._mostrar_estado("Servidor de escaneo en red detenido")
+            return
+
+        if not self.sesion:
+            messagebox.showwarning("Advertencia", "Primero cargue un reporte.")
+            self.var_servidor_red.set(False)
+            return
+
+        # Por defecto solo este equipo; abrir a la red local si se confirma
+        host = None
+        if messagebox.askyesno(
+            "Servidor de escaneo",
+            "¿Permitir que estaciones de otros equipos de la red envíen escaneos?\n\n"
+            "• Sí: Escuchar en toda la red local\n"
+            "• No: Solo en este equipo",
+        ):
+            host = "0.0.0.0"
+
+        from inventario_boletos.core.servidor_escaneo import ServidorEscaneo
+
+        self.servidor_red = ServidorEscaneo(self.sesion, host=host)
+        exito, mensaje = self.servidor_red.iniciar_en_hilo()
+
+        if not exito:
+            self.servidor_red = None
+            self.var_servidor_red.set(False)
+            messagebox.showerror("Error", mensaje)
+            return
+
+        self._escaneos_red_vistos = 0
+        self._mostrar_estado(mensaje)
+
+    def _sincronizar_servidor_red(self):
+        """Apunta el servidor de red a la sesión activa"""
+        if self.servidor_red:
+            self.servidor_red.sesion = self.sesion
+
+    def _cerrar_diario_sesion(self, descartar: bool = False):
+        """
+        Cierra el diario de la sesión que se va a reemplazar. Con descartar,
+        el diario de una sesión sin guardar también se borra.
+
+        Los escaneos de una sesión sin guardar se retiran del registro de
+        validados: si se recuperan de su diario, los anota la sesión nueva.
+        """
+        if self.sesion:
+            if self.sesion.diario_sin_guardar:
+                self.sesion.retirar_del_registro()
+            self.sesion.cerrar_diario(borrar_sin_guardar=descartar)
+
+    def _abrir_diario_sin_guardar(self):
+        """
+        Anota los cambios de una sesión recién cargada aunque todavía no se
+        haya guardado. Si quedó el diario de una sesión sin guardar del mismo
+        reporte (cierre inesperado), ofrece recuperar sus escaneos.
+        """
+        if not self.sesion or not self.sesion.reportes:
+            return
+        constantes = self.config.constantes
+        nombre = (
+            f"{constantes.PREFIJO_DIARIO_SIN_GUARDAR}"
+            f"{self.sesion.reportes[0].huella[:16]}{constantes.SUFIJO_DIARIO}"
+        )
+        ruta = os.path.join(constantes.CARPETA_PROGRESO, nombre)
+        try:
+            if (
+                os.path.exists(ruta)
+                and os.path.getsize(ruta) > 0
+                and messagebox.askyesno(
+                    "Recuperar escaneos",
+                    "Se encontraron escaneos sin guardar de una sesión anterior "
+                    "con este reporte.\n¿Desea recuperarlos?",
+                )
+            ):
+                cambios = self.sesion.recuperar_diario(ruta)
+                self._mostrar_estado(f"{cambios} cambios recuperados del diario")
+            else:
+                self.sesion.abrir_diario(ruta, truncar=True, sin_guardar=True)
+        except OSError as e:
+            self._mostrar_estado(f"Diario de cambios no disponible: {e}")
+
+    def _compartir_indice(self):
+        """
+        Publica (o deja de publicar) el índice de códigos mapeado en memoria
+        de la sesión activa, para que otros procesos se adjunten sin cargar
+        el reporte.
+        """
+        # La sesión anterior suelta el archivo antes de que se reemplace
+        if self._sesion_indice_compartido is not None:
+            self._sesion_indice_compartido.cerrar_indice_compartido()
+            self._sesion_indice_compartido = None
+
+        if not self.var_indice_compartido.get() or not self.sesion:
+            return
+        if not self.sesion.boletos:
+            self._mostrar_estado("Índice compartido: primero cargue un reporte")
+            return
+
+        exito, mensaje = self.sesion.publicar_indice_compartido()
+        if exito:
+            self._sesion_indice_compartido = self.sesion
+            self._mostrar_estado(mensaje)
+        else:
+            self.var_indice_compartido.set(False)
+            messagebox.showerror("Error", mensaje)
+
+    def _conectar_registro_validados(self):
+        """
+        Conecta la sesión activa al registro de boletos validados en sesiones
+        anteriores y avisa si el reporte trae boletos que ya se pagaron.
+        """
+        if not self.config.constantes.USAR_REGISTRO_VALIDADOS:
+            return
+
+        from inventario_boletos.core.registro_validados import RegistroValidados
+
+        try:
+            if self.registro_validados is None:
+                self.registro_validados = RegistroValidados(
+                    self.config.constantes.RUTA_REGISTRO_VALIDADOS
+                )
+            self.sesion.conectar_registro(self.registro_validados)
+        except Exception as e:
+            # Sin registro se sigue escaneando; solo se pierde la alerta
+            self._mostrar_estado(f"Registro de validados no disponible: {e}")
+            return
+
+        self._avisar_validados_antes(list(self.sesion.validados_en_otras_sesiones))
+
+    def _avisar_validados_antes(self, codigos: List[str]):
+        """Muestra los boletos pendientes que ya se validaron en otra sesión"""
+        if not codigos:
+            return
+
+        validados = self.sesion.validados_en_otras_sesiones
+        detalle = "\n".join(
+            f"• {codigo} - {validados[codigo]['fecha_validacion']}"
+            f" ({validados[codigo]['reporte'] or 'sin reporte'})"
+            for codigo in codigos[:10]
+        )
+        if len(codigos) > 10:
+            detalle += f"\n... y {len(codigos) - 10} más"
+
+        self._mostrar_estado(
+            f"⚠️ {len(codigos)} boletos del reporte ya fueron validados antes"
+        )
+        messagebox.showwarning(
+            "Boletos validados antes",
+            f"{len(codigos)} boletos pendientes ya fueron validados en sesiones "
+            f"anteriores:\n\n{detalle}",
+        )
+
+    def _fusionar_progresos(self):
+        """Une a la sesión actual los progresos JSON de otras estaciones"""
+        if not self.sesion:
+            messagebox.showwarning("Advertencia", "Primero cargue un reporte.")
+            return
+
+        rutas = self.file_dialog_manager.seleccionar_progresos_json_multiples(
+            "Seleccionar progresos de las estaciones"
+        )
+        if not rutas:
+            return
+
+        from inventario_boletos.core.fusion_progresos import fusionar_progresos
+
+        try:
+            self._mostrar_estado(
+                f"Fusionando {len(rutas)} progresos...", inmediato=True
+            )
+            self.root.update_idletasks()
+
+            exito, mensaje, resumen = fusionar_progresos(self.sesion, rutas)
+
+            self._actualizar_estadisticas()
+            self._mostrar_estado(mensaje)
+
+            detalle = (
+                f"• Archivos: {len(resumen.archivos)}\n"
+                f"• Escaneados nuevos: {resumen.escaneados_nuevos}\n"
+                f"• Duplicados entre estaciones: {resumen.duplicados_entre_estaciones}\n"
+                f"• No encontrados en el reporte: {resumen.no_encontrados}\n"
+                f"• Conflictos: {resumen.total_conflictos}"
+            )
+            if resumen.conflictos:
+                detalle += "\n\nConflictos:\n"
+                detalle += "\n".join(f"• {c}" for c in resumen.conflictos[:10])
+                if resumen.total_conflictos > 10:
+                    detalle += f"\n... y {resumen.total_conflictos - 10} más"
+
+            if exito:
+                messagebox.showinfo("Fusión de progresos", detalle)
+            else:
+                messagebox.showerror("Error", f"{mensaje}\n\n{detalle}")
+
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al fusionar progresos:\n{str(e)}")
+
+    def _alternar_modo_depuracion(self):
+        """Activa o desactiva la medición de latencias"""
+        self.config.debug_mode = self.var_modo_depuracion.get()
+        instrumentacion.configurar(self.config.debug_mode)
+        estado = "activada" if self.config.debug_mode else "desactivada"
+        self._mostrar_estado(f"Medición de latencias {estado}")
+
+    def _abrir_panel_depuracion(self):
+        """Muestra los histogramas de latencia por etapa"""
+        if self.ventana_depuracion and self.ventana_depuracion.winfo_exists():
+            self.ventana_depuracion.lift()
+            return
+
+        if not self.config.debug_mode:
+            self._mostrar_estado(
+                "Active el modo depuración para registrar latencias"
+            )
+
+        self.ventana_depuracion = VentanaDepuracion(
+            self.root,
+            obtener_resumen=instrumentacion.resumen,
+            on_exportar=self._exportar_metricas,
+            on_reiniciar=instrumentacion.reiniciar,
+        )
+
+    def _abrir_panel_agregados(self):
+        """Muestra el avance y los premios validados por grupo"""
+        if self.ventana_agregados and self.ventana_agregados.winfo_exists():
+            self.ventana_agregados.lift()
+            return
+
+        if not self.sesion:
+            messagebox.showwarning("Advertencia", "Primero cargue un reporte.")
+            return
+
+        # Se consulta siempre la sesión activa (puede cambiar con la ventana abierta)
+        self.ventana_agregados = VentanaAgregados(
+            self.root,
+            obtener_agregados=lambda *args: (
+                self.sesion.obtener_agregados(*args) if self.sesion else []
+            ),
+            obtener_version=lambda: (
+                (id(self.sesion), self.sesion.version_estadisticas)
+                if self.sesion
+                else None
+            ),
+            obtener_totales=lambda: (
+                self.sesion.totales_premios if self.sesion else None
+            ),
+        )
+
+    def _abrir_busqueda(self):
+        """Busca boletos por los dígitos legibles de un código dañado"""
+        if self.ventana_busqueda and self.ventana_busqueda.winfo_exists():
+            self.ventana_busqueda.lift()
+            self.ventana_busqueda.entry.focus_set()
+            return
+
+        if not self.sesion:
+            messagebox.showwarning("Advertencia", "Primero cargue un reporte.")
+            return
+
+        # Se consulta siempre la sesión activa; el código elegido entra a la
+        # misma cola que los del lector
+        self.ventana_busqueda = VentanaBusqueda(
+            self.root,
+            contar=lambda digitos, por_sufijo: (
+                self.sesion.contar_codigos_parciales(digitos, por_sufijo)
+                if self.sesion
+                else 0
+            ),
+            buscar=lambda digitos, inicio, cantidad, por_sufijo: (
+                self.sesion.buscar_codigos_parciales(
+                    digitos, inicio, cantidad, por_sufijo
+                )
+                if self.sesion
+                else []
+            ),
+            on_escanear=self.campo_escaneo.encolar,
+        )
+
+    def _exportar_metricas(self):
+        """Guarda los histogramas de latencia en un archivo JSON"""
+        ruta_guardar = self.file_dialog_manager.guardar_metricas_json()
+        if not ruta_guardar:
+            return
+
+        exito, mensaje = instrumentacion.volcar_json(ruta_guardar)
+        if exito:
+            self._mostrar_estado(mensaje)
+        else:
+            messagebox.showerror("Error", mensaje)
+
     def _on_cerrar(self):
         """Maneja el cierre de la ventana de manera segura"""
         if self.sesion:
@@ -796,6 +1560,21 @@ class MainWindow:
             elif respuesta:  # Sí (guardar y salir)
                 self._exportar_antes_de_salir()
 
+        # Detener servidor de red si está activo
+        if self.servidor_red:
+            self.servidor_red.detener_hilo()
+
+        # Detener hilo de audio
+        self.sound_manager.cerrar()
+
+        if self.sesion:
+            self.sesion.cerrar_diario()
+            self.sesion.cerrar_indice_compartido()
+
+        # Escribir las validaciones que quedan en memoria
+        if self.registro_validados is not None:
+            self.registro_validados.cerrar()
+
         # Forzar cierre limpio
         self.root.quit()
         self.root.destroy()
@@ -812,9 +1591,7 @@ class MainWindow:
                 self.ruta_reporte_actual
             )
 
-            exito, mensaje = self.reporte_processor.exportar_con_resultados(
-                self.sesion, ruta_auto
-            )
+            exito, mensaje = self._exportar_por_reporte(ruta_auto)
 
             if exito:
                 messagebox.showinfo(
@@ -857,10 +1634,51 @@ class MainWindow:
                         except Exception as e:
                             print(f"Error al crear carpeta '{nombre}': {e}")
 
+    def _nuevo_reporte_processor(
+        self, config: AppConfig = None
+    ) -> "ReporteProcessor":
+        """Crea un ReporteProcessor; pandas se importa aquí la primera vez"""
+        from inventario_boletos.core.report_processor import ReporteProcessor
+
+        return ReporteProcessor(config)
+
+    def _procesador_para_reporte(
+        self, ruta: str, huella: str
+    ) -> Tuple["ReporteProcessor", bool, str]:
+        """
+        Procesador de un reporte de la sesión: desde la caché de reportes si
+        hay una tabla con la misma huella, si no leyendo el archivo.
+
+        Returns:
+            Tuple (procesador, éxito, mensaje)
+        """
+        from inventario_boletos.core.report_processor import ReporteProcessor
+        from inventario_boletos.core.tabla_boletos import TablaBoletos
+
+        tabla, aviso_cache = TablaBoletos.cargar_cache(huella)
+        if tabla is not None:
+            procesador = ReporteProcessor.desde_tabla(tabla, huella=huella)
+            return procesador, True, self.config.constantes.MSG_CARGA_EXITOSA
+
+        procesador = self._nuevo_reporte_processor()
+        exito, mensaje = procesador.cargar_archivo(ruta)
+        if aviso_cache:
+            procesador.errores.append(aviso_cache)
+        return procesador, exito, mensaje
+
+    def _verificar_carpetas_al_iniciar(self):
+        """Verifica las carpetas ya con la ventana visible y devuelve el foco"""
+        self._verificar_carpetas_espanol()
+        self.campo_escaneo.entry.focus_set()
+
     def run(self):
         """Ejecuta la aplicación"""
         # Enfocar campo de escaneo al iniciar
         self.root.after(100, lambda: self.campo_escaneo.entry.focus_set())
 
+        # La verificación de carpetas puede abrir un diálogo: hacerla después
+        # de que la ventana y el campo de escaneo estén disponibles
+        self.root.after(500, self._verificar_carpetas_al_iniciar)
+
         # Iniciar el loop principal
         self.root.mainloop()
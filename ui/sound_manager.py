@@ -2,17 +2,21 @@
 MANEJADOR DE SONIDOS PARA LA APLICACIÓN
 """
 
+import importlib.util
 import os
 import platform
+import queue
+import shutil
+import threading
+import time
 from enum import Enum
 from typing import Optional
 
-try:
-    import pygame
+from inventario_boletos.core.instrumentacion import medir
 
-    PYGAME_AVAILABLE = True
-except ImportError:
-    PYGAME_AVAILABLE = False
+# pygame solo se busca aquí; se importa en el hilo de audio al iniciar
+PYGAME_AVAILABLE = importlib.util.find_spec("pygame") is not None
+pygame = None
 
 
 class TipoSonido(Enum):
@@ -23,8 +27,30 @@ class TipoSonido(Enum):
     ERROR = "error"
 
 
+# Prioridad al agrupar ráfagas: suena el resultado más grave
+PRIORIDAD_SONIDO = {
+    TipoSonido.EXITO: 1,
+    TipoSonido.ADVERTENCIA: 2,
+    TipoSonido.ERROR: 3,
+}
+
+# Reproductores de Linux en orden de preferencia
+REPRODUCTORES_LINUX = ["paplay", "aplay", "mpg123", "mpg321"]
+
+
 class SoundManager:
-    """Manejador de sonidos para la aplicación"""
+    """
+    Manejador de sonidos para la aplicación.
+
+    play() solo encola el pedido y retorna al instante; un hilo de audio
+    dedicado los reproduce. Ese mismo hilo importa pygame, inicia el mixer y
+    decodifica los mp3, así la ventana no espera por el audio al arrancar. Si llegan varios pedidos mientras suena uno se
+    agrupan en un único sonido (el más grave), y un mismo sonido repetido
+    dentro de INTERVALO_MINIMO se ignora.
+    """
+
+    TAMANO_COLA = 8
+    INTERVALO_MINIMO = 0.25  # Segundos entre repeticiones del mismo sonido
 
     def __init__(self, sounds_dir: str = None):
         """
@@ -45,6 +71,25 @@ class SoundManager:
         self.use_pygame = PYGAME_AVAILABLE
         self.sounds = {}
 
+        # Descubrir una sola vez el reproductor externo y las rutas de sonido
+        self.sistema = platform.system()
+        self.reproductor_linux = self._descubrir_reproductor_linux()
+        self._rutas_sonidos = {}
+
+        # Hilo de audio con cola acotada: play() nunca bloquea la interfaz
+        self._cola_sonidos = queue.Queue(maxsize=self.TAMANO_COLA)
+        self._ultimo_sonido = None
+        self._ultimo_instante = 0.0
+        self.audio_listo = threading.Event()
+        self._hilo_audio = threading.Thread(
+            target=self._bucle_audio, name="AudioWorker", daemon=True
+        )
+        self._hilo_audio.start()
+
+    def _inicializar_audio(self):
+        """Prepara rutas, pygame y sonidos (se ejecuta en el hilo de audio)"""
+        global pygame
+
         # Verificar si el directorio existe
         if not os.path.exists(self.sounds_dir):
             print(
@@ -53,9 +98,14 @@ class SoundManager:
             print(f"Directorio actual de trabajo: {os.getcwd()}")
             return
 
+        for tipo in TipoSonido:
+            self._rutas_sonidos[tipo] = self._get_sound_filepath(tipo)
+
         # Cargar sonidos si pygame está disponible
         if self.use_pygame:
             try:
+                import pygame
+
                 pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
                 self._load_sounds()
                 self.sounds_loaded = True
@@ -67,7 +117,7 @@ class SoundManager:
 
     def _load_sounds(self):
         """Carga todos los archivos de sonido"""
-        if not PYGAME_AVAILABLE or not os.path.exists(self.sounds_dir):
+        if pygame is None or not os.path.exists(self.sounds_dir):
             return
 
         # Mapeo de tipos de sonido a archivos
@@ -88,13 +138,85 @@ class SoundManager:
             else:
                 print(f"⚠ Archivo de sonido no encontrado: {filepath}")
 
-    def play(self, tipo_sonido: TipoSonido):
+    def _descubrir_reproductor_linux(self) -> Optional[str]:
+        """Busca en el PATH el primer reproductor de Linux disponible"""
+        if self.sistema != "Linux":
+            return None
+
+        for reproductor in REPRODUCTORES_LINUX:
+            ruta = shutil.which(reproductor)
+            if ruta:
+                return ruta
+        return None
+
+    @medir("sonido.play")
+    def play(self, tipo_sonido: TipoSonido) -> bool:
         """
-        Reproduce un sonido según el tipo.
+        Encola un sonido para el hilo de audio y retorna de inmediato.
 
         Args:
             tipo_sonido: Tipo de sonido a reproducir
+
+        Returns:
+            False si la cola estaba llena y el pedido se descartó
         """
+        try:
+            self._cola_sonidos.put_nowait(tipo_sonido)
+            return True
+        except queue.Full:
+            return False
+
+    def cerrar(self):
+        """Detiene el hilo de audio"""
+        try:
+            self._cola_sonidos.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def _bucle_audio(self):
+        """Hilo de audio: inicializa, toma pedidos, agrupa ráfagas y reproduce"""
+        try:
+            self._inicializar_audio()
+        except Exception as e:
+            print(f"Error inicializando audio: {e}")
+            self.use_pygame = False
+        finally:
+            self.audio_listo.set()
+            print(f"Estado de sonidos: {self.get_sounds_status()}")
+
+        while True:
+            tipo_sonido = self._cola_sonidos.get()
+            if tipo_sonido is None:
+                return
+
+            # Agrupar todo lo que se acumuló: sonará solo el más grave
+            while True:
+                try:
+                    siguiente = self._cola_sonidos.get_nowait()
+                except queue.Empty:
+                    break
+                if siguiente is None:
+                    return
+                if PRIORIDAD_SONIDO[siguiente] > PRIORIDAD_SONIDO[tipo_sonido]:
+                    tipo_sonido = siguiente
+
+            ahora = time.monotonic()
+            if (
+                tipo_sonido == self._ultimo_sonido
+                and ahora - self._ultimo_instante < self.INTERVALO_MINIMO
+            ):
+                continue
+
+            self._ultimo_sonido = tipo_sonido
+            self._ultimo_instante = ahora
+
+            try:
+                self._reproducir(tipo_sonido)
+            except Exception as e:
+                print(f"Error en hilo de audio: {e}")
+
+    def _reproducir(self, tipo_sonido: TipoSonido) -> bool:
+        """Reproduce un sonido (se ejecuta en el hilo de audio)"""
         # Intentar con pygame primero
         if self.use_pygame and self.sounds_loaded and tipo_sonido in self.sounds:
             try:
@@ -109,7 +231,7 @@ class SoundManager:
 
     def _play_fallback(self, tipo_sonido: TipoSonido) -> bool:
         """Reproduce sonidos usando métodos alternativos"""
-        sistema = platform.system()
+        sistema = self.sistema
 
         try:
             if sistema == "Linux":
@@ -132,28 +254,20 @@ class SoundManager:
         """Reproduce sonidos en Linux (Ubuntu/Debian)"""
         import subprocess
 
-        # Obtener ruta del archivo de sonido
-        filepath = self._get_sound_filepath(tipo_sonido)
-
-        if filepath and os.path.exists(filepath):
-            # Intentar varios reproductores en orden de preferencia
-            reproductores = ["paplay", "aplay", "mpg123", "mpg321"]
+        # Ruta y reproductor ya resueltos al iniciar
+        filepath = self._rutas_sonidos.get(tipo_sonido)
 
-            for reproductor in reproductores:
-                try:
-                    # Verificar si el reproductor está instalado
-                    subprocess.run(
-                        ["which", reproductor], capture_output=True, check=True
-                    )
-                    # Reproducir el sonido
-                    subprocess.Popen(
-                        [reproductor, filepath],
-                        stdout=subprocess.DEVNULL,
-                        stderr=subprocess.DEVNULL,
-                    )
-                    return True
-                except (subprocess.CalledProcessError, FileNotFoundError):
-                    continue
+        if filepath and self.reproductor_linux:
+            try:
+                subprocess.Popen(
+                    [self.reproductor_linux, filepath],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                )
+                return True
+            except OSError:
+                # El reproductor desapareció: no volver a intentarlo
+                self.reproductor_linux = None
 
         # Fallback a beeps del terminal
         return self._play_beep(tipo_sonido)
@@ -164,7 +278,7 @@ class SoundManager:
             import winsound
 
             # Primero intentar con archivo de sonido
-            filepath = self._get_sound_filepath(tipo_sonido)
+            filepath = self._rutas_sonidos.get(tipo_sonido)
             if filepath and os.path.exists(filepath):
                 try:
                     winsound.PlaySound(
@@ -195,8 +309,8 @@ class SoundManager:
         """Reproduce sonidos en macOS"""
         import subprocess
 
-        filepath = self._get_sound_filepath(tipo_sonido)
-        if filepath and os.path.exists(filepath):
+        filepath = self._rutas_sonidos.get(tipo_sonido)
+        if filepath:
             try:
                 subprocess.Popen(
                     ["afplay", filepath],
@@ -223,10 +337,9 @@ class SoundManager:
                     print("\a", end="", flush=True)
             elif tipo_sonido == TipoSonido.ERROR:
                 # Tres beeps largos
+                # (se ejecuta en el hilo de audio, la pausa no frena la interfaz)
                 for _ in range(3):
                     print("\a", end="", flush=True)
-                    import time
-
                     time.sleep(0.1)
             return True
         except:
@@ -258,8 +371,11 @@ class SoundManager:
             "pygame_available": PYGAME_AVAILABLE,
             "use_pygame": self.use_pygame,
             "sounds_loaded": self.sounds_loaded,
+            "audio_listo": self.audio_listo.is_set(),
             "sounds_dir": self.sounds_dir,
             "sounds_available": list(self.sounds.keys()),
+            "reproductor_linux": self.reproductor_linux,
+            "cola_pendiente": self._cola_sonidos.qsize(),
             "directory_exists": os.path.exists(self.sounds_dir)
             if self.sounds_dir
             else False,
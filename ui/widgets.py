@@ -1,22 +1,57 @@
 """
 WIDGETS PERSONALIZADOS PARA LA INTERFAZ
 """
+import re
 import tkinter as tk
 from tkinter import ttk
+from collections import deque
 from datetime import datetime
-from typing import Optional, Callable
+from typing import Optional, Callable, List
 
 from inventario_boletos.ui.styles import AppStyles, AppColors
+from inventario_boletos.config.constants import AppConstants
+from inventario_boletos.core.instrumentacion import medir
 
 
 class CampoEscaneo(ttk.Frame):
-    """Widget personalizado para el campo de escaneo"""
+    """
+    Widget personalizado para el campo de escaneo.
     
-    def __init__(self, parent, on_escaneo: Callable[[str], None], **kwargs):
+    Cada código capturado se encola y el campo queda libre al instante; la
+    cola se entrega al consumidor en tandas cuando Tk ya atendió las teclas
+    pendientes, así una ráfaga del lector no pierde ni concatena dígitos.
+    
+    Si llegan varios códigos juntos (lector sin sufijo Enter o una columna
+    pegada) se separan por saltos de línea/tabuladores, por las pausas entre
+    ráfagas de teclas o por bloques de LONGITUD_CODIGO_BARRAS dígitos.
+    """
+    
+    LOTE_MAXIMO = 64  # Códigos entregados por tanda al consumidor
+    UMBRAL_TECLA_LECTOR = 0.05  # Segundos: teclas más seguidas vienen del lector
+    PAUSA_ENTRE_CODIGOS = 0.5  # Segundos: más separación = código nuevo
+    PAUSA_FIN_RAFAGA_MS = 150  # Silencio tras una ráfaga del lector sin Enter
+    SEPARADORES = re.compile(r"[\s,;]+")
+    
+    def __init__(
+        self,
+        parent,
+        on_escaneo: Optional[Callable[[str], None]] = None,
+        on_lote: Optional[Callable[[List[str]], None]] = None,
+        **kwargs
+    ):
         super().__init__(parent, **kwargs)
         self.on_escaneo = on_escaneo
+        self.on_lote = on_lote
         self.ultimo_escaneo = None
         self.ultimo_escaneo_time = None
+        self.cola_codigos = deque()
+        self._drenado_programado = False
+        self.longitud_codigo = AppConstants().LONGITUD_CODIGO_BARRAS
+        
+        # Seguimiento de ráfagas de teclas
+        self._cortes = []  # Posiciones del texto donde hubo una pausa larga
+        self._teclas_rapidas = 0  # Teclas seguidas al ritmo del lector
+        self._id_fin_rafaga = None
         
         self._construir_widgets()
         self._configurar_eventos()
@@ -72,6 +107,9 @@ class CampoEscaneo(ttk.Frame):
         
         # Capturar todas las teclas para detectar escaneo rápido
         self.entry.bind('<Key>', self._on_key_press)
+        
+        # Pegar una columna de códigos los envía como un lote
+        self.entry.bind('<<Paste>>', self._on_pegar)
     
     def mostrar_placeholder(self):
         """Muestra el texto de placeholder"""
@@ -103,26 +141,146 @@ class CampoEscaneo(ttk.Frame):
         ahora = datetime.now()
         if self.ultimo_escaneo_time:
             diferencia = (ahora - self.ultimo_escaneo_time).total_seconds()
-            if diferencia > 0.5:  # Más de 0.5 segundos entre teclas = escritura manual
+            if diferencia > self.PAUSA_ENTRE_CODIGOS:  # Pausa larga = escritura manual
                 self.ultimo_escaneo = None
+                
+                # Si ya había texto, lo que sigue es otro código
+                posicion = len(self.entry_var.get())
+                if posicion:
+                    self._cortes.append(posicion)
+            
+            if diferencia < self.UMBRAL_TECLA_LECTOR:
+                self._teclas_rapidas += 1
+            else:
+                self._teclas_rapidas = 0
         
         self.ultimo_escaneo_time = ahora
+        
+        # Lector sin sufijo: al terminar la ráfaga enviar sin esperar Enter
+        if event.char and event.char.isprintable():
+            if self._id_fin_rafaga:
+                self.after_cancel(self._id_fin_rafaga)
+            self._id_fin_rafaga = self.after(self.PAUSA_FIN_RAFAGA_MS, self._on_fin_rafaga)
+    
+    def _on_fin_rafaga(self):
+        """Envía el contenido si la última ráfaga tuvo largo de código completo"""
+        self._id_fin_rafaga = None
+        
+        # La primera tecla de la ráfaga no cuenta como rápida
+        if self._teclas_rapidas + 1 >= self.longitud_codigo:
+            self._procesar_entrada()
+    
+    def _on_pegar(self, event=None):
+        """Si el portapapeles trae varios códigos, los encola como un lote"""
+        try:
+            texto = self.clipboard_get()
+        except tk.TclError:
+            return None
+        
+        codigos = self.segmentar_codigos(texto)
+        if len(codigos) <= 1:
+            return None  # Pegado normal dentro del campo
+        
+        self.ocultar_placeholder()
+        self._reiniciar_entrada()
+        self.encolar_varios(codigos)
+        return "break"
+    
+    def segmentar_codigos(self, texto: str, cortes: Optional[List[int]] = None) -> List[str]:
+        """
+        Separa un texto que puede traer varios códigos.
+        
+        Args:
+            texto: Texto capturado o pegado
+            cortes: Posiciones del texto donde hubo pausas entre ráfagas
+        
+        Returns:
+            Lista de códigos en el orden en que llegaron
+        """
+        longitud = self.longitud_codigo
+        
+        # 1) Separadores explícitos: salto de línea, tabulador, espacio, coma
+        trozos = [t for t in self.SEPARADORES.split(texto) if t]
+        
+        # 2) Pausas entre ráfagas del lector (solo si vino todo junto)
+        if cortes and len(trozos) == 1:
+            limites = [0] + [c for c in cortes if 0 < c < len(texto)] + [len(texto)]
+            trozos = [
+                texto[inicio:fin].strip()
+                for inicio, fin in zip(limites, limites[1:])
+                if texto[inicio:fin].strip()
+            ]
+        
+        # 3) Bloques de longitud fija: varios códigos pegados sin separador
+        codigos = []
+        for trozo in trozos:
+            if trozo.isdigit() and len(trozo) > longitud and len(trozo) % longitud == 0:
+                codigos.extend(
+                    trozo[i:i + longitud] for i in range(0, len(trozo), longitud)
+                )
+            else:
+                codigos.append(trozo)
+        
+        return codigos
+    
+    def _reiniciar_entrada(self):
+        """Vacía el campo y el seguimiento de ráfagas"""
+        self.entry_var.set("")
+        self._cortes = []
+        self._teclas_rapidas = 0
+        if self._id_fin_rafaga:
+            self.after_cancel(self._id_fin_rafaga)
+            self._id_fin_rafaga = None
     
     def _procesar_entrada(self, event=None):
         """Procesa la entrada del usuario"""
-        codigo = self.entry_var.get().strip()
+        texto = self.entry_var.get()
+        codigo = texto.strip()
         
         # Ignorar si está vacío o es el placeholder
         if not codigo or codigo == self.placeholder:
             return
         
-        # Limpiar el campo
-        self.entry_var.set("")
+        codigos = self.segmentar_codigos(texto, self._cortes)
+        
+        # Limpiar el campo de inmediato para aceptar el próximo código
+        self._reiniciar_entrada()
         self.entry.focus_set()
         
-        # Llamar al callback de escaneo
-        if self.on_escaneo:
-            self.on_escaneo(codigo)
+        self.encolar_varios(codigos)
+    
+    def encolar(self, codigo: str):
+        """Agrega un código a la cola y programa su procesamiento"""
+        self.cola_codigos.append(codigo)
+        if not self._drenado_programado:
+            self._drenado_programado = True
+            self.after_idle(self._drenar_cola)
+    
+    def encolar_varios(self, codigos: List[str]):
+        """Agrega varios códigos a la cola; se entregan juntos como un lote"""
+        self.cola_codigos.extend(codigos)
+        if codigos and not self._drenado_programado:
+            self._drenado_programado = True
+            self.after_idle(self._drenar_cola)
+    
+    def _drenar_cola(self):
+        """Entrega al consumidor los códigos acumulados, en tandas"""
+        lote = []
+        while self.cola_codigos and len(lote) < self.LOTE_MAXIMO:
+            lote.append(self.cola_codigos.popleft())
+        
+        try:
+            if self.on_lote:
+                self.on_lote(lote)
+            elif self.on_escaneo:
+                for codigo in lote:
+                    self.on_escaneo(codigo)
+        finally:
+            if self.cola_codigos:
+                # Dejar que Tk atienda teclas antes de la próxima tanda
+                self.after(1, self._drenar_cola)
+            else:
+                self._drenado_programado = False
     
     def forzar_escaneo(self, codigo: str):
         """Fuerza el procesamiento de un código (para testing)"""
@@ -136,11 +294,48 @@ class CampoEscaneo(ttk.Frame):
         self.entry.focus_set()
 
 
+class Notificacion(ttk.Frame):
+    """
+    Aviso no modal que se oculta solo. Reemplaza a los messagebox en el
+    camino de escaneo para que un error no detenga la cola de códigos.
+    """
+    
+    COLORES = {
+        "error": AppColors.NO_ENCONTRADO,
+        "advertencia": AppColors.DUPLICADO,
+        "info": AppColors.NORMAL,
+    }
+    
+    def __init__(self, parent, duracion_ms: int = 4000, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.duracion_ms = duracion_ms
+        self._id_ocultar = None
+        
+        self.label = ttk.Label(self, text="", font=AppStyles.FUENTE_NORMAL, anchor='center')
+        self.label.pack(fill='x', padx=10, pady=2)
+    
+    def mostrar(self, mensaje: str, tipo: str = "error"):
+        """Muestra un aviso (reemplaza al anterior) durante duracion_ms"""
+        self.label.config(text=mensaje, foreground=self.COLORES.get(tipo, AppColors.NORMAL))
+        self.grid()
+        
+        if self._id_ocultar:
+            self.after_cancel(self._id_ocultar)
+        self._id_ocultar = self.after(self.duracion_ms, self.ocultar)
+    
+    def ocultar(self):
+        """Oculta el aviso"""
+        self._id_ocultar = None
+        self.grid_remove()
+
+
 class PanelEstadisticas(ttk.LabelFrame):
     """Widget para mostrar estadísticas en tiempo real"""
     
     def __init__(self, parent, **kwargs):
         super().__init__(parent, text="ESTADÍSTICAS", **kwargs)
+        self._textos_mostrados = {}  # etiqueta -> texto actualmente visible
+        self._porcentaje_mostrado = None
         self._construir_widgets()
         self.actualizar(0, 0, 0, 0)
     
@@ -194,20 +389,30 @@ class PanelEstadisticas(ttk.LabelFrame):
         self.progress_bar.grid(row=5, column=0, columnspan=2, padx=5, pady=5, sticky='ew')
     
     def actualizar(self, total: int, escaneados: int, faltantes: int, duplicados: int):
-        """Actualiza las estadísticas mostradas"""
-        self.lbl_total_val.config(text=str(total))
-        self.lbl_escaneados_val.config(text=str(escaneados))
-        self.lbl_faltantes_val.config(text=str(faltantes))
-        self.lbl_duplicados_val.config(text=str(duplicados))
-        
+        """Actualiza las estadísticas mostradas, tocando solo lo que cambió"""
         # Calcular porcentaje
         if total > 0:
             porcentaje = (escaneados / total) * 100
-            self.lbl_porcentaje_val.config(text=f"{porcentaje:.1f}%")
-            self.progress_bar['value'] = porcentaje
+            texto_porcentaje = f"{porcentaje:.1f}%"
         else:
-            self.lbl_porcentaje_val.config(text="0%")
-            self.progress_bar['value'] = 0
+            porcentaje = 0
+            texto_porcentaje = "0%"
+        
+        textos = {
+            self.lbl_total_val: str(total),
+            self.lbl_escaneados_val: str(escaneados),
+            self.lbl_faltantes_val: str(faltantes),
+            self.lbl_duplicados_val: str(duplicados),
+            self.lbl_porcentaje_val: texto_porcentaje,
+        }
+        for etiqueta, texto in textos.items():
+            if self._textos_mostrados.get(etiqueta) != texto:
+                etiqueta.config(text=texto)
+                self._textos_mostrados[etiqueta] = texto
+        
+        if porcentaje != self._porcentaje_mostrado:
+            self.progress_bar['value'] = porcentaje
+            self._porcentaje_mostrado = porcentaje
 
 
 class ListaEscaneos(ttk.LabelFrame):
@@ -238,6 +443,7 @@ class ListaEscaneos(ttk.LabelFrame):
         self.canvas.pack(side="left", fill="both", expand=True)
         self.scrollbar.pack(side="right", fill="y")
     
+    @medir("ui.lista_escaneos.agregar_escaneo")
     def agregar_escaneo(self, codigo: str, estado: str, mensaje: str, timestamp=None):
         """Agrega un escaneo a la lista"""
         if timestamp is None:
@@ -282,4 +488,561 @@ class ListaEscaneos(ttk.LabelFrame):
         """Limpia toda la lista"""
         for item in self.escaneos:
             item.destroy()
-        self.escaneos = []
\ No newline at end of file
+        self.escaneos = []
+
+class VentanaDepuracion(tk.Toplevel):
+    """Ventana con los histogramas de latencia del camino de escaneo"""
+
+    COLUMNAS = (
+        ("etapa", "Etapa", 260),
+        ("total", "Llamadas", 80),
+        ("promedio_us", "Prom. µs", 80),
+        ("p50_us", "p50 µs", 80),
+        ("p95_us", "p95 µs", 80),
+        ("p99_us", "p99 µs", 80),
+        ("max_us", "Máx. µs", 80),
+    )
+
+    def __init__(
+        self,
+        parent,
+        obtener_resumen: Callable[[], list],
+        on_exportar: Optional[Callable[[], None]] = None,
+        on_reiniciar: Optional[Callable[[], None]] = None,
+        intervalo_ms: int = 1000,
+        **kwargs
+    ):
+        super().__init__(parent, **kwargs)
+        self.title("Panel de depuración - Latencias de escaneo")
+        self.geometry("860x320")
+        self.obtener_resumen = obtener_resumen
+        self.on_exportar = on_exportar
+        self.on_reiniciar = on_reiniciar
+        self.intervalo_ms = intervalo_ms
+        self._construir_widgets()
+        self.refrescar()
+
+    def _construir_widgets(self):
+        """Construye la tabla y los botones"""
+        self.tabla = ttk.Treeview(
+            self, columns=[c[0] for c in self.COLUMNAS], show='headings', height=10
+        )
+        for clave, titulo, ancho in self.COLUMNAS:
+            self.tabla.heading(clave, text=titulo)
+            self.tabla.column(clave, width=ancho, anchor='w' if clave == 'etapa' else 'e')
+        self.tabla.pack(fill='both', expand=True, padx=10, pady=(10, 5))
+
+        frame_botones = ttk.Frame(self)
+        frame_botones.pack(fill='x', padx=10, pady=(0, 10))
+
+        self.lbl_estado = ttk.Label(frame_botones, text="", foreground=AppColors.PENDIENTE)
+        self.lbl_estado.pack(side='left')
+
+        if self.on_exportar:
+            ttk.Button(
+                frame_botones, text="Exportar JSON", command=self.on_exportar
+            ).pack(side='right', padx=(5, 0))
+        if self.on_reiniciar:
+            ttk.Button(
+                frame_botones, text="Reiniciar", command=self._reiniciar
+            ).pack(side='right')
+
+    def _reiniciar(self):
+        """Descarta las mediciones y refresca la tabla"""
+        self.on_reiniciar()
+        self.refrescar(programar=False)
+
+    def refrescar(self, programar: bool = True):
+        """Vuelve a dibujar la tabla con las mediciones actuales"""
+        if not self.winfo_exists():
+            return
+
+        self.tabla.delete(*self.tabla.get_children())
+        resumen = self.obtener_resumen()
+        for etapa in resumen:
+            self.tabla.insert(
+                '', 'end', values=[etapa[clave] for clave, _, _ in self.COLUMNAS]
+            )
+
+        self.lbl_estado.config(
+            text=f"{len(resumen)} etapas medidas - {datetime.now().strftime('%H:%M:%S')}"
+        )
+
+        if programar:
+            self.after(self.intervalo_ms, self.refrescar)
+
+
+class VentanaAgregados(tk.Toplevel):
+    """
+    Ventana con el avance y la conciliación de premios por punto de venta,
+    por vendedor o por tipo de premio
+    """
+
+    DIMENSIONES = (
+        ("sucursal", "Por PDV"),
+        ("vendedor", "Por vendedor"),
+        ("tipo_premio", "Por tipo de premio"),
+    )
+
+    COLUMNAS = (
+        ("clave", "PDV / Documento", 140),
+        ("nombre", "Nombre", 180),
+        ("total", "Total", 70),
+        ("escaneados", "Escaneados", 85),
+        ("duplicados", "Duplicados", 85),
+        ("pendientes", "Pendientes", 85),
+        ("porcentaje_escaneados", "Avance %", 80),
+        ("monto_total", "Reportado", 110),
+        ("monto_validado", "Validado", 110),
+        ("monto_pendiente", "Pendiente", 110),
+    )
+
+    COLUMNAS_MONTO = ("monto_total", "monto_validado", "monto_pendiente")
+
+    def __init__(
+        self,
+        parent,
+        obtener_agregados: Callable[..., list],
+        obtener_version: Callable[[], object],
+        obtener_totales: Optional[Callable[[], object]] = None,
+        intervalo_ms: int = 1000,
+        **kwargs
+    ):
+        super().__init__(parent, **kwargs)
+        self.title("Avance y conciliación de premios")
+        self.geometry("1100x440")
+        self.obtener_agregados = obtener_agregados
+        self.obtener_version = obtener_version
+        self.obtener_totales = obtener_totales
+        self.intervalo_ms = intervalo_ms
+        self.ordenar_por = "clave"
+        self.descendente = False
+        self._version_mostrada = None
+        self._construir_widgets()
+        self.refrescar()
+
+    def _construir_widgets(self):
+        """Construye el selector de dimensión y la tabla"""
+        frame_opciones = ttk.Frame(self)
+        frame_opciones.pack(fill='x', padx=10, pady=(10, 0))
+
+        self.var_dimension = tk.StringVar(value=self.DIMENSIONES[0][0])
+        for valor, texto in self.DIMENSIONES:
+            ttk.Radiobutton(
+                frame_opciones,
+                text=texto,
+                value=valor,
+                variable=self.var_dimension,
+                command=self._forzar_refresco,
+            ).pack(side='left', padx=(0, 10))
+
+        self.tabla = ttk.Treeview(
+            self, columns=[c[0] for c in self.COLUMNAS], show='headings', height=14
+        )
+        for clave, titulo, ancho in self.COLUMNAS:
+            # Clic en el encabezado: ordenar por esa columna (otro clic invierte)
+            self.tabla.heading(
+                clave, text=titulo, command=lambda c=clave: self._ordenar(c)
+            )
+            anchor = 'w' if clave in ('clave', 'nombre') else 'e'
+            self.tabla.column(clave, width=ancho, anchor=anchor)
+        self.tabla.pack(fill='both', expand=True, padx=10, pady=5)
+
+        # Valor validado vs valor reportado de toda la sesión
+        self.lbl_conciliacion = ttk.Label(self, text="", font=AppStyles.FUENTE_SUBTITULO)
+        self.lbl_conciliacion.pack(fill='x', padx=10)
+
+        self.lbl_estado = ttk.Label(self, text="", foreground=AppColors.PENDIENTE)
+        self.lbl_estado.pack(fill='x', padx=10, pady=(0, 10))
+
+    def _ordenar(self, columna: str):
+        """Ordena por una columna; repetir el clic invierte el orden"""
+        if self.ordenar_por == columna:
+            self.descendente = not self.descendente
+        else:
+            self.ordenar_por = columna
+            self.descendente = columna not in ('clave', 'nombre')
+        self._forzar_refresco()
+
+    def _forzar_refresco(self):
+        """Redibuja aunque la sesión no haya cambiado"""
+        self._version_mostrada = None
+        self.refrescar(programar=False)
+
+    def refrescar(self, programar: bool = True):
+        """Redibuja la tabla si la sesión cambió desde el último dibujo"""
+        if not self.winfo_exists():
+            return
+
+        version = self.obtener_version()
+        if version != self._version_mostrada:
+            self._version_mostrada = version
+            grupos = self.obtener_agregados(
+                self.var_dimension.get(), self.ordenar_por, self.descendente
+            )
+
+            self.tabla.delete(*self.tabla.get_children())
+            for grupo in grupos:
+                valores = grupo.to_dict()
+                for clave in self.COLUMNAS_MONTO:
+                    valores[clave] = f"{getattr(grupo, clave):,.2f}"
+                self.tabla.insert(
+                    '', 'end', values=[valores[clave] for clave, _, _ in self.COLUMNAS]
+                )
+
+            if self.obtener_totales:
+                totales = self.obtener_totales()
+                if totales:
+                    self.lbl_conciliacion.config(
+                        text=f"Reportado: {totales.monto_total:,.2f}   "
+                        f"Validado: {totales.monto_validado:,.2f}   "
+                        f"Pendiente: {totales.monto_pendiente:,.2f}"
+                    )
+
+            self.lbl_estado.config(
+                text=f"{len(grupos)} grupos - {datetime.now().strftime('%H:%M:%S')}"
+            )
+
+        if programar:
+            self.after(self.intervalo_ms, self.refrescar)
+
+
+class ListaVirtual(ttk.Frame):
+    """
+    Tabla que muestra una ventana de filas sobre una colección grande.
+
+    Solo existen en el Treeview las filas visibles; la barra de scroll se
+    mapea sobre el total y cada desplazamiento pide una página nueva, así
+    el costo de dibujar no depende del tamaño de la colección.
+    """
+
+    def __init__(
+        self,
+        parent,
+        columnas: List[tuple],
+        obtener_total: Callable[[], int],
+        obtener_pagina: Callable[[int, int], list],
+        filas: int = 18,
+        **kwargs
+    ):
+        """
+        Args:
+            parent: Widget padre
+            columnas: Tuplas (clave, título, ancho)
+            obtener_total: Retorna la cantidad total de filas
+            obtener_pagina: Recibe (inicio, cantidad) y retorna listas de
+                valores, una por fila, en el orden de `columnas`
+            filas: Filas visibles
+        """
+        super().__init__(parent, **kwargs)
+        self.columnas = columnas
+        self.obtener_total = obtener_total
+        self.obtener_pagina = obtener_pagina
+        self.filas = filas
+        self.inicio = 0
+        self.total = 0
+        self._construir_widgets()
+
+    def _construir_widgets(self):
+        """Construye la tabla y la barra de scroll"""
+        self.tabla = ttk.Treeview(
+            self, columns=[c[0] for c in self.columnas], show='headings',
+            height=self.filas
+        )
+        for clave, titulo, ancho in self.columnas:
+            self.tabla.heading(clave, text=titulo)
+            self.tabla.column(clave, width=ancho, anchor='w')
+
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self._on_scroll)
+
+        self.tabla.grid(row=0, column=0, sticky='nsew')
+        self.scrollbar.grid(row=0, column=1, sticky='ns')
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        # Rueda del mouse: Windows/macOS envían <MouseWheel>, X11 Button-4/5
+        self.tabla.bind('<MouseWheel>', lambda e: self._desplazar(-3 if e.delta > 0 else 3))
+        self.tabla.bind('<Button-4>', lambda e: self._desplazar(-3))
+        self.tabla.bind('<Button-5>', lambda e: self._desplazar(3))
+        self.tabla.bind('<Prior>', lambda e: self._desplazar(-self.filas))
+        self.tabla.bind('<Next>', lambda e: self._desplazar(self.filas))
+
+    def _on_scroll(self, accion, cantidad, unidad=None):
+        """Traduce los comandos de la barra de scroll a una fila de inicio"""
+        if accion == 'moveto':
+            self.ir_a(int(float(cantidad) * self.total))
+        elif accion == 'scroll':
+            paso = self.filas if unidad == 'pages' else 1
+            self._desplazar(int(cantidad) * paso)
+
+    def _desplazar(self, filas: int):
+        self.ir_a(self.inicio + filas)
+        return 'break'
+
+    def ir_a(self, inicio: int):
+        """Muestra la página que empieza en la fila indicada"""
+        self.inicio = inicio
+        self.refrescar()
+
+    def refrescar(self):
+        """Vuelve a pedir la página visible (y el total)"""
+        self.total = self.obtener_total()
+        self.inicio = max(0, min(self.inicio, self.total - self.filas))
+
+        self.tabla.delete(*self.tabla.get_children())
+        for valores in self.obtener_pagina(self.inicio, self.filas):
+            self.tabla.insert('', 'end', values=list(valores))
+
+        if self.total:
+            self.scrollbar.set(
+                self.inicio / self.total,
+                min(1.0, (self.inicio + self.filas) / self.total),
+            )
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+
+class VentanaFaltantes(tk.Toplevel):
+    """
+    Ventana con los boletos pendientes en orden del reporte, filtrables por
+    PDV o agrupados por PDV. Se pide a la sesión solo la página visible.
+    """
+
+    TODOS = "Todos los PDV"
+
+    COLUMNAS = (
+        ("codigo", "Código", 140),
+        ("vendedor", "Vendedor", 220),
+        ("sucursal", "Sucursal", 160),
+        ("monto", "Premio", 90),
+    )
+
+    def __init__(
+        self,
+        parent,
+        contar: Callable[[Optional[str]], int],
+        obtener_pagina: Callable[..., list],
+        obtener_sucursales: Callable[[], list],
+        obtener_version: Callable[[], object],
+        intervalo_ms: int = 1000,
+        **kwargs
+    ):
+        """
+        Args:
+            parent: Ventana padre
+            contar: Recibe un PDV (o None) y retorna sus pendientes
+            obtener_pagina: Recibe (inicio, cantidad, sucursal,
+                agrupado_por_sucursal) y retorna boletos
+            obtener_sucursales: Retorna pares (PDV, pendientes)
+            obtener_version: Valor que cambia cuando cambia la sesión
+            intervalo_ms: Cada cuánto revisar si hay cambios
+        """
+        super().__init__(parent, **kwargs)
+        self.title("Boletos Faltantes")
+        self.geometry("680x480")
+        self.contar = contar
+        self.obtener_pagina_boletos = obtener_pagina
+        self.obtener_sucursales = obtener_sucursales
+        self.obtener_version = obtener_version
+        self.intervalo_ms = intervalo_ms
+        self._version_mostrada = None
+        self._construir_widgets()
+        self.refrescar()
+
+    def _construir_widgets(self):
+        """Construye el título, los filtros y la lista virtual"""
+        self.lbl_titulo = ttk.Label(self, text="", style="Title.TLabel")
+        self.lbl_titulo.pack(padx=10, pady=(10, 5))
+
+        frame_opciones = ttk.Frame(self)
+        frame_opciones.pack(fill='x', padx=10)
+
+        self.var_sucursal = tk.StringVar(value=self.TODOS)
+        self.combo_sucursal = ttk.Combobox(
+            frame_opciones, textvariable=self.var_sucursal, state='readonly', width=30
+        )
+        self.combo_sucursal.bind('<<ComboboxSelected>>', lambda e: self._cambiar_filtro())
+        self.combo_sucursal.pack(side='left')
+
+        self.var_agrupar = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            frame_opciones,
+            text="Agrupar por PDV",
+            variable=self.var_agrupar,
+            command=self._cambiar_filtro,
+        ).pack(side='left', padx=10)
+
+        self.lista = ListaVirtual(
+            self, self.COLUMNAS, self._total_filtrado, self._pagina_filtrada
+        )
+        self.lista.pack(fill='both', expand=True, padx=10, pady=10)
+
+    def _sucursal_seleccionada(self) -> Optional[str]:
+        valor = self.var_sucursal.get()
+        if valor == self.TODOS:
+            return None
+        return valor.rsplit(" (", 1)[0]
+
+    def _total_filtrado(self) -> int:
+        return self.contar(self._sucursal_seleccionada())
+
+    def _pagina_filtrada(self, inicio: int, cantidad: int) -> list:
+        boletos = self.obtener_pagina_boletos(
+            inicio, cantidad, self._sucursal_seleccionada(), self.var_agrupar.get()
+        )
+        return [
+            (b.codigo, b.vendedor_nombre, b.sucursal, f"{b.monto_premio:,.2f}")
+            for b in boletos
+        ]
+
+    def _cambiar_filtro(self):
+        """Vuelve al principio de la lista con el filtro nuevo"""
+        self.lista.inicio = 0
+        self._version_mostrada = None
+        self.refrescar(programar=False)
+
+    def refrescar(self, programar: bool = True):
+        """Redibuja si la sesión cambió desde el último dibujo"""
+        if not self.winfo_exists():
+            return
+
+        version = self.obtener_version()
+        if version != self._version_mostrada:
+            self._version_mostrada = version
+
+            sucursales = self.obtener_sucursales()
+            self.combo_sucursal['values'] = [self.TODOS] + [
+                f"{sucursal} ({pendientes})" for sucursal, pendientes in sucursales
+            ]
+            # Mantener el PDV elegido aunque cambie su cantidad de pendientes
+            seleccionada = self._sucursal_seleccionada()
+            if seleccionada is not None:
+                pendientes = dict(sucursales).get(seleccionada, 0)
+                self.var_sucursal.set(f"{seleccionada} ({pendientes})")
+
+            self.lista.refrescar()
+            self.lbl_titulo.config(
+                text=f"📋 {self.contar(None)} BOLETOS FALTANTES"
+            )
+
+        if programar:
+            self.after(self.intervalo_ms, self.refrescar)
+
+
+class VentanaBusqueda(tk.Toplevel):
+    """
+    Búsqueda manual de un boleto por los dígitos impresos que se alcanzan a
+    leer (inicio o final del código) cuando el código de barras no se puede
+    escanear. Los resultados se muestran en una lista virtual.
+    """
+
+    COLUMNAS = (
+        ("codigo", "Código", 140),
+        ("estado", "Estado", 100),
+        ("vendedor", "Vendedor", 200),
+        ("sucursal", "Sucursal", 150),
+    )
+
+    def __init__(
+        self,
+        parent,
+        contar: Callable[[str, bool], int],
+        buscar: Callable[[str, int, int, bool], list],
+        on_escanear: Optional[Callable[[str], None]] = None,
+        **kwargs
+    ):
+        """
+        Args:
+            parent: Ventana padre
+            contar: Recibe (dígitos, por_sufijo) y retorna las coincidencias
+            buscar: Recibe (dígitos, inicio, cantidad, por_sufijo) y retorna
+                boletos
+            on_escanear: Callback con el código elegido para escanearlo
+        """
+        super().__init__(parent, **kwargs)
+        self.title("Buscar boleto por código parcial")
+        self.geometry("640x460")
+        self.contar = contar
+        self.buscar = buscar
+        self.on_escanear = on_escanear
+        self._construir_widgets()
+        self.entry.focus_set()
+
+    def _construir_widgets(self):
+        """Construye el campo de búsqueda, las opciones y los resultados"""
+        frame_busqueda = ttk.Frame(self)
+        frame_busqueda.pack(fill='x', padx=10, pady=(10, 0))
+
+        self.var_digitos = tk.StringVar()
+        self.var_digitos.trace_add('write', lambda *args: self._buscar())
+        self.entry = ttk.Entry(
+            frame_busqueda, textvariable=self.var_digitos,
+            font=AppStyles.FUENTE_MONOSPACE, width=20
+        )
+        self.entry.pack(side='left')
+        self.entry.bind('<Return>', lambda e: self._escanear_seleccionado())
+
+        # Lo habitual es leer los últimos dígitos impresos
+        self.var_sufijo = tk.BooleanVar(value=True)
+        ttk.Radiobutton(
+            frame_busqueda, text="Termina en", value=True,
+            variable=self.var_sufijo, command=self._buscar
+        ).pack(side='left', padx=(10, 0))
+        ttk.Radiobutton(
+            frame_busqueda, text="Empieza con", value=False,
+            variable=self.var_sufijo, command=self._buscar
+        ).pack(side='left', padx=(10, 0))
+
+        self.lista = ListaVirtual(
+            self, self.COLUMNAS, self._total_resultados, self._pagina_resultados
+        )
+        self.lista.pack(fill='both', expand=True, padx=10, pady=10)
+        self.lista.tabla.bind('<Double-1>', lambda e: self._escanear_seleccionado())
+
+        frame_pie = ttk.Frame(self)
+        frame_pie.pack(fill='x', padx=10, pady=(0, 10))
+        self.lbl_estado = ttk.Label(frame_pie, text="", foreground=AppColors.PENDIENTE)
+        self.lbl_estado.pack(side='left')
+        if self.on_escanear:
+            ttk.Button(
+                frame_pie, text="Escanear seleccionado",
+                command=self._escanear_seleccionado
+            ).pack(side='right')
+
+    def _digitos(self) -> str:
+        return "".join(filter(str.isdigit, self.var_digitos.get()))
+
+    def _total_resultados(self) -> int:
+        digitos = self._digitos()
+        return self.contar(digitos, self.var_sufijo.get()) if digitos else 0
+
+    def _pagina_resultados(self, inicio: int, cantidad: int) -> list:
+        digitos = self._digitos()
+        if not digitos:
+            return []
+        return [
+            (b.codigo, b.estado.value, b.vendedor_nombre, b.sucursal)
+            for b in self.buscar(digitos, inicio, cantidad, self.var_sufijo.get())
+        ]
+
+    def _buscar(self):
+        """Muestra las coincidencias desde la primera"""
+        self.lista.ir_a(0)
+        if self._digitos():
+            self.lbl_estado.config(text=f"{self.lista.total} coincidencias")
+        else:
+            self.lbl_estado.config(text="Escriba los dígitos legibles del código")
+
+        # Con una sola coincidencia queda lista para escanear con Enter
+        filas = self.lista.tabla.get_children()
+        if self.lista.total == 1 and filas:
+            self.lista.tabla.selection_set(filas[0])
+
+    def _escanear_seleccionado(self):
+        """Entrega el código de la fila seleccionada al callback"""
+        seleccion = self.lista.tabla.selection()
+        if not seleccion or not self.on_escanear:
+            return
+        codigo = str(self.lista.tabla.item(seleccion[0], 'values')[0])
+        self.on_escanear(codigo)
+        self.lbl_estado.config(text=f"Enviado a escanear: {codigo}")